@@ -0,0 +1,115 @@
+"""
+Add job status summary fields
+
+Revision ID: xn3hgz7e7ehm
+Date: 2024-06-12 18:31:07.204519
+
+"""
+
+import asyncio
+
+import arrow
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from virtool.migration import MigrationContext
+
+# Revision identifiers.
+name = "Add job status summary fields"
+created_at = arrow.get("2024-06-12 18:31:07.204519")
+revision_id = "xn3hgz7e7ehm"
+
+alembic_down_revision = None
+virtool_down_revision = "lcq797n5ryxk"
+
+# Change this if an Alembic revision is required to run this migration.
+required_alembic_revision = None
+
+
+async def upgrade(ctx: MigrationContext):
+    """
+    Store the current state, stage, progress, and creation time of each job on the job
+    document and index them.
+
+    These values were previously derived from the ``status`` list in aggregation
+    pipelines that could not use indexes.
+    """
+    await ctx.mongo.jobs.update_many(
+        {"status.0": {"$exists": True}},
+        [
+            {
+                "$set": {
+                    "created_at": {"$first": "$status.timestamp"},
+                    "progress": {"$last": "$status.progress"},
+                    "stage": {"$last": "$status.stage"},
+                    "state": {"$last": "$status.state"},
+                },
+            },
+        ],
+    )
+
+    await ctx.mongo.jobs.create_indexes(
+        [
+            IndexModel([("created_at", DESCENDING)]),
+            IndexModel(
+                [
+                    ("archived", ASCENDING),
+                    ("state", ASCENDING),
+                    ("created_at", DESCENDING),
+                ],
+            ),
+            IndexModel(
+                [
+                    ("archived", ASCENDING),
+                    ("workflow", ASCENDING),
+                    ("state", ASCENDING),
+                ],
+            ),
+            IndexModel([("user.id", ASCENDING), ("created_at", DESCENDING)]),
+            IndexModel([("state", ASCENDING), ("ping.pinged_at", ASCENDING)]),
+        ],
+    )
+
+
+async def test_upgrade(ctx: MigrationContext):
+    created_at = arrow.get("2024-01-01 12:00:00").naive
+    updated_at = arrow.get("2024-01-01 12:05:00").naive
+
+    await ctx.mongo.jobs.insert_many(
+        [
+            {
+                "_id": "foo",
+                "state": "waiting",
+                "status": [
+                    {
+                        "state": "waiting",
+                        "stage": None,
+                        "progress": 0,
+                        "timestamp": created_at,
+                    },
+                    {
+                        "state": "running",
+                        "stage": "build",
+                        "progress": 40,
+                        "timestamp": updated_at,
+                    },
+                ],
+            },
+            {"_id": "bar", "status": []},
+        ],
+    )
+
+    await upgrade(ctx)
+
+    foo, bar = await asyncio.gather(
+        ctx.mongo.jobs.find_one("foo"),
+        ctx.mongo.jobs.find_one("bar"),
+    )
+
+    assert foo["created_at"] == created_at
+    assert foo["progress"] == 40
+    assert foo["stage"] == "build"
+    assert foo["state"] == "running"
+
+    assert bar == {"_id": "bar", "status": []}
+
+    assert len(await ctx.mongo.jobs.index_information()) == 6
@@ -7,8 +7,10 @@ from syrupy import SnapshotAssertion
 from syrupy.filters import props
 from virtool_core.models.enums import Permission
 
+from virtool.account.cache import KeyChange
 from virtool.account.oas import CreateKeysRequest, UpdateAccountRequest
 from virtool.data.errors import ResourceNotFoundError
+from virtool.data.events import Event, Operation
 from virtool.data.layer import DataLayer
 from virtool.fake.next import DataFaker
 from virtool.groups.oas import PermissionsUpdate
@@ -136,6 +138,125 @@ class TestGetKeyBySecret:
             await data_layer.account.get_key_by_secret(user.id, "foo")
 
 
+class TestAuthenticateKey:
+    async def test_ok(self, data_layer: DataLayer, fake: DataFaker, mocker):
+        """Test that a key is authenticated with the owner's permissions limited by the
+        key's, and that repeat authentications do not query the keys collection.
+        """
+        group = await fake.groups.create(
+            PermissionsUpdate(
+                **{Permission.create_sample: True, Permission.modify_subtraction: True},
+            ),
+        )
+
+        user = await fake.users.create(groups=[group])
+
+        secret, _ = await data_layer.account.create_key(
+            CreateKeysRequest(
+                name="Foo",
+                permissions=PermissionsUpdate(create_sample=True),
+            ),
+            user.id,
+        )
+
+        spy = mocker.spy(data_layer.account._mongo.keys, "find_one")
+
+        for _ in range(3):
+            user_id, state = await data_layer.account.authenticate_key(
+                user.handle,
+                secret,
+            )
+
+            assert user_id == user.id
+            assert state.permissions[Permission.create_sample] is True
+            assert state.permissions[Permission.modify_subtraction] is False
+
+        assert spy.call_count == 1
+
+    async def test_wrong_handle(self, data_layer: DataLayer, fake: DataFaker):
+        """Test that a key can't be used with another user's handle."""
+        user = await fake.users.create()
+        other = await fake.users.create()
+
+        secret, _ = await data_layer.account.create_key(
+            CreateKeysRequest(name="Foo", permissions=PermissionsUpdate()),
+            user.id,
+        )
+
+        await data_layer.account.authenticate_key(user.handle, secret)
+
+        with pytest.raises(ResourceNotFoundError):
+            await data_layer.account.authenticate_key(other.handle, secret)
+
+    async def test_deleted(self, data_layer: DataLayer, fake: DataFaker):
+        """Test that a cached key can't be used after it is deleted."""
+        user = await fake.users.create()
+
+        secret, api_key = await data_layer.account.create_key(
+            CreateKeysRequest(name="Foo", permissions=PermissionsUpdate()),
+            user.id,
+        )
+
+        await data_layer.account.authenticate_key(user.handle, secret)
+        await data_layer.account.delete_key(user.id, api_key.id)
+
+        with pytest.raises(ResourceNotFoundError):
+            await data_layer.account.authenticate_key(user.handle, secret)
+
+    async def test_deleted_by_other_instance(
+        self,
+        data_layer: DataLayer,
+        fake: DataFaker,
+        mocker,
+        mongo: Mongo,
+    ):
+        """Test that a key deleted by another instance of the application can't be used
+        once its event is received, and that deleting a key emits that event.
+        """
+        m_emit = mocker.patch("virtool.account.data.emit")
+
+        user = await fake.users.create()
+
+        secret, api_key = await data_layer.account.create_key(
+            CreateKeysRequest(name="Foo", permissions=PermissionsUpdate()),
+            user.id,
+        )
+
+        await data_layer.account.authenticate_key(user.handle, secret)
+
+        # Delete the key the way another instance would, leaving it cached here.
+        await mongo.keys.delete_one({"id": api_key.id})
+
+        assert await data_layer.account.authenticate_key(user.handle, secret)
+
+        data_layer.account.key_cache.handle_event(
+            Event(
+                data=KeyChange(id=api_key.id, user_id=user.id),
+                domain="keys",
+                name="delete_key",
+                operation=Operation.DELETE,
+                timestamp=None,
+            ),
+        )
+
+        with pytest.raises(ResourceNotFoundError):
+            await data_layer.account.authenticate_key(user.handle, secret)
+
+        secret, api_key = await data_layer.account.create_key(
+            CreateKeysRequest(name="Bar", permissions=PermissionsUpdate()),
+            user.id,
+        )
+
+        await data_layer.account.delete_key(user.id, api_key.id)
+
+        m_emit.assert_called_once_with(
+            KeyChange(id=api_key.id, user_id=user.id),
+            "keys",
+            "delete_key",
+            Operation.DELETE,
+        )
+
+
 @pytest.mark.parametrize(
     "update",
     [
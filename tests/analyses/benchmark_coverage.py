@@ -0,0 +1,116 @@
+"""Compare the NumPy coverage functions with the pure-Python implementations they
+replaced.
+
+Run from the repository root with::
+
+    python -m tests.analyses.benchmark_coverage
+
+"""
+
+import random
+import statistics
+import timeit
+
+import visvalingamwyatt as vw
+
+from virtool.analyses.coverage import (
+    calculate_median_depths,
+    transform_coverage_to_coordinates,
+)
+
+
+def python_calculate_median_depths(hits: list[dict]) -> dict[str, int]:
+    """The original pure-Python implementation of ``calculate_median_depths``."""
+    return {hit["id"]: statistics.median(hit["align"]) for hit in hits}
+
+
+def python_transform_coverage_to_coordinates(
+    coverage_list: list[int],
+) -> list[tuple[int, int]]:
+    """The original pure-Python implementation of
+    ``transform_coverage_to_coordinates``.
+    """
+    coordinates = [(0, coverage_list[0])]
+
+    last = len(coverage_list) - 1
+
+    for x in range(1, last):
+        y = coverage_list[x]
+        if y != coverage_list[x - 1] or y != coverage_list[x + 1]:
+            coordinates.append((x, y))
+
+    coordinates.append((last, coverage_list[last]))
+
+    if len(coordinates) > 100:
+        return vw.simplify(coordinates, ratio=0.4)
+
+    return coordinates
+
+
+def generate_coverage(rnd: random.Random, length: int) -> list[int]:
+    """Generate a realistic coverage array.
+
+    Depth drifts up and down in small steps with flat runs between changes, like
+    read coverage over a viral genome.
+
+    :param rnd: the random number generator to use
+    :param length: the length of the sequence
+    :return: a list of position-indexed depths
+    """
+    depth = rnd.randint(0, 200)
+    coverage = []
+
+    for _ in range(length):
+        if rnd.random() < 0.2:
+            depth = max(0, depth + rnd.randint(-5, 5))
+
+        coverage.append(depth)
+
+    return coverage
+
+
+def generate_hits(rnd: random.Random, count: int, length: int) -> list[dict]:
+    """Generate Pathoscope hits with coverage arrays.
+
+    :param rnd: the random number generator to use
+    :param count: the number of hits
+    :param length: the length of each hit's sequence
+    :return: a list of hits
+    """
+    return [
+        {"id": f"seq_{i}", "align": generate_coverage(rnd, length)}
+        for i in range(count)
+    ]
+
+
+def main():
+    rnd = random.Random(14)
+
+    for count, length in ((500, 1_000), (100, 10_000), (10, 200_000)):
+        hits = generate_hits(rnd, count, length)
+
+        def python_format():
+            python_calculate_median_depths(hits)
+
+            for hit in hits:
+                python_transform_coverage_to_coordinates(hit["align"])
+
+        def numpy_format():
+            calculate_median_depths(hits)
+
+            for hit in hits:
+                transform_coverage_to_coordinates(hit["align"])
+
+        python_time = min(timeit.repeat(python_format, number=1, repeat=3))
+        numpy_time = min(timeit.repeat(numpy_format, number=1, repeat=3))
+
+        print(
+            f"{count} hits x {length} bp: "
+            f"python {python_time:.3f}s, "
+            f"numpy {numpy_time:.3f}s, "
+            f"speedup {python_time / numpy_time:.1f}x",
+        )
+
+
+if __name__ == "__main__":
+    main()
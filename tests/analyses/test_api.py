@@ -1,5 +1,4 @@
 import asyncio
-import io
 import json
 import os
 from pathlib import Path
@@ -543,9 +542,13 @@ async def test_download_analysis_document(
     if exists:
         await mongo.analyses.insert_one({"_id": "foobar", "ready": True})
 
+    async def stream_chunks(*args):
+        yield b"foo"
+        yield b"bar"
+
     mocker.patch(
         f"virtool.analyses.format.format_analysis_to_{'excel' if extension == 'xlsx' else 'csv'}",
-        return_value=io.StringIO().getvalue(),
+        side_effect=stream_chunks,
     )
 
     resp = await client.get(f"/analyses/documents/foobar.{extension}")
@@ -560,7 +563,9 @@ async def test_download_analysis_document(
             assert (
                 resp.headers["Content-Disposition"] == "attachment; filename=foobar.csv"
             )
+            assert resp.headers["Transfer-Encoding"] == "chunked"
             assert resp.status == 200
+            assert await resp.read() == b"foobar"
 
         case "xlsx":
             assert (
@@ -577,6 +582,32 @@ async def test_download_analysis_document(
             assert resp.status == 400
 
 
+async def test_download_analysis_document_error(
+    mocker,
+    mongo: Mongo,
+    spawn_client: ClientSpawner,
+):
+    """Test that an error while formatting the analysis results in an error response
+    instead of a truncated file.
+    """
+    client = await spawn_client(authenticated=True)
+
+    await mongo.analyses.insert_one({"_id": "foobar", "ready": True})
+
+    async def stream_chunks(*args):
+        raise ValueError("Could not patch OTUs")
+        yield b"foo"
+
+    mocker.patch(
+        "virtool.analyses.format.format_analysis_to_csv",
+        side_effect=stream_chunks,
+    )
+
+    resp = await client.get("/analyses/documents/foobar.csv")
+
+    assert resp.status == 500
+
+
 @pytest.mark.parametrize(
     "error",
     [
@@ -0,0 +1,52 @@
+import random
+
+import pytest
+
+from tests.analyses.benchmark_coverage import (
+    generate_coverage,
+    generate_hits,
+    python_calculate_median_depths,
+    python_transform_coverage_to_coordinates,
+)
+from virtool.analyses.coverage import (
+    calculate_median_depths,
+    transform_coverage_to_coordinates,
+)
+
+
+@pytest.mark.parametrize("length", [1, 2, 3, 50, 150, 1_000, 20_000])
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_transform_coverage_to_coordinates(length: int, seed: int):
+    """Test that the output is identical to the pure-Python implementation, with and
+    without simplification.
+    """
+    coverage = generate_coverage(random.Random(seed), length)
+
+    assert transform_coverage_to_coordinates(
+        coverage,
+    ) == python_transform_coverage_to_coordinates(coverage)
+
+
+def test_transform_coverage_to_coordinates_ties():
+    """Test that many equal triangle areas are resolved the same way as
+    ``visvalingamwyatt``.
+    """
+    rnd = random.Random(7)
+
+    coverage = [rnd.randint(0, 2) for _ in range(5_000)]
+
+    assert transform_coverage_to_coordinates(
+        coverage,
+    ) == python_transform_coverage_to_coordinates(coverage)
+
+
+@pytest.mark.parametrize("length", [1, 2, 999, 1_000])
+def test_calculate_median_depths(length: int):
+    """Test that medians are identical in value and type to ``statistics.median``."""
+    hits = generate_hits(random.Random(length), 5, length)
+
+    depths = calculate_median_depths(hits)
+    expected = python_calculate_median_depths(hits)
+
+    assert depths == expected
+    assert [type(d) for d in depths.values()] == [type(d) for d in expected.values()]
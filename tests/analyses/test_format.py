@@ -1,9 +1,19 @@
+import csv
+import io
 import json
 
+import openpyxl
 import pytest
+from aiohttp.test_utils import make_mocked_coro
 
 import virtool.analyses
-from virtool.analyses.format import load_results, transform_coverage_to_coordinates
+from virtool.analyses.format import (
+    CSV_HEADERS,
+    format_analysis_to_csv,
+    format_analysis_to_excel,
+    load_results,
+    transform_coverage_to_coordinates,
+)
 from virtool.mongo.core import Mongo
 
 
@@ -209,9 +219,231 @@ async def test_format_analysis(workflow: str | None, config, mocker, mongo: Mong
         }
 
         if workflow == "nuvs":
-            m_format_nuvs.assert_called_with(config, mongo, document)
+            m_format_nuvs.assert_called_with(config, mongo, document, None)
             assert not m_format_pathoscope.called
 
         elif workflow == "pathoscope":
-            m_format_pathoscope.assert_called_with(config, mongo, document)
+            m_format_pathoscope.assert_called_with(config, mongo, document, None)
             assert not m_format_nuvs.called
+
+
+@pytest.mark.parametrize("threshold", [0, 1000])
+async def test_format_nuvs_in_process(
+    threshold: int,
+    config,
+    mocker,
+    mongo: Mongo,
+    run_in_process,
+):
+    """Test that HMM annotations are merged in the process pool only when the results
+    have more hits than the configured threshold, and that the output is the same either
+    way.
+    """
+    config.analysis_format_process_threshold = threshold
+
+    await mongo.hmm.insert_one(
+        {"_id": "hmm_1", "cluster": 2, "families": {"Potyviridae": 1}, "names": ["A"]},
+    )
+
+    document = {
+        "_id": "foo",
+        "results": {
+            "hits": [
+                {
+                    "index": 0,
+                    "orfs": [{"hits": [{"hit": "hmm_1", "evalue": 1e-10}]}],
+                },
+            ],
+        },
+        "sample": {"id": "bar"},
+        "workflow": "nuvs",
+    }
+
+    m_run_in_process = mocker.AsyncMock(side_effect=run_in_process)
+
+    assert await virtool.analyses.format.format_nuvs(
+        config,
+        mongo,
+        document,
+        m_run_in_process,
+    ) == {
+        **document,
+        "results": {
+            "hits": [
+                {
+                    "index": 0,
+                    "orfs": [
+                        {
+                            "hits": [
+                                {
+                                    "cluster": 2,
+                                    "evalue": 1e-10,
+                                    "families": {"Potyviridae": 1},
+                                    "hit": "hmm_1",
+                                    "names": ["A"],
+                                },
+                            ],
+                        },
+                    ],
+                },
+            ],
+        },
+    }
+
+    assert m_run_in_process.called is (threshold == 0)
+
+
+async def test_format_analysis_materialized(config, mocker, mongo: Mongo, static_time):
+    """Test that formatted results are materialized on first use, served from disk
+    afterwards, and rebuilt when the analysis changes.
+    """
+    m_format_analysis = mocker.patch(
+        "virtool.analyses.format.format_analysis",
+        side_effect=lambda _config, _mongo, document, _run_in_process: {
+            **document,
+            "results": {"hits": [{"id": "otu", "version": 2}]},
+        },
+    )
+
+    document = {
+        "_id": "foo",
+        "ready": True,
+        "results": {"hits": []},
+        "sample": {"id": "bar"},
+        "updated_at": static_time.datetime,
+        "workflow": "pathoscope_bowtie",
+    }
+
+    expected = {**document, "results": {"hits": [{"id": "otu", "version": 2}]}}
+
+    format_analysis_materialized = (
+        virtool.analyses.format.format_analysis_materialized
+    )
+
+    assert await format_analysis_materialized(config, mongo, document) == expected
+    assert await format_analysis_materialized(config, mongo, document) == expected
+    assert m_format_analysis.call_count == 1
+
+    assert (
+        config.data_path / "samples" / "bar" / "analysis" / "foo" / "formatted.json.gz"
+    ).exists()
+
+    updated = {**document, "updated_at": static_time.datetime.replace(year=2016)}
+
+    assert await format_analysis_materialized(config, mongo, updated) == {
+        **expected,
+        "updated_at": updated["updated_at"],
+    }
+    assert m_format_analysis.call_count == 2
+
+    await virtool.analyses.format.remove_formatted_results(config, "foo", "bar")
+
+    assert await format_analysis_materialized(config, mongo, updated)
+    assert m_format_analysis.call_count == 3
+
+
+@pytest.fixture
+def export_document():
+    return {
+        "_id": "foo",
+        "ready": True,
+        "results": {
+            "hits": [
+                {"id": "seq_1", "align": [1, 2, 3]},
+                {"id": "seq_2", "align": [4, 4, 5, 6]},
+            ],
+        },
+        "sample": {"id": "bar"},
+        "workflow": "pathoscope_bowtie",
+    }
+
+
+@pytest.fixture
+def export_formatted(export_document):
+    return {
+        **export_document,
+        "results": {
+            "hits": [
+                {
+                    "name": f"OTU {i}",
+                    "isolates": [
+                        {
+                            "source_type": "isolate",
+                            "source_name": f"{i}",
+                            "sequences": [
+                                {
+                                    "id": f"seq_{i}",
+                                    "accession": f"AB00{i}",
+                                    "coverage": 0.5,
+                                    "length": 100 * i,
+                                    "pi": 0.1 * i,
+                                },
+                            ],
+                        },
+                    ],
+                }
+                for i in range(1, 201)
+            ],
+        },
+    }
+
+
+async def test_format_analysis_to_csv(
+    config,
+    export_document,
+    export_formatted,
+    mocker,
+    mongo: Mongo,
+):
+    """Test that CSV rows are yielded in multiple chunks that join to the full file."""
+    mocker.patch("virtool.analyses.format.EXPORT_CHUNK_SIZE", 1024)
+    mocker.patch(
+        "virtool.analyses.format.format_analysis_materialized",
+        make_mocked_coro(export_formatted),
+    )
+
+    chunks = [
+        chunk
+        async for chunk in format_analysis_to_csv(config, mongo, export_document)
+    ]
+
+    assert len(chunks) > 1
+
+    rows = list(csv.reader(io.StringIO(b"".join(chunks).decode())))
+
+    assert len(rows) == 201
+    assert rows[0] == list(CSV_HEADERS)
+    assert rows[1] == ["OTU 1", "Isolate 1", "AB001", "100", "0.1", "2", "0.5"]
+    assert rows[2] == ["OTU 2", "Isolate 2", "AB002", "200", "0.2", "4.5", "0.5"]
+    assert rows[3][5] == "0"
+
+
+async def test_format_analysis_to_excel(
+    config,
+    export_document,
+    export_formatted,
+    mocker,
+    mongo: Mongo,
+):
+    """Test that the streamed workbook contains the header and all rows."""
+    mocker.patch(
+        "virtool.analyses.format.format_analysis_materialized",
+        make_mocked_coro(export_formatted),
+    )
+
+    chunks = [
+        chunk
+        async for chunk in format_analysis_to_excel(config, mongo, export_document)
+    ]
+
+    wb = openpyxl.load_workbook(io.BytesIO(b"".join(chunks)))
+    ws = wb.active
+
+    rows = list(ws.values)
+
+    assert ws.title == "Pathoscope for bar"
+    assert ws.cell(row=1, column=1).font.bold
+    assert len(rows) == 201
+    assert rows[0] == CSV_HEADERS
+    assert rows[1] == ("OTU 1", "Isolate 1", "AB001", 100, 0.1, 2, 0.5)
+    assert rows[2] == ("OTU 2", "Isolate 2", "AB002", 200, 0.2, 4.5, 0.5)
@@ -0,0 +1,81 @@
+"""Compare sequential authorization checks with batched and cached checks.
+
+OpenFGA is replaced with a local stand-in that answers checks after a fixed delay, like
+a round trip to an OpenFGA server on the same network.
+
+Run from the repository root with::
+
+    python -m tests.authorization.benchmark_client
+
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from openfga_sdk import CheckRequest
+
+from virtool.authorization.client import AuthorizationClient
+from virtool.authorization.permissions import Permission, ResourceType
+
+LATENCY = 0.002
+"""The simulated OpenFGA round trip time in seconds."""
+
+
+class LocalOpenFGA:
+    """An OpenFGA stand-in that allows users to access even-numbered resources."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def check(self, request: CheckRequest):
+        self.calls += 1
+
+        await asyncio.sleep(LATENCY)
+
+        return SimpleNamespace(
+            allowed=int(request.tuple_key.object.split(":")[1]) % 2 == 0,
+        )
+
+
+async def run(count: int):
+    checks = [
+        ("bob", Permission.UPDATE_SUBTRACTION, ResourceType.SPACE, i)
+        for i in range(count)
+    ]
+
+    # Caching is disabled for the sequential client so every check is a round trip, as
+    # it was when list endpoints checked each item in turn.
+    sequential_client = AuthorizationClient(LocalOpenFGA(), cache_ttl=0)
+    client = AuthorizationClient(LocalOpenFGA())
+
+    start = time.perf_counter()
+    sequential = [await sequential_client.check(*check) for check in checks]
+    sequential_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batched = await client.check_many(checks)
+    batched_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await client.check_many(checks)
+    cached_time = time.perf_counter() - start
+
+    assert sequential == batched
+
+    print(
+        f"{count} checks: "
+        f"sequential {sequential_time * 1000:.1f}ms, "
+        f"batched {batched_time * 1000:.1f}ms, "
+        f"cached {cached_time * 1000:.2f}ms, "
+        f"speedup {sequential_time / batched_time:.1f}x",
+    )
+
+
+def main():
+    for count in (10, 100, 1000):
+        asyncio.run(run(count))
+
+
+if __name__ == "__main__":
+    main()
@@ -70,6 +70,44 @@ class TestCheck:
         assert all(results)
 
 
+class TestCheckMany:
+    async def test_ok(self, authorization_client: AuthorizationClient, mocker):
+        """
+        Test that checks are returned in order, duplicates are only checked once, and
+        decisions are cached.
+        """
+        await authorization_client.add(
+            SpaceMembership("ryanf", 0, SpaceRole.MEMBER),
+            UserRoleAssignment("ryanf", 0, SpaceSubtractionRole.EDITOR),
+        )
+
+        spy = mocker.spy(authorization_client.openfga, "check")
+
+        checks = [
+            ("ryanf", Permission.UPDATE_SUBTRACTION, ResourceType.SPACE, 0),
+            ("ryanf", Permission.DELETE_PROJECT, ResourceType.SPACE, 0),
+            ("ryanf", Permission.UPDATE_SUBTRACTION, ResourceType.SPACE, 0),
+        ]
+
+        assert await authorization_client.check_many(checks) == [True, False, True]
+        assert await authorization_client.check_many(checks) == [True, False, True]
+
+        assert spy.call_count == 2
+
+    async def test_invalidated(self, authorization_client: AuthorizationClient):
+        """Test that adding a relationship invalidates cached decisions."""
+        check = ("ryanf", Permission.UPDATE_SUBTRACTION, ResourceType.SPACE, 0)
+
+        assert await authorization_client.check_many([check]) == [False]
+
+        await authorization_client.add(
+            SpaceMembership("ryanf", 0, SpaceRole.MEMBER),
+            UserRoleAssignment("ryanf", 0, SpaceSubtractionRole.EDITOR),
+        )
+
+        assert await authorization_client.check_many([check]) == [True]
+
+
 async def test_list_space_base_roles(authorization_client: AuthorizationClient):
     await authorization_client.add(
         SpaceRoleAssignment(0, SpaceSubtractionRole.EDITOR),
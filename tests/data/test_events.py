@@ -1,16 +1,21 @@
 import asyncio
 
+import orjson
+import pytest
 from redis import Redis
 from virtool_core.models.basemodel import BaseModel
 
 from virtool.data.domain import DataLayerDomain
 from virtool.data.events import (
+    EventOverflowPolicy,
     EventPublisher,
     Operation,
+    configure_events,
     dangerously_clear_events,
     dangerously_get_event,
     emit,
     emits,
+    get_event_metrics,
     listen_for_events,
 )
 
@@ -84,3 +89,173 @@ async def test_publish_and_listen(loop, redis: Redis):
 
     task.cancel()
     await task
+
+
+class Resource(BaseModel):
+    id: str
+    name: str
+
+
+async def test_publish_coalesced(mocker):
+    """Test that updates to the same resource within the coalescing window are
+    coalesced and that the remaining events are published in batches.
+    """
+    dangerously_clear_events()
+
+    redis = mocker.Mock(publish=mocker.AsyncMock())
+
+    publisher = EventPublisher(redis, window=0, batch_size=2)
+
+    emit(Resource(id="foo", name="Foo"), "example", "create", Operation.CREATE)
+
+    for name in ("Bar", "Baz", "Qux"):
+        emit(Resource(id="foo", name=name), "example", "update", Operation.UPDATE)
+
+    emit(Resource(id="bar", name="Bar"), "example", "update", Operation.UPDATE)
+
+    events = await publisher._collect()
+
+    assert [(event.operation, event.data.name) for event in events] == [
+        (Operation.CREATE, "Foo"),
+        (Operation.UPDATE, "Qux"),
+        (Operation.UPDATE, "Bar"),
+    ]
+
+    await publisher._publish(events[:2])
+
+    message = orjson.loads(redis.publish.call_args[0][1])
+
+    assert [event["payload"]["data"]["name"] for event in message["events"]] == [
+        "Foo",
+        "Qux",
+    ]
+
+
+@pytest.fixture
+def small_event_queue():
+    dangerously_clear_events()
+    configure_events(max_size=50, policy=EventOverflowPolicy.BLOCK, block_timeout=5)
+
+    yield
+
+    configure_events()
+    dangerously_clear_events()
+
+
+async def test_emit_full(small_event_queue):
+    """Test that ``emit()`` merges updates to the same resource and drops other events
+    when the queue is full.
+    """
+    for i in range(50):
+        emit(Resource(id=str(i), name="Foo"), "example", "create", Operation.CREATE)
+
+    emit(Resource(id="foo", name="Foo"), "example", "create", Operation.CREATE)
+
+    assert get_event_metrics()["depth"] == 50
+    assert get_event_metrics()["dropped"] == 1
+
+    await dangerously_get_event()
+
+    emit(Resource(id="foo", name="Foo"), "example", "update", Operation.UPDATE)
+    emit(Resource(id="foo", name="Bar"), "example", "update", Operation.UPDATE)
+
+    assert get_event_metrics() == {
+        "depth": 50,
+        "dropped": 1,
+        "merged": 1,
+        "publish_latency": 0.0,
+        "spilled": 0,
+    }
+
+
+async def test_emit_spill(mocker, small_event_queue):
+    """Test that events that don't fit in the queue are added to the event stream
+    when the overflow policy is ``SPILL``.
+    """
+    stream = mocker.Mock(add=mocker.AsyncMock())
+
+    configure_events(max_size=50, policy=EventOverflowPolicy.SPILL, stream=stream)
+
+    class Example(DataLayerDomain):
+        name = "example"
+
+        @emits(Operation.CREATE)
+        async def create(self, i: int):
+            return Resource(id=f"create_{i}", name="Foo")
+
+    for i in range(50):
+        emit(Resource(id=str(i), name="Foo"), "example", "create", Operation.CREATE)
+
+    emit(Resource(id="foo", name="Foo"), "example", "create", Operation.CREATE)
+
+    # Events spilled by ``emit()`` are added to the stream in the background.
+    await asyncio.sleep(0)
+
+    await Example().create(0)
+
+    assert [
+        orjson.loads(call.args[0][0])["payload"]["data"]["id"]
+        for call in stream.add.call_args_list
+    ] == ["foo", "create_0"]
+
+    assert get_event_metrics() == {
+        "depth": 50,
+        "dropped": 0,
+        "merged": 0,
+        "publish_latency": 0.0,
+        "spilled": 2,
+    }
+
+
+async def test_bulk_emit(mocker, small_event_queue):
+    """Test that a burst of emits much larger than the queue is published without
+    dropping events when emitters wait for space.
+    """
+
+    class Example(DataLayerDomain):
+        name = "example"
+
+        @emits(Operation.CREATE)
+        async def create(self, i: int):
+            return Resource(id=f"create_{i}", name="Foo")
+
+        @emits(Operation.UPDATE)
+        async def update(self, i: int, name: str):
+            return Resource(id=f"update_{i}", name=name)
+
+    redis = mocker.Mock(publish=mocker.AsyncMock())
+
+    publisher = asyncio.create_task(
+        EventPublisher(redis, window=0.001, batch_size=100).run(),
+    )
+
+    example = Example()
+
+    await asyncio.gather(
+        *[example.create(i) for i in range(2000)],
+        *[example.update(i % 100, str(i)) for i in range(2000)],
+    )
+
+    while get_event_metrics()["depth"]:
+        await asyncio.sleep(0.01)
+
+    await asyncio.sleep(0.01)
+
+    publisher.cancel()
+    await publisher
+
+    published = [
+        event
+        for call in redis.publish.call_args_list
+        for event in orjson.loads(call.args[1])["events"]
+    ]
+
+    assert get_event_metrics()["dropped"] == 0
+    assert len([e for e in published if e["operation"] == "create"]) == 2000
+    assert {
+        e["payload"]["data"]["id"] for e in published if e["operation"] == "update"
+    } == {f"update_{i}" for i in range(100)}
+    assert all(
+        len(orjson.loads(call.args[1])["events"]) <= 100
+        for call in redis.publish.call_args_list
+    )
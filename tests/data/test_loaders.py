@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from virtool.data.loaders import DataLoader, get_loaders, loader_scope
+from virtool.data.transforms import AbstractTransform, apply_transforms
+from virtool.types import Document
+
+
+@pytest.fixture
+def batch_load(mocker):
+    async def func(keys: list[str]) -> dict[str, str]:
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    return mocker.AsyncMock(side_effect=func)
+
+
+async def test_load(batch_load):
+    """Test that keys requested in the same tick are loaded in one batch without
+    duplicates, and that missing keys load as ``None``.
+    """
+    loader = DataLoader(batch_load)
+
+    results = await asyncio.gather(
+        loader.load("foo"),
+        loader.load_many(["bar", "foo", "missing"]),
+    )
+
+    assert results == ["FOO", ["BAR", "FOO", None]]
+
+    batch_load.assert_called_once_with(["foo", "bar", "missing"])
+
+    assert await loader.load("bar") == "BAR"
+    assert loader.batch_count == 1
+
+
+async def test_load_error(mocker):
+    """Test that keys in a failed batch raise the error and are retried when requested
+    again.
+    """
+    batch_load = mocker.AsyncMock(side_effect=[ValueError("failed"), {"foo": "FOO"}])
+
+    loader = DataLoader(batch_load)
+
+    with pytest.raises(ValueError):
+        await loader.load("foo")
+
+    assert await loader.load("foo") == "FOO"
+
+
+class AttachUpperTransform(AbstractTransform):
+    def __init__(self, batch_load, field: str):
+        self._batch_load = batch_load
+        self._field = field
+
+    async def attach_one(self, document: Document, prepared: str) -> Document:
+        return {**document, self._field: prepared}
+
+    async def prepare_one(self, document: Document) -> str:
+        return await get_loaders().get("upper", self._batch_load).load(document["key"])
+
+    async def prepare_many(self, documents: list[Document]) -> dict[int, str]:
+        values = await get_loaders().get("upper", self._batch_load).load_many(
+            [document["key"] for document in documents],
+        )
+
+        return {document["id"]: value for document, value in zip(documents, values)}
+
+
+async def test_apply_transforms(batch_load):
+    """Test that transforms applied together share a loader and that values are not
+    cached once the scope exits.
+    """
+    transforms = [
+        AttachUpperTransform(batch_load, "a"),
+        AttachUpperTransform(batch_load, "b"),
+    ]
+
+    documents = [{"id": i, "key": key} for i, key in enumerate(["foo", "bar", "foo"])]
+
+    assert await apply_transforms(documents, transforms) == [
+        {"id": 0, "key": "foo", "a": "FOO", "b": "FOO"},
+        {"id": 1, "key": "bar", "a": "BAR", "b": "BAR"},
+        {"id": 2, "key": "foo", "a": "FOO", "b": "FOO"},
+    ]
+
+    assert batch_load.call_count == 1
+
+    await apply_transforms(documents[0], transforms)
+
+    assert batch_load.call_count == 2
+
+
+async def test_loader_scope():
+    """Test that nested scopes share the outermost registry."""
+    with loader_scope() as outer:
+        with loader_scope() as inner:
+            assert inner is outer
+            assert get_loaders() is outer
+
+    assert get_loaders() is not outer
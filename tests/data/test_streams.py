@@ -0,0 +1,171 @@
+import asyncio
+
+import pytest
+from redis.asyncio import Redis as RedisClient
+from virtool_core.models.basemodel import BaseModel
+from virtool_core.redis import Redis
+
+from virtool.api.custom_json import dump_string
+from virtool.data.events import (
+    EventPublisher,
+    Operation,
+    dangerously_clear_events,
+    emit,
+    listen_for_events,
+    replay_events,
+)
+from virtool.data.streams import (
+    EVENT_STREAM_KEY,
+    EventStream,
+    compare_stream_ids,
+    create_consumer_name,
+)
+
+
+class Streamed(BaseModel):
+    id: str
+    name: str
+
+
+@pytest.fixture
+async def stream(redis: Redis, redis_connection_string: str):
+    stream = EventStream(redis_connection_string, max_length=1000)
+
+    yield stream
+
+    await stream.close()
+
+
+async def test_publish_and_listen(redis: Redis, stream: EventStream):
+    """Test that events published to the stream are received by a consumer group with
+    their stream IDs.
+    """
+    dangerously_clear_events()
+
+    task = asyncio.create_task(EventPublisher(redis, window=0, stream=stream).run())
+
+    emit(Streamed(id="foo", name="Foo"), "example", "create", Operation.CREATE)
+
+    async for event in listen_for_events(redis, stream, "test", "consumer"):
+        assert event.data == Streamed(id="foo", name="Foo")
+        assert event.domain == "example"
+        assert event.operation == Operation.CREATE
+        assert event.stream_id
+
+        break
+
+    task.cancel()
+    await task
+
+
+async def test_close(redis: Redis, redis_connection_string: str):
+    """Test that consumer groups created by a stream are destroyed when it is closed."""
+    stream = EventStream(redis_connection_string, max_length=1000)
+    consumer = create_consumer_name()
+
+    reader = stream.read_group(f"test:{consumer}", consumer, block=100)
+
+    # The group is created at the end of the stream, so only add the event once the
+    # reader has started.
+    task = asyncio.create_task(anext(reader))
+    await asyncio.sleep(0.1)
+
+    await stream.add([dump_string({"foo": "bar"})])
+    await task
+    await reader.aclose()
+
+    client = RedisClient.from_url(redis_connection_string, decode_responses=True)
+
+    assert f"test:{consumer}" in [
+        group["name"] for group in await client.xinfo_groups(EVENT_STREAM_KEY)
+    ]
+
+    await stream.close()
+
+    assert f"test:{consumer}" not in [
+        group["name"] for group in await client.xinfo_groups(EVENT_STREAM_KEY)
+    ]
+
+    await client.aclose()
+
+
+async def test_prune_groups(redis: Redis, redis_connection_string: str):
+    """Test that consumer groups whose consumers have all been idle for too long are
+    destroyed and that active groups are kept.
+    """
+    stream = EventStream(redis_connection_string, max_length=1000)
+
+    client = RedisClient.from_url(redis_connection_string, decode_responses=True)
+
+    for group in ("abandoned", "active", "empty"):
+        await client.xgroup_create(EVENT_STREAM_KEY, group, id="$", mkstream=True)
+
+    await stream.add([dump_string({"foo": "bar"})])
+
+    # Leave an unacknowledged event with the abandoned consumer.
+    await client.xreadgroup("abandoned", "consumer", {EVENT_STREAM_KEY: ">"})
+
+    await asyncio.sleep(0.2)
+
+    await client.xreadgroup("active", "consumer", {EVENT_STREAM_KEY: ">"})
+
+    await stream.prune_groups(max_idle=100)
+
+    assert sorted(
+        group["name"] for group in await client.xinfo_groups(EVENT_STREAM_KEY)
+    ) == ["active", "empty"]
+
+    for group in ("active", "empty"):
+        await client.xgroup_destroy(EVENT_STREAM_KEY, group)
+
+    await stream.close()
+    await client.aclose()
+
+
+def test_create_consumer_name():
+    """Test that consumer names are unique within a process."""
+    assert create_consumer_name() != create_consumer_name()
+
+
+async def test_replay(stream: EventStream):
+    """Test that events added after an ID are replayed and that the replay is marked
+    incomplete if there are more events than requested.
+    """
+    ids = await stream.add(
+        [
+            dump_string(
+                {
+                    "domain": "example",
+                    "name": "update",
+                    "operation": "update",
+                    "payload": {
+                        "data": {"id": "foo", "name": name},
+                        "model": "Streamed",
+                    },
+                    "timestamp": "2024-01-01T00:00:00Z",
+                },
+            )
+            for name in ("Foo", "Bar", "Baz")
+        ],
+    )
+
+    events, complete = await replay_events(stream, ids[0], 5)
+
+    assert complete is True
+    assert [event.data.name for event in events] == ["Bar", "Baz"]
+    assert [event.stream_id for event in events] == ids[1:]
+
+    events, complete = await replay_events(stream, ids[0], 1)
+
+    assert complete is False
+    assert [event.data.name for event in events] == ["Bar"]
+
+
+@pytest.mark.parametrize(
+    "a,b,expected",
+    [("1-0", "1-0", 0), ("1-1", "1-0", 1), ("1-9", "2-0", -1), ("10-0", "9-5", 1)],
+)
+def test_compare_stream_ids(a: str, b: str, expected: int):
+    result = compare_stream_ids(a, b)
+
+    assert (result > 0) - (result < 0) == expected
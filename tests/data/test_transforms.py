@@ -0,0 +1,63 @@
+import asyncio
+
+from virtool.data.transforms import (
+    AbstractTransform,
+    apply_transforms,
+    get_transform_metrics,
+)
+from virtool.types import Document
+
+
+class AttachSquareTransform(AbstractTransform):
+    """A transform that tracks how many documents it is preparing at once."""
+
+    concurrency = 3
+
+    def __init__(self):
+        self.running = 0
+        self.max_running = 0
+
+    async def attach_one(self, document: Document, prepared: int) -> Document:
+        return {**document, "square": prepared}
+
+    async def prepare_one(self, document: Document) -> int:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+
+        # Later documents finish first to check that order is preserved.
+        await asyncio.sleep(0.001 * (10 - document["id"]))
+
+        self.running -= 1
+
+        return document["id"] ** 2
+
+
+async def test_apply_transforms():
+    """Test that the default ``prepare_many`` prepares documents concurrently up to the
+    transform's limit, preserves order, and records metrics.
+    """
+    transform = AttachSquareTransform()
+
+    before = get_transform_metrics().get("AttachSquareTransform", {})
+
+    documents = [{"id": i} for i in range(10)]
+
+    assert await apply_transforms(documents, [transform]) == [
+        {"id": i, "square": i**2} for i in range(10)
+    ]
+
+    assert transform.max_running == 3
+
+    await apply_transforms({"id": 4}, [transform])
+
+    metrics = get_transform_metrics()["AttachSquareTransform"]
+
+    assert metrics["prepare_count"] - before.get("prepare_count", 0) == 2
+    assert metrics["document_count"] - before.get("document_count", 0) == 11
+    assert (
+        metrics["unbatched_document_count"]
+        - before.get("unbatched_document_count", 0)
+        == 10
+    )
+    assert metrics["prepare_seconds"] > 0
+    assert metrics["attach_seconds"] > 0
@@ -1,3 +1,4 @@
+import pickle
 from pathlib import Path
 
 import arrow
@@ -95,3 +96,19 @@ def static_time(mocker: MockerFixture, static_time_obj: StaticTime) -> StaticTim
 @pytest.fixture()
 def example_path() -> Path:
     return virtool_example_path
+
+
+@pytest.fixture()
+def run_in_process():
+    """A stand-in for ``app["run_in_process"]``.
+
+    The function, arguments, and return value are round-tripped through :mod:`pickle`
+    like they would be when sent to the process pool, but the function is run in the
+    current process.
+    """
+
+    async def func(fn, *args):
+        fn, args = pickle.loads(pickle.dumps((fn, args)))
+        return pickle.loads(pickle.dumps(fn(*args)))
+
+    return func
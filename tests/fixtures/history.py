@@ -1,6 +1,16 @@
 import pytest
 import datetime
 
+from virtool.history.cache import patched_otu_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_patched_otu_cache():
+    """Make sure patched OTUs cached by one test are not seen by another."""
+    patched_otu_cache.clear()
+    yield
+    patched_otu_cache.clear()
+
 
 @pytest.fixture
 def test_change(static_time):
@@ -0,0 +1,114 @@
+import asyncio
+import pickle
+
+import pytest
+
+from virtool.history.cache import PatchedOTUCache
+
+
+def make_loader(calls: list, value: dict | None):
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0)
+        return value
+
+    return load
+
+
+async def test_get():
+    """Test that a patched OTU is only loaded once and every caller gets a copy."""
+    cache = PatchedOTUCache()
+    calls = []
+
+    load = make_loader(calls, {"_id": "foo", "isolates": []})
+
+    first = await cache.get(("foo", 2), load)
+    first["isolates"].append("bar")
+
+    assert await cache.get(("foo", 2), load) == {"_id": "foo", "isolates": []}
+    assert len(calls) == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+async def test_get_concurrent():
+    """Test that concurrent requests for the same key share one reconstruction."""
+    cache = PatchedOTUCache()
+    calls = []
+
+    load = make_loader(calls, {"_id": "foo"})
+
+    results = await asyncio.gather(*[cache.get(("foo", 2), load) for _ in range(5)])
+
+    assert results == [{"_id": "foo"}] * 5
+    assert len(calls) == 1
+    assert cache.misses == 1
+
+
+async def test_get_error():
+    """Test that a failed reconstruction is not cached."""
+    cache = PatchedOTUCache()
+
+    async def load():
+        raise ValueError("Boom")
+
+    with pytest.raises(ValueError):
+        await cache.get(("foo", 2), load)
+
+    assert ("foo", 2) not in cache
+    assert await cache.get(("foo", 2), make_loader([], {"_id": "foo"})) == {
+        "_id": "foo"
+    }
+
+
+async def test_eviction():
+    """Test that the least recently used OTUs are evicted to stay within budget."""
+    otu = {"_id": "foo", "sequence": "ATGC" * 10}
+    size = len(pickle.dumps(otu, protocol=pickle.HIGHEST_PROTOCOL))
+
+    cache = PatchedOTUCache(max_bytes=size * 2)
+
+    await cache.get(("foo", 1), make_loader([], otu))
+    await cache.get(("foo", 2), make_loader([], otu))
+
+    # Use version 1 so version 2 becomes the least recently used.
+    await cache.get(("foo", 1), make_loader([], otu))
+    await cache.get(("foo", 3), make_loader([], otu))
+
+    assert ("foo", 1) in cache
+    assert ("foo", 2) not in cache
+    assert ("foo", 3) in cache
+    assert cache.evictions == 1
+    assert cache.size == size * 2
+
+
+async def test_invalidate_in_progress():
+    """Test that an OTU reconstructed while the cache is invalidated is not cached."""
+    cache = PatchedOTUCache()
+
+    async def load():
+        cache.invalidate("foo")
+        return {"_id": "foo"}
+
+    assert await cache.get(("foo", 1), load) == {"_id": "foo"}
+    assert ("foo", 1) not in cache
+
+    generation = cache.generation
+    cache.invalidate("foo")
+    cache.put(("foo", 1), {"_id": "foo"}, generation)
+
+    assert ("foo", 1) not in cache
+
+
+async def test_invalidate():
+    cache = PatchedOTUCache()
+
+    await cache.get(("foo", 1), make_loader([], {"_id": "foo"}))
+    await cache.get(("bar", 1), make_loader([], {"_id": "bar"}))
+
+    cache.invalidate("foo")
+
+    assert ("foo", 1) not in cache
+    assert ("bar", 1) in cache
+    assert cache.size == len(
+        pickle.dumps({"_id": "bar"}, protocol=pickle.HIGHEST_PROTOCOL),
+    )
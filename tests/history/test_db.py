@@ -6,6 +6,7 @@ from syrupy import SnapshotAssertion
 from virtool_core.models.enums import HistoryMethod
 
 import virtool.history.db
+from virtool.history.utils import remove_otu_snapshot_files
 from virtool.mongo.core import Mongo
 
 
@@ -151,3 +152,153 @@ async def test_patch_to_version(
     assert current == snapshot
     assert patched == snapshot
     assert reverted_change_ids == snapshot
+
+
+async def test_patch_to_version_from_snapshot(
+    create_mock_history,
+    data_path: Path,
+    mocker,
+    mongo: Mongo,
+):
+    """Test that patching from a snapshot gives the same result as replaying every
+    change from the current OTU, while only reverting changes below the snapshot.
+    """
+    mocker.patch("virtool.history.utils.SNAPSHOT_INTERVAL", 2)
+
+    await create_mock_history(remove=False)
+
+    assert await virtool.history.db.write_snapshots(data_path, mongo, "6116cba1") == 1
+    assert (data_path / "history" / "6116cba1_2.snapshot.json").exists()
+
+    # Snapshots that already exist are not written again.
+    assert await virtool.history.db.write_snapshots(data_path, mongo, "6116cba1") == 0
+
+    # Fields that aren't recorded in history should come from the current OTU.
+    await mongo.otus.update_one(
+        {"_id": "6116cba1"},
+        {"$set": {"last_indexed_version": 3}},
+    )
+
+    spy = mocker.spy(virtool.history.db, "revert_change")
+
+    result = await virtool.history.db.patch_to_version(data_path, mongo, "6116cba1", 1)
+
+    assert spy.call_count == 1
+    assert result[1]["last_indexed_version"] == 3
+
+    await remove_otu_snapshot_files(data_path, ["6116cba1"])
+
+    assert not (data_path / "history" / "6116cba1_2.snapshot.json").exists()
+    assert result == await virtool.history.db.patch_to_version(
+        data_path,
+        mongo,
+        "6116cba1",
+        1,
+    )
+
+
+async def test_write_snapshots_removed(
+    create_mock_history,
+    data_path: Path,
+    mocker,
+    mongo: Mongo,
+):
+    """Test that no snapshots are written for a removed OTU."""
+    mocker.patch("virtool.history.utils.SNAPSHOT_INTERVAL", 2)
+
+    await create_mock_history(remove=True)
+
+    assert await virtool.history.db.write_snapshots(data_path, mongo, "6116cba1") == 0
+    assert not (data_path / "history" / "6116cba1_2.snapshot.json").exists()
+
+
+@pytest.mark.parametrize("in_process", [True, False])
+@pytest.mark.parametrize("remove", [True, False])
+@pytest.mark.parametrize("snapshots", [True, False])
+async def test_bulk_patch_to_version(
+    in_process: bool,
+    remove: bool,
+    snapshots: bool,
+    create_mock_history,
+    data_path: Path,
+    mocker,
+    mongo: Mongo,
+    run_in_process,
+):
+    """Test that bulk patching gives the same OTUs as patching each version alone,
+    whether the changes are applied in the current process or the process pool.
+    """
+    mocker.patch("virtool.history.utils.SNAPSHOT_INTERVAL", 2)
+
+    await create_mock_history(remove=remove)
+
+    if snapshots:
+        await virtool.history.db.write_snapshots(data_path, mongo, "6116cba1")
+
+    otu_versions = [("6116cba1", version) for version in (3, 2, 1, 0)]
+
+    expected = {}
+
+    for otu_id, version in otu_versions:
+        _, patched, _ = await virtool.history.db.patch_to_version(
+            data_path,
+            mongo,
+            otu_id,
+            version,
+        )
+
+        expected[(otu_id, version)] = patched
+
+    m_find = mocker.spy(mongo.history, "find")
+
+    assert (
+        await virtool.history.db.bulk_patch_to_version(
+            data_path,
+            mongo,
+            otu_versions,
+            run_in_process if in_process else None,
+        )
+        == expected
+    )
+
+    # One query for the change timestamps and one for the changes to revert.
+    assert m_find.call_count == 2
+
+    # All versions are now cached, so only the change timestamps are queried.
+    assert (
+        await virtool.history.db.bulk_patch_to_version(data_path, mongo, otu_versions)
+        == expected
+    )
+
+    assert m_find.call_count == 3
+
+
+async def test_get_patched_otu_reused_version(
+    create_mock_history,
+    data_path: Path,
+    mocker,
+    mongo: Mongo,
+):
+    """Test that a cached version is not served once its version number has been
+    reused after a revert, even if the revert happened in another process.
+    """
+    await create_mock_history(remove=False)
+
+    await virtool.history.db.get_patched_otu(data_path, mongo, "6116cba1", 1)
+
+    spy = mocker.spy(virtool.history.db, "patch_to_version")
+
+    await virtool.history.db.get_patched_otu(data_path, mongo, "6116cba1", 1)
+
+    assert spy.call_count == 0
+
+    # A change that reuses the version number has a new creation time.
+    await mongo.history.update_one(
+        {"_id": "6116cba1.1"},
+        {"$set": {"created_at": datetime.datetime(2020, 1, 1)}},
+    )
+
+    await virtool.history.db.get_patched_otu(data_path, mongo, "6116cba1", 1)
+    await virtool.history.db.get_patched_otu(data_path, mongo, "6116cba1", 1)
+
+    assert spy.call_count == 1
@@ -13,8 +13,12 @@ from virtool.history.utils import (
     json_encoder,
     json_object_hook,
     read_diff_file,
+    remove_change_files,
     remove_diff_files,
+    remove_otu_snapshot_files,
+    restore_snapshot,
     write_diff_file,
+    write_snapshot_file,
 )
 
 TEST_DIFF_PATH = Path.cwd() / "tests" / "test_files" / "diff.json"
@@ -248,6 +252,71 @@ async def test_remove_diff_files(loop, tmp_path, config):
     assert os.listdir(history_dir) == ["bar_1.json"]
 
 
+async def test_remove_change_files(tmp_path):
+    """
+    Test that diff and snapshot files are removed for the passed change IDs and that
+    missing files are ignored.
+
+    """
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+
+    history_dir.joinpath("foo_0.json").write_text("hello world")
+    history_dir.joinpath("foo_50.json").write_text("hello world")
+    history_dir.joinpath("foo_50.snapshot.json").write_text("hello world")
+    history_dir.joinpath("bar_0.json").write_text("hello world")
+
+    await remove_change_files(tmp_path, ["foo.0", "foo.50", "baz.1"])
+
+    assert os.listdir(history_dir) == ["bar_0.json"]
+
+
+async def test_remove_otu_snapshot_files(tmp_path):
+    """
+    Test that every snapshot file is removed for the passed OTU IDs and that diff files
+    are kept.
+
+    """
+    history_dir = tmp_path / "history"
+    history_dir.mkdir()
+
+    history_dir.joinpath("foo_25.json").write_text("hello world")
+    history_dir.joinpath("foo_25.snapshot.json").write_text("hello world")
+    history_dir.joinpath("foo_50.snapshot.json").write_text("hello world")
+    history_dir.joinpath("bar_25.snapshot.json").write_text("hello world")
+
+    await remove_otu_snapshot_files(tmp_path, ["foo", "baz"])
+
+    assert sorted(os.listdir(history_dir)) == ["bar_25.snapshot.json", "foo_25.json"]
+
+
+async def test_snapshot_excluded_fields(tmp_path):
+    """
+    Test that fields changed without history are left out of snapshots and taken from
+    the current OTU when a snapshot is restored.
+
+    """
+    tmp_path.joinpath("history").mkdir()
+
+    await write_snapshot_file(
+        tmp_path,
+        "foo",
+        25,
+        {"_id": "foo", "last_indexed_version": 2, "name": "Old", "version": 25},
+    )
+
+    snapshot = json.loads(
+        tmp_path.joinpath("history", "foo_25.snapshot.json").read_text()
+    )
+
+    assert snapshot == {"_id": "foo", "name": "Old", "version": 25}
+
+    assert restore_snapshot(
+        snapshot,
+        {"_id": "foo", "last_indexed_version": 7, "name": "New", "version": 30},
+    ) == {"_id": "foo", "last_indexed_version": 7, "name": "Old", "version": 25}
+
+
 async def test_write_diff_file(snapshot, tmp_path):
     """
     Test that a diff file is written correctly.
@@ -2,6 +2,7 @@ import asyncio
 import filecmp
 import gzip
 import json
+import math
 import os
 import shutil
 from datetime import timedelta
@@ -20,7 +21,7 @@ from tests.fixtures.client import ClientSpawner, JobClientSpawner
 from virtool.config import get_config_from_app
 from virtool.data.utils import get_data_from_app
 from virtool.fake.next import DataFaker
-from virtool.indexes.db import INDEX_FILE_NAMES
+from virtool.indexes.db import INDEX_FILE_NAMES, INDEX_JSON_BATCH_SIZE
 from virtool.indexes.files import create_index_file
 from virtool.indexes.models import SQLIndexFile
 from virtool.indexes.utils import check_index_file_type
@@ -258,9 +259,14 @@ async def test_download_otus_json(
     with gzip.open(OTUS_JSON_PATH, "rt") as f:
         expected = json.load(f)
 
-    m_get_patched_otus = mocker.patch(
-        "virtool.indexes.db.get_patched_otus",
-        make_mocked_coro(expected),
+    otus_by_id = {otu["_id"]: otu for otu in expected}
+
+    async def bulk_patch_to_version(data_path, mongo, otu_versions):
+        return {(otu_id, v): otus_by_id[otu_id] for otu_id, v in otu_versions}
+
+    m_bulk_patch_to_version = mocker.patch(
+        "virtool.history.db.bulk_patch_to_version",
+        side_effect=bulk_patch_to_version,
     )
 
     client = await spawn_job_client(authenticated=True)
@@ -271,7 +277,7 @@ async def test_download_otus_json(
     if file_exists:
         shutil.copy(OTUS_JSON_PATH, index_dir / "otus.json.gz")
 
-    manifest = {"foo": 2, "bar": 1, "bad": 5}
+    manifest = {otu["_id"]: otu["version"] for otu in expected}
 
     await mongo.indexes.insert_one(
         {"_id": "bar", "manifest": manifest, "reference": {"id": "foo"}},
@@ -284,13 +290,16 @@ async def test_download_otus_json(
     assert resp.status == 200
     assert expected == result
 
-    if not file_exists:
-        m_get_patched_otus.assert_called_with(
-            get_mongo_from_app(client.app),
-            get_config_from_app(client.app),
-            manifest,
+    if file_exists:
+        assert m_bulk_patch_to_version.call_count == 0
+    else:
+        # The OTUs are patched and written in batches.
+        assert m_bulk_patch_to_version.call_count == math.ceil(
+            len(manifest) / INDEX_JSON_BATCH_SIZE,
         )
 
+        assert not list(index_dir.glob("*.tmp"))
+
 
 class TestCreate:
     async def test(
@@ -1,3 +1,7 @@
+import gzip
+import json
+from pathlib import Path
+
 import pytest
 from aiohttp.test_utils import make_mocked_coro
 from pytest_mock import MockerFixture
@@ -10,8 +14,8 @@ from virtool.indexes.db import (
     attach_files,
     get_current_id_and_version,
     get_next_version,
-    get_patched_otus,
     update_last_indexed_versions,
+    write_patched_otus_json,
 )
 from virtool.indexes.models import SQLIndexFile
 from virtool.mongo.core import Mongo
@@ -85,25 +89,38 @@ async def test_get_next_version(empty, has_ref, test_indexes, mongo):
     assert await get_next_version(mongo, "hxn167" if has_ref else "foobar") == expected
 
 
-async def test_get_patched_otus(config: Config, mocker: MockerFixture, mongo: Mongo):
-    m = mocker.patch(
-        "virtool.history.db.patch_to_version",
-        make_mocked_coro((None, {"_id": "foo"}, None)),
+@pytest.mark.parametrize("batch_size", [1, 2, 10])
+async def test_write_patched_otus_json(
+    batch_size: int,
+    config: Config,
+    data_path: Path,
+    mocker: MockerFixture,
+    mongo: Mongo,
+):
+    """Test that batched OTUs are written as a single gzipped JSON array."""
+
+    async def bulk_patch_to_version(data_path, mongo, otu_versions):
+        return {(otu_id, v): {"_id": otu_id, "version": v} for otu_id, v in otu_versions}
+
+    mocker.patch(
+        "virtool.history.db.bulk_patch_to_version",
+        side_effect=bulk_patch_to_version,
     )
 
     manifest = {"foo": 2, "bar": 10, "baz": 4}
 
-    patched_otus = await get_patched_otus(mongo, config, manifest)
+    target = data_path / "references" / "ref" / "index" / "otus.json.gz"
 
-    assert list(patched_otus) == [{"_id": "foo"}, {"_id": "foo"}, {"_id": "foo"}]
+    await write_patched_otus_json(mongo, config, manifest, target, batch_size)
 
-    m.assert_has_calls(
-        [
-            mocker.call(config.data_path, mongo, "foo", 2),
-            mocker.call(config.data_path, mongo, "bar", 10),
-            mocker.call(config.data_path, mongo, "baz", 4),
-        ],
-    )
+    with gzip.open(target, "rt") as f:
+        assert json.load(f) == [
+            {"_id": "foo", "version": 2},
+            {"_id": "bar", "version": 10},
+            {"_id": "baz", "version": 4},
+        ]
+
+    assert [path.name for path in target.parent.iterdir()] == ["otus.json.gz"]
 
 
 async def test_update_last_indexed_versions(
@@ -318,6 +318,87 @@ class TestPing:
         assert resp.status == 404
 
 
+class TestPushUpdates:
+    async def test_ok(self, fake: DataFaker, mongo: Mongo, spawn_job_client):
+        """Test that pings and status updates for multiple jobs can be pushed in one
+        request without a job authorization header.
+        """
+        client = await spawn_job_client(authenticated=False)
+
+        user = await fake.users.create()
+
+        running = await fake.jobs.create(user, state=JobState.WAITING)
+        finished = await fake.jobs.create(user, state=JobState.COMPLETE)
+
+        resp = await client.patch(f"/jobs/{running.id}", json={"acquired": True})
+        key = (await resp.json())["key"]
+
+        resp = await client.post(
+            "/jobs/updates",
+            {
+                "pings": [
+                    {"job_id": running.id, "key": key},
+                    {"job_id": "missing", "key": key},
+                ],
+                "statuses": [
+                    {
+                        "job_id": running.id,
+                        "key": key,
+                        "progress": 40,
+                        "stage": "build",
+                        "state": "running",
+                    },
+                    {
+                        "job_id": finished.id,
+                        "key": key,
+                        "progress": 40,
+                        "stage": "build",
+                        "state": "running",
+                    },
+                ],
+            },
+        )
+
+        assert resp.status == 200
+        assert await resp.json() == {
+            "pings": [
+                {"job_id": running.id, "outcome": "applied"},
+                {"job_id": "missing", "outcome": "unauthorized"},
+            ],
+            "statuses": [
+                {"job_id": running.id, "outcome": "applied"},
+                {"job_id": finished.id, "outcome": "unauthorized"},
+            ],
+        }
+
+        document = await mongo.jobs.find_one(running.id)
+
+        assert document["ping"] is not None
+        assert document["progress"] == 40
+        assert document["state"] == "running"
+
+    async def test_missing_error(self, spawn_job_client):
+        """Test that a 400 is returned when an error status has no error details."""
+        client = await spawn_job_client(authenticated=False)
+
+        resp = await client.post(
+            "/jobs/updates",
+            {
+                "statuses": [
+                    {
+                        "job_id": "foo",
+                        "key": "bar",
+                        "progress": 40,
+                        "stage": "build",
+                        "state": "error",
+                    },
+                ],
+            },
+        )
+
+        assert resp.status == 400
+
+
 @pytest.mark.parametrize(
     "error",
     [None, 404, "409_complete", "409_errored", "409_cancelled"],
@@ -10,6 +10,11 @@ def public_test_route(request: aiohttp.web.Request):
     return aiohttp.web.Response(status=200)
 
 
+@test_routes.post("/jobs/{job_id}")
+def post_test_route(request: aiohttp.web.Request):
+    return aiohttp.web.Response(status=200)
+
+
 @test_routes.get("/not_public")
 def non_public_test_route(request: aiohttp.web.Request):
     return aiohttp.web.Response(status=200)
@@ -28,6 +33,15 @@ async def test_public_routes_are_public(mongo: Mongo, spawn_job_client):
     assert response.status == 200
 
 
+async def test_post_routes_are_not_public(spawn_job_client):
+    """Test that ``POST /jobs/updates`` is the only public ``POST`` route."""
+    client = await spawn_job_client(authenticated=False, add_route_table=test_routes)
+
+    response = await client.post("/jobs/test_job")
+
+    assert response.status == 401
+
+
 async def test_unauthorized_when_header_missing(spawn_job_client):
     client = await spawn_job_client(authenticated=False, add_route_table=test_routes)
 
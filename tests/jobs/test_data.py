@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from unittest.mock import call
 
@@ -7,9 +8,11 @@ from sqlalchemy.ext.asyncio import AsyncEngine
 from syrupy.matchers import path_type
 from virtool_core.models.job import JobState
 
+from virtool.data.errors import ResourceConflictError, ResourceNotFoundError
 from virtool.fake.next import DataFaker
-from virtool.jobs.client import JobsClient
+from virtool.jobs.client import JobCancellationResult, JobsClient
 from virtool.jobs.data import JobsData
+from virtool.jobs.utils import JobPingUpdate, JobStatusUpdate, JobUpdateOutcome
 from virtool.jobs.utils import compose_status
 
 
@@ -127,7 +130,23 @@ async def test_force_delete_jobs(mongo, jobs_data: JobsData):
     assert await mongo.jobs.count_documents({}) == 0
 
 
-async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
+async def test_timeout(
+    fake: DataFaker,
+    mocker,
+    mongo,
+    pg: AsyncEngine,
+    snapshot,
+):
+    """Test that dead jobs are timed out in batches and that an update is emitted for
+    each timed out job.
+    """
+    jobs_data = JobsData(
+        mocker.Mock(spec=JobsClient),
+        mongo,
+        pg,
+        timeout_batch_size=1,
+    )
+
     user = await fake.users.create()
 
     now = arrow.utcnow()
@@ -138,8 +157,10 @@ async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
                 # Ok: Newer than 30 days.
                 {
                     "_id": "ok_new",
+                    "acquired": True,
                     "archived": False,
                     "args": {},
+                    "created_at": now.shift(days=-10).naive,
                     "ping": None,
                     "rights": {},
                     "state": JobState.RUNNING.value,
@@ -169,8 +190,10 @@ async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
                 # Ok: Pinged with the past 5 minutes.
                 {
                     "_id": "ok_ping",
+                    "acquired": True,
                     "archived": False,
                     "args": {},
+                    "created_at": now.shift(days=-10).naive,
                     "ping": {"pinged_at": now.shift(minutes=-1).naive},
                     "rights": {},
                     "state": JobState.RUNNING.value,
@@ -198,8 +221,10 @@ async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
                 # Ok: Not in running or preparing state.
                 {
                     "_id": "ok_state",
+                    "acquired": True,
                     "archived": False,
                     "args": {},
+                    "created_at": now.shift(days=-10).naive,
                     "ping": {"pinged_at": now.shift(minutes=-1).naive},
                     "rights": {},
                     "state": JobState.COMPLETE.value,
@@ -236,8 +261,10 @@ async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
                 # Bad: Older than 30 days.
                 {
                     "_id": "bad_old",
+                    "acquired": True,
                     "archived": False,
                     "args": {},
+                    "created_at": now.shift(days=-42).naive,
                     "ping": None,
                     "rights": {},
                     "state": JobState.RUNNING.value,
@@ -267,8 +294,10 @@ async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
                 # Bad: Pinged more than 5 minutes ago.
                 {
                     "_id": "bad_ping",
+                    "acquired": True,
                     "archived": False,
                     "args": {},
+                    "created_at": now.shift(days=-1).naive,
                     "ping": {"pinged_at": now.shift(minutes=-6).naive},
                     "rights": {},
                     "state": JobState.RUNNING.value,
@@ -299,8 +328,316 @@ async def test_timeout(fake: DataFaker, mongo, jobs_data: JobsData, snapshot):
             session=session,
         )
 
+    m_emit = mocker.patch("virtool.jobs.data.emit")
+
     await jobs_data.timeout()
 
+    assert sorted(c.args[0].id for c in m_emit.call_args_list) == [
+        "bad_old",
+        "bad_ping",
+    ]
+    assert {c.args[0].state for c in m_emit.call_args_list} == {JobState.TIMEOUT}
+
     jobs = await mongo.jobs.find({}, ["_id", "state", "status"]).to_list(None)
 
     assert jobs == snapshot(matcher=path_type({".*timestamp": (datetime,)}, regex=True))
+
+
+async def test_timeout_state_summary(fake: DataFaker, mocker, mongo, pg: AsyncEngine):
+    """Test that jobs are selected and updated using the ``state`` summary field, even
+    if it disagrees with the last status entry, and that full batches of jobs that
+    can't be updated don't stop the sweep from finishing.
+    """
+    jobs_data = JobsData(
+        mocker.Mock(spec=JobsClient),
+        mongo,
+        pg,
+        timeout_batch_size=1,
+    )
+
+    user = await fake.users.create()
+
+    now = arrow.utcnow()
+
+    await mongo.jobs.insert_one(
+        {
+            "_id": "foo",
+            "acquired": True,
+            "archived": False,
+            "args": {},
+            "created_at": now.shift(days=-1).naive,
+            "ping": {"pinged_at": now.shift(minutes=-6).naive},
+            "rights": {},
+            "state": JobState.RUNNING.value,
+            "status": [
+                {
+                    "state": JobState.PREPARING.value,
+                    "stage": "foo",
+                    "step_name": "foo",
+                    "step_description": "Foo a bar",
+                    "error": None,
+                    "progress": 0.33,
+                    "timestamp": now.shift(minutes=-10).naive,
+                },
+            ],
+            "user": {"id": user.id},
+            "workflow": "build_index",
+        },
+    )
+
+    m_emit = mocker.patch("virtool.jobs.data.emit")
+
+    await asyncio.wait_for(jobs_data.timeout(), 5)
+
+    assert [c.args[0].id for c in m_emit.call_args_list] == ["foo"]
+    assert await mongo.jobs.find_one("foo", ["state"]) == {
+        "_id": "foo",
+        "state": JobState.TIMEOUT.value,
+    }
+
+    # Simulate a job that changes state between being read and being written.
+    m_bulk_write = mocker.patch.object(
+        mongo.jobs,
+        "bulk_write",
+        mocker.AsyncMock(return_value=mocker.Mock(modified_count=0)),
+    )
+
+    await mongo.jobs.update_one(
+        {"_id": "foo"},
+        {"$set": {"state": JobState.RUNNING.value}},
+    )
+
+    await asyncio.wait_for(jobs_data.timeout(), 5)
+
+    assert m_bulk_write.call_count == 1
+
+
+async def test_counts(fake: DataFaker, jobs_data: JobsData, mongo):
+    """Test that stored job counts are kept in sync with job state changes and match a
+    full recount.
+    """
+    user = await fake.users.create()
+
+    jobs_data._client.cancel.return_value = JobCancellationResult.REMOVED_FROM_QUEUE
+
+    first = await jobs_data.create("build_index", {}, user.id)
+
+    assert await jobs_data._get_counts() == {"waiting": {"build_index": 1}}
+
+    second = await jobs_data.create("build_index", {}, user.id)
+    third = await jobs_data.create("create_sample", {}, user.id)
+
+    await jobs_data.acquire(first.id)
+    await jobs_data.push_status(first.id, JobState.RUNNING, "foo", progress=20)
+    await jobs_data.push_status(first.id, JobState.COMPLETE, "bar", progress=100)
+    await jobs_data.cancel(second.id)
+    await jobs_data.archive(second.id)
+    await jobs_data.acquire(third.id)
+
+    counts = {
+        "complete": {"build_index": 1},
+        "preparing": {"create_sample": 1},
+    }
+
+    assert await jobs_data._get_counts() == counts
+
+    await mongo.status.update_one(
+        {"_id": "job_counts"},
+        {"$inc": {"counts.running.build_index": 5}},
+    )
+
+    assert await jobs_data.reconcile_counts() == counts
+    assert await jobs_data._get_counts() == counts
+
+
+async def test_reconcile_counts_concurrent(
+    fake: DataFaker,
+    jobs_data: JobsData,
+    mocker,
+    mongo,
+):
+    """Test that job counts are recalculated when a job is counted while they are
+    being reconciled, so its increment isn't overwritten.
+    """
+    user = await fake.users.create()
+
+    assert await jobs_data.reconcile_counts() == {}
+
+    aggregate = mongo.jobs.aggregate
+    created = []
+
+    async def aggregate_then_create(*args, **kwargs):
+        async for result in aggregate(*args, **kwargs):
+            yield result
+
+        if not created:
+            created.append(await jobs_data.create("build_index", {}, user.id))
+
+    mocker.patch.object(mongo.jobs, "aggregate", aggregate_then_create)
+
+    counts = {"waiting": {"build_index": 1}}
+
+    assert await jobs_data.reconcile_counts() == counts
+    assert await jobs_data._get_counts() == counts
+
+
+async def test_push_status(fake: DataFaker, jobs_data: JobsData, mocker, mongo):
+    """Test that a status is pushed in a single write, that the emitted job includes
+    the user, and that finished and missing jobs are rejected.
+    """
+    user = await fake.users.create()
+
+    job = await jobs_data.create("build_index", {}, user.id)
+
+    await jobs_data.acquire(job.id)
+
+    m_find_one = mocker.spy(mongo.jobs, "find_one")
+    m_emit = mocker.patch("virtool.jobs.data.emit")
+
+    status = await jobs_data.push_status(job.id, JobState.RUNNING, "foo", progress=20)
+
+    assert status.state == JobState.RUNNING
+    assert status.stage == "foo"
+
+    emitted = m_emit.call_args[0][0]
+
+    assert emitted.progress == 20
+    assert emitted.state == JobState.RUNNING
+    assert emitted.user.handle == user.handle
+
+    await jobs_data.push_status(job.id, JobState.COMPLETE, "bar", progress=100)
+
+    assert m_find_one.call_count == 0
+
+    with pytest.raises(ResourceConflictError):
+        await jobs_data.push_status(job.id, JobState.RUNNING, "baz", progress=50)
+
+    with pytest.raises(ResourceNotFoundError):
+        await jobs_data.push_status("missing", JobState.RUNNING, "baz", progress=50)
+
+    document = await mongo.jobs.find_one(job.id, ["state", "status"])
+
+    assert document["state"] == "complete"
+    assert len(document["status"]) == 4
+
+
+async def test_push_updates(fake: DataFaker, jobs_data: JobsData, mocker, mongo):
+    """Test that pings and status updates from concurrent batches are written in one
+    bulk write and that unauthenticated updates and updates to finished jobs are
+    rejected.
+    """
+    user = await fake.users.create()
+
+    first = await jobs_data.acquire((await jobs_data.create("nuvs", {}, user.id)).id)
+    second = await jobs_data.acquire((await jobs_data.create("nuvs", {}, user.id)).id)
+
+    m_bulk_write = mocker.spy(mongo.jobs, "bulk_write")
+
+    def status(job_id: str, key: str, state: str, progress: int) -> JobStatusUpdate:
+        return JobStatusUpdate(
+            job_id=job_id,
+            key=key,
+            progress=progress,
+            stage="foo",
+            state=state,
+        )
+
+    first_result, second_result = await asyncio.gather(
+        jobs_data.push_updates(
+            [JobPingUpdate(job_id=first.id, key=first.key)],
+            [
+                status(first.id, first.key, "running", 20),
+                status(first.id, first.key, "complete", 100),
+                status(first.id, first.key, "running", 30),
+            ],
+        ),
+        jobs_data.push_updates(
+            [JobPingUpdate(job_id=second.id, key="wrong")],
+            [status(second.id, second.key, "running", 50)],
+        ),
+    )
+
+    assert [result.outcome for result in first_result.pings] == [
+        JobUpdateOutcome.APPLIED,
+    ]
+    assert [result.outcome for result in first_result.statuses] == [
+        JobUpdateOutcome.APPLIED,
+        JobUpdateOutcome.APPLIED,
+        JobUpdateOutcome.FINISHED,
+    ]
+    assert [result.outcome for result in second_result.pings] == [
+        JobUpdateOutcome.UNAUTHORIZED,
+    ]
+    assert [result.outcome for result in second_result.statuses] == [
+        JobUpdateOutcome.APPLIED,
+    ]
+
+    assert m_bulk_write.call_count == 1
+
+    first_document, second_document = await asyncio.gather(
+        mongo.jobs.find_one(first.id),
+        mongo.jobs.find_one(second.id),
+    )
+
+    assert first_document["ping"] is not None
+    assert first_document["state"] == "complete"
+    assert [status["state"] for status in first_document["status"]] == [
+        "waiting",
+        "preparing",
+        "running",
+        "complete",
+    ]
+
+    assert second_document["ping"] is None
+    assert second_document["state"] == "running"
+
+    assert await jobs_data._get_counts() == {
+        "complete": {"nuvs": 1},
+        "running": {"nuvs": 1},
+    }
+
+
+async def test_push_updates_finished_concurrently(
+    fake: DataFaker,
+    jobs_data: JobsData,
+    mocker,
+    mongo,
+):
+    """Test that a status update is reported as finished and isn't counted when its
+    job finishes after the batch is authenticated.
+    """
+    user = await fake.users.create()
+
+    job = await jobs_data.acquire((await jobs_data.create("nuvs", {}, user.id)).id)
+
+    counts = await jobs_data.reconcile_counts()
+
+    find = mongo.jobs.find
+
+    async def find_then_finish(*args, **kwargs):
+        async for document in find(*args, **kwargs):
+            yield document
+
+        await mongo.jobs.update_one({"_id": job.id}, {"$set": {"state": "complete"}})
+
+    mocker.patch.object(mongo.jobs, "find", find_then_finish)
+
+    result = await jobs_data.push_updates(
+        [],
+        [
+            JobStatusUpdate(
+                job_id=job.id,
+                key=job.key,
+                progress=20,
+                stage="foo",
+                state="running",
+            ),
+        ],
+    )
+
+    assert [status.outcome for status in result.statuses] == [
+        JobUpdateOutcome.FINISHED,
+    ]
+
+    assert await jobs_data._get_counts() == counts
+    assert len((await mongo.jobs.find_one(job.id))["status"]) == 2
@@ -0,0 +1,92 @@
+import datetime
+from pathlib import Path
+
+from virtool_core.models.enums import HistoryMethod
+
+from virtool.mongo.core import Mongo
+from virtool.references.bulk import BulkOTUUpdater
+from virtool.tasks.progress import AccumulatingProgressHandlerWrapper
+
+
+def create_otu(index: int, sequence_count: int) -> dict:
+    return {
+        "_id": f"remote_{index}",
+        "abbreviation": f"V{index}",
+        "name": f"Virus {index}",
+        "isolates": [
+            {
+                "id": f"isolate_{index}",
+                "default": True,
+                "source_name": "A",
+                "source_type": "isolate",
+                "sequences": [
+                    {
+                        "_id": f"remote_seq_{index}_{i}",
+                        "accession": f"AB{index:03}{i:03}",
+                        "definition": f"Virus {index} segment {i}",
+                        "host": "",
+                        "sequence": "ATGC" * (i + 1),
+                    }
+                    for i in range(sequence_count)
+                ],
+            },
+        ],
+        "schema": [],
+    }
+
+
+async def test_bulk_insert(data_path: Path, mocker, mongo: Mongo, static_time):
+    """Test that OTUs, sequences, and history are written in batches and that OTUs
+    without sequences still get a history change.
+    """
+    m_set_progress = mocker.AsyncMock()
+
+    tracker = AccumulatingProgressHandlerWrapper(
+        mocker.Mock(set_progress=m_set_progress),
+        12,
+    )
+
+    m_insert_otus = mocker.spy(mongo.otus, "insert_many")
+    m_insert_sequences = mocker.spy(mongo.sequences, "insert_many")
+    m_insert_history = mocker.spy(mongo.history, "insert_many")
+
+    async with mongo.create_session() as session:
+        bulk_updater = BulkOTUUpdater(
+            mongo,
+            "ref",
+            "bob",
+            static_time.datetime,
+            data_path,
+            tracker,
+            session,
+            batch_size=5,
+        )
+
+        bulk_updater.bulk_insert(
+            [create_otu(i, 0 if i == 0 else 2) for i in range(12)],
+            HistoryMethod.remote,
+        )
+
+        await bulk_updater.finish()
+
+    otus = await mongo.otus.find({}, ["remote", "version"]).to_list(None)
+    history = await mongo.history.find({}, ["method_name", "otu"]).to_list(None)
+
+    assert len(otus) == 12
+    assert await mongo.sequences.count_documents({}) == 22
+    assert {otu["_id"] for otu in otus} == {change["otu"]["id"] for change in history}
+    assert {change["method_name"] for change in history} == {"remote"}
+    assert {change["otu"]["version"] for change in history} == {0}
+
+    assert bulk_updater.change_ids == {f"{otu['_id']}.0" for otu in otus}
+
+    assert m_insert_otus.call_count == 3
+    assert m_insert_sequences.call_count == 5
+    assert m_insert_history.call_count == 3
+
+    m_set_progress.assert_called_with(100)
+
+    change = await mongo.history.find_one({"otu.name": "Virus 1"})
+
+    assert change["description"] == "Remoted Virus 1 (V1)"
+    assert change["created_at"] == datetime.datetime(2015, 10, 6, 20, 0, 0)
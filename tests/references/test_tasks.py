@@ -1,5 +1,7 @@
 import asyncio
 import datetime
+import gzip
+import json
 import shutil
 from pathlib import Path
 
@@ -230,6 +232,82 @@ async def test_import_reference_task(
     await assert_reference_created()
 
 
+async def test_import_reference_task_invalid(
+    data_layer: DataLayer,
+    data_path: Path,
+    fake: DataFaker,
+    mongo: Mongo,
+    pg: AsyncEngine,
+    static_time,
+    tmp_path: Path,
+):
+    """Test that a duplicate found late in the file fails the task and that no OTUs
+    inserted before it was found are kept.
+    """
+    with gzip.open(TEST_FILES_PATH / "reference.json.gz", "rt") as f:
+        data = json.load(f)
+
+    data["otus"].append({**data["otus"][0], "_id": "duplicate"})
+
+    path = tmp_path / "import.json.gz"
+
+    with gzip.open(path, "wt") as f:
+        json.dump(data, f)
+
+    user = await fake.users.create()
+
+    upload = await data_layer.uploads.create(
+        fake_file_chunker(path),
+        "import.json.gz",
+        UploadType.reference,
+        user.id,
+    )
+
+    await mongo.references.insert_one(
+        {
+            "_id": "foo",
+            "created_at": static_time.datetime,
+            "data_type": "genome",
+            "user": {
+                "id": user.id,
+            },
+        },
+    )
+
+    async with AsyncSession(pg) as session:
+        session.add(
+            SQLTask(
+                id=1,
+                complete=False,
+                context={
+                    "path": str(data_path / "files" / upload.name_on_disk),
+                    "ref_id": "foo",
+                    "user_id": user.id,
+                },
+                count=0,
+                progress=0,
+                step="load_file",
+                type="import_reference",
+                created_at=static_time.datetime,
+            ),
+        )
+
+        await session.commit()
+
+    task = await ImportReferenceTask.from_task_id(data_layer, 1)
+
+    await task.run()
+
+    row = await get_row_by_id(pg, SQLTask, 1)
+
+    assert row.complete is False
+    assert row.step == "import_reference"
+    assert "duplicate_names" in row.error
+
+    assert await mongo.otus.count_documents({}) == 0
+    assert await mongo.history.count_documents({}) == 0
+
+
 async def test_remote_reference_task(
     assert_reference_created,
     data_layer,
@@ -1,6 +1,15 @@
+import gzip
+import json
+from pathlib import Path
+
 import pytest
 
 from virtool.references.utils import (
+    REFERENCE_FILE_BATCH_SIZE,
+    ReferenceFileReader,
+    ReferenceImportError,
+    ReferenceSourceStream,
+    check_import_data,
     detect_duplicate_abbreviation,
     detect_duplicate_ids,
     detect_duplicate_isolate_ids,
@@ -228,3 +237,160 @@ def test_get_sequence_schema(require_id):
         "definition": {"type": "string", "required": True},
         "sequence": {"type": "string", "required": True},
     }
+
+
+def create_import_otus(count: int) -> list[dict]:
+    return [
+        {
+            "_id": f"otu_{i}",
+            "abbreviation": f"V{i}",
+            "name": f"Virus {i}",
+            "isolates": [
+                {
+                    "id": f"isolate_{i}",
+                    "default": True,
+                    "source_name": "A",
+                    "source_type": "isolate",
+                    "sequences": [
+                        {
+                            "_id": f"sequence_{i}",
+                            "accession": f"AB{i:05}",
+                            "definition": f"Virus {i} complete genome",
+                            "host": "",
+                            "sequence": "ATGC" * (i + 1),
+                        },
+                    ],
+                },
+            ],
+            "schema": [],
+        }
+        for i in range(count)
+    ]
+
+
+def write_reference_file(path: Path, text: str) -> Path:
+    with gzip.open(path, "wt") as f:
+        f.write(text)
+
+    return path
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("otus_first", [True, False])
+def test_reference_file_reader(indent, otus_first, mocker, tmp_path):
+    """Test that OTUs are yielded one at a time and other fields are collected, even
+    when values are split across reads.
+    """
+    mocker.patch("virtool.references.utils.REFERENCE_FILE_CHUNK_SIZE", 7)
+
+    otus = create_import_otus(20)
+    meta = {"data_type": "genome", "organism": "virus", "targets": None, "n": 1234567}
+
+    data = {"otus": otus, **meta} if otus_first else {**meta, "otus": otus}
+
+    path = write_reference_file(
+        tmp_path / "reference.json.gz",
+        json.dumps(data, indent=indent),
+    )
+
+    reader = ReferenceFileReader(path)
+
+    assert list(reader) == otus
+    assert reader.meta == {**meta, "otus": []}
+    assert reader.position == path.stat().st_size
+
+    reader.close()
+
+
+@pytest.mark.parametrize(
+    "text,error",
+    [
+        ("", "Expecting '{': char 0"),
+        ("[]", "Expecting '{': char 0"),
+        ('{"otus": [{}, {}', "Expecting ',' or ']': char 16"),
+        ('{"otus": [{"a": tru}]}', "Expecting value: char 16"),
+        ('{"otus": []} {}', "Extra data: char 13"),
+    ],
+)
+def test_reference_file_reader_invalid(text, error, tmp_path):
+    reader = ReferenceFileReader(
+        write_reference_file(tmp_path / "reference.json.gz", text),
+    )
+
+    with pytest.raises(ReferenceImportError) as err:
+        list(reader)
+
+    assert err.value.errors == error
+
+
+def test_reference_file_reader_not_gzipped(tmp_path):
+    path = tmp_path / "reference.json.gz"
+    path.write_text("{}")
+
+    with pytest.raises(ReferenceImportError) as err:
+        list(ReferenceFileReader(path))
+
+    assert err.value.errors == "Not a gzipped file"
+
+
+async def test_reference_source_stream(tmp_path):
+    otus = create_import_otus(25)
+
+    path = write_reference_file(
+        tmp_path / "reference.json.gz",
+        json.dumps({"data_type": "barcode", "organism": "virus", "otus": otus}),
+    )
+
+    source = ReferenceSourceStream(path, batch_size=10)
+
+    assert [batch async for batch in source] == [otus[:10], otus[10:20], otus[20:]]
+    assert source.position == source.size == path.stat().st_size
+    assert source.data.data_type == "barcode"
+    assert source.data.organism == "virus"
+
+
+async def test_reference_source_stream_default_batch_size(tmp_path):
+    otus = create_import_otus(REFERENCE_FILE_BATCH_SIZE + 5)
+
+    path = write_reference_file(
+        tmp_path / "reference.json.gz",
+        json.dumps({"data_type": "genome", "organism": "virus", "otus": otus}),
+    )
+
+    source = ReferenceSourceStream(path)
+
+    assert source.batch_size == REFERENCE_FILE_BATCH_SIZE
+    assert [batch async for batch in source] == [
+        otus[:REFERENCE_FILE_BATCH_SIZE],
+        otus[REFERENCE_FILE_BATCH_SIZE:],
+    ]
+
+
+async def test_reference_source_stream_invalid(tmp_path):
+    """Test that no batches are yielded once a duplicate is found and that the error
+    lists every problem in the file.
+    """
+    otus = create_import_otus(25)
+    otus[15]["name"] = "Virus 3"
+    otus[22]["abbreviation"] = "V4"
+
+    data = {"data_type": "genome", "otus": otus}
+
+    source = ReferenceSourceStream(
+        write_reference_file(tmp_path / "reference.json.gz", json.dumps(data)),
+        batch_size=10,
+    )
+
+    batches = []
+
+    with pytest.raises(ReferenceImportError) as err:
+        async for batch in source:
+            batches.append(batch)
+
+    assert batches == [otus[:10]]
+    assert err.value.errors == check_import_data(data)
+    assert [error["id"] for error in err.value.errors] == [
+        "duplicate_abbreviations",
+        "duplicate_names",
+        "file",
+    ]
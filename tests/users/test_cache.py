@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from virtool_core.models.roles import AdministratorRole
+
+from virtool.data.events import Event, Operation
+from virtool.users.cache import UserClientCache
+
+
+@pytest.fixture
+def users(mocker):
+    def get(user_id: str):
+        group = mocker.Mock(id=5)
+
+        return mocker.Mock(
+            active=True,
+            administrator_role=AdministratorRole.BASE,
+            force_reset=False,
+            groups=[group],
+            id=user_id,
+            permissions=mocker.Mock(dict=lambda: {"create_sample": True}),
+        )
+
+    return mocker.Mock(get=mocker.AsyncMock(side_effect=get))
+
+
+async def test_get(users):
+    """Test that concurrent lookups for the same user share one query and later
+    lookups are served from the cache.
+    """
+    cache = UserClientCache(users)
+
+    states = await asyncio.gather(*[cache.get("bob") for _ in range(5)])
+
+    assert states[0].groups == [5]
+    assert states[0].permissions == {"create_sample": True}
+    assert all(state is states[0] for state in states)
+
+    assert await cache.get("bob") is states[0]
+    assert users.get.call_count == 1
+
+
+async def test_expiry_and_eviction(users):
+    """Test that entries expire after the TTL and that the least recently used entry
+    is evicted when the cache is full.
+    """
+    cache = UserClientCache(users, ttl=0)
+
+    await cache.get("bob")
+    await cache.get("bob")
+
+    assert users.get.call_count == 2
+
+    cache = UserClientCache(users, max_size=2)
+
+    for user_id in ("bob", "fred", "bob", "ted"):
+        await cache.get(user_id)
+
+    assert list(cache._entries) == ["bob", "ted"]
+
+
+@pytest.mark.parametrize("domain", ["users", "groups"])
+async def test_handle_event(domain: str, mocker, users):
+    """Test that user and group events invalidate the affected users."""
+    cache = UserClientCache(users)
+
+    await cache.get("bob")
+    await cache.get("fred")
+
+    cache.handle_event(
+        Event(
+            data=mocker.Mock(id="bob" if domain == "users" else 5, users=[]),
+            domain=domain,
+            name="update",
+            operation=Operation.UPDATE,
+            timestamp=None,
+        ),
+    )
+
+    assert list(cache._entries) == (["fred"] if domain == "users" else [])
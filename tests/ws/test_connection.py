@@ -1,3 +1,5 @@
+import asyncio
+
 import pytest
 from aiohttp.test_utils import make_mocked_coro
 from aiohttp.web_ws import WebSocketResponse
@@ -5,14 +7,14 @@ from aiohttp.web_ws import WebSocketResponse
 from virtool.api.custom_json import dump_string
 from virtool.api.client import UserClient
 from virtool.users.utils import Permission
-from virtool.ws.connection import WSConnection
+from virtool.ws.connection import SlowConsumerPolicy, WSConnection
 
 
 @pytest.fixture
 def ws(mocker):
     ws = mocker.Mock(spec=WebSocketResponse)
 
-    ws.send_json = make_mocked_coro()
+    ws.send_str = make_mocked_coro()
     ws.close = make_mocked_coro()
 
     client = mocker.Mock(spec=UserClient)
@@ -50,13 +52,14 @@ async def test_send(ws):
         }
     )
 
-    ws._ws.send_json.assert_called_with(
-        {
-            "interface": "users",
-            "operation": "update",
-            "data": {"groups": [], "user_id": "john"},
-        },
-        dumps=dump_string,
+    ws._ws.send_str.assert_called_with(
+        dump_string(
+            {
+                "interface": "users",
+                "operation": "update",
+                "data": {"groups": [], "user_id": "john"},
+            }
+        )
     )
 
 
@@ -67,3 +70,89 @@ async def test_close(ws):
     """
     await ws.close(1000)
     ws._ws.close.assert_called()
+
+
+async def test_enqueue(ws):
+    """
+    Test that queued messages are sent in order by the writer task and that a
+    coalesced message is sent after messages that were queued before it.
+    """
+    ws.enqueue("foo", ("otus", "update", "a"))
+    ws.enqueue("bar", ("otus", "update", "b"))
+    ws.enqueue("baz", ("otus", "update", "a"))
+
+    ws.start()
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    assert [c.args[0] for c in ws._ws.send_str.call_args_list] == ["bar", "baz"]
+    assert ws.queue_depth == 0
+
+    ws.stop()
+
+
+@pytest.mark.parametrize(
+    "policy",
+    [
+        SlowConsumerPolicy.COALESCE,
+        SlowConsumerPolicy.DISCONNECT,
+        SlowConsumerPolicy.DROP,
+    ],
+)
+async def test_enqueue_full(policy, mocker):
+    """
+    Test that each slow consumer policy is applied when the send queue is full.
+    """
+    ws = mocker.Mock(spec=WebSocketResponse)
+    ws.close = make_mocked_coro()
+
+    client = mocker.Mock(spec=UserClient)
+    client.groups = []
+    client.permissions = {}
+    client.session_id = None
+    client.user_id = "test"
+
+    connection = WSConnection(ws, client, max_queue_size=2, policy=policy)
+
+    connection.enqueue("a1", ("otus", "update", "a"))
+    connection.enqueue("b1", ("otus", "update", "b"))
+    connection.enqueue("a2", ("otus", "update", "a"))
+    connection.enqueue("c1", ("otus", "update", "c"))
+
+    if policy == SlowConsumerPolicy.COALESCE:
+        assert list(connection._queue.values()) == ["b1", "a2"]
+        assert connection.dropped == 1
+
+    elif policy == SlowConsumerPolicy.DROP:
+        assert list(connection._queue.values()) == ["a1", "b1"]
+        assert connection.dropped == 2
+
+    else:
+        await asyncio.sleep(0)
+
+        assert connection.queue_depth == 0
+        ws.close.assert_called_with(code=1008)
+
+
+async def test_write_error(ws):
+    """Test that the connection is closed when a message can't be sent."""
+    ws._ws.send_str.side_effect = RuntimeError("Could not send")
+
+    ws.start()
+
+    ws.enqueue("foo")
+    ws.enqueue("bar")
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+    ws._ws.send_str.assert_called_once_with("foo")
+    ws._ws.close.assert_called_with(code=1011)
+
+    assert ws.queue_depth == 0
+    assert ws._writer is None
+
+    ws.enqueue("baz")
+
+    assert ws.queue_depth == 0
@@ -0,0 +1,194 @@
+import pytest
+from aiohttp.test_utils import make_mocked_coro
+from aiohttp.web_ws import WebSocketResponse
+from pydantic import BaseModel
+
+from virtool.account.cache import KeyChange
+from virtool.api.client import UserClient
+from virtool.api.custom_json import dump_string
+from virtool.data.events import Event, Operation
+from virtool.ws.connection import WSConnection
+from virtool.ws.server import WSServer
+
+
+class Resource(BaseModel):
+    id: str
+
+
+class Sample(BaseModel):
+    id: str
+    all_read: bool
+    group: int | None
+    group_read: bool
+    user: Resource
+
+
+def create_event(domain: str, data: BaseModel) -> Event:
+    return Event(
+        data=data,
+        domain=domain,
+        name="update",
+        operation=Operation.UPDATE,
+        timestamp=None,
+    )
+
+
+@pytest.fixture
+def ws_server(mocker):
+    return WSServer(mocker.Mock(), max_queue_size=5)
+
+
+@pytest.fixture
+def add_connection(mocker, ws_server: WSServer):
+    def func(user_id: str | None, groups: list[int] | None = None) -> WSConnection:
+        ws = mocker.Mock(spec=WebSocketResponse)
+        ws.send_str = make_mocked_coro()
+
+        client = mocker.Mock(spec=UserClient)
+        client.administrator_role = None
+        client.groups = groups or []
+        client.permissions = {}
+        client.session_id = None
+        client.user_id = user_id
+
+        connection = WSConnection(ws, client, max_queue_size=5)
+
+        mocker.patch.object(connection, "start")
+
+        ws_server.add_connection(connection)
+
+        return connection
+
+    return func
+
+
+async def test_broadcast(add_connection, mocker, ws_server: WSServer):
+    """
+    Test that a message is serialized once and queued for every authenticated
+    connection, and that the metrics reflect the queued messages.
+    """
+    m_dump_string = mocker.patch(
+        "virtool.ws.server.dump_string",
+        side_effect=dump_string,
+    )
+
+    connections = [add_connection(user_id) for user_id in ("bob", "fred", None)]
+
+    ws_server.broadcast(create_event("jobs", Resource(id="foo")))
+    ws_server.broadcast(create_event("jobs", Resource(id="bar")))
+
+    assert m_dump_string.call_count == 2
+
+    assert [connection.queue_depth for connection in connections] == [2, 2, 0]
+
+    assert ws_server.metrics == {
+        "connections": 3,
+        "dropped": 0,
+        "max_queue_depth": 2,
+        "queue_depth": 4,
+    }
+
+
+async def test_subscriptions(add_connection, ws_server: WSServer):
+    """
+    Test that connections only receive events for the domains and resources they are
+    subscribed to, and that connections that never subscribe receive all events.
+    """
+    unfiltered = add_connection("bob")
+    jobs = add_connection("fred")
+    job = add_connection("ted")
+    invalid = add_connection("ned")
+
+    ws_server.handle_message(jobs, '{"type": "subscribe", "domain": "jobs"}')
+    ws_server.handle_message(
+        job,
+        '{"type": "subscribe", "domain": "jobs", "ids": ["foo"]}',
+    )
+    ws_server.handle_message(job, '{"type": "subscribe", "domain": "otus"}')
+    ws_server.handle_message(job, '{"type": "unsubscribe", "domain": "otus"}')
+    ws_server.handle_message(invalid, '{"type": "subscribe"}')
+
+    ws_server.broadcast(create_event("jobs", Resource(id="foo")))
+    ws_server.broadcast(create_event("jobs", Resource(id="bar")))
+    ws_server.broadcast(create_event("otus", Resource(id="baz")))
+
+    assert unfiltered.queue_depth == 3
+    assert jobs.queue_depth == 2
+    assert job.queue_depth == 1
+    assert invalid.queue_depth == 3
+
+    assert ws_server._subscribers["otus"] == set()
+
+
+async def test_rights(add_connection, ws_server: WSServer):
+    """
+    Test that sample events are only sent to connections that can read the sample,
+    that API key events are only sent to the key owner, and that sample data without
+    read rights is not sent.
+    """
+    owner = add_connection("bob")
+    member = add_connection("fred", [5])
+    other = add_connection("ted", [6])
+
+    ws_server.broadcast(
+        create_event(
+            "samples",
+            Sample(
+                id="foo",
+                all_read=False,
+                group=5,
+                group_read=True,
+                user=Resource(id="bob"),
+            ),
+        ),
+    )
+
+    assert [c.queue_depth for c in (owner, member, other)] == [1, 1, 0]
+
+    ws_server.broadcast(create_event("keys", KeyChange(id="foo", user_id="bob")))
+
+    assert [c.queue_depth for c in (owner, member, other)] == [2, 1, 0]
+
+    # Samples without read rights in their data aren't sent to anyone.
+    ws_server.broadcast(create_event("samples", Resource(id="bar")))
+
+    assert [c.queue_depth for c in (owner, member, other)] == [2, 1, 0]
+
+
+async def test_replay(add_connection, mocker, ws_server: WSServer):
+    """
+    Test that missed events up to the last broadcast event are queued for a
+    reconnecting client and that a reset message is queued if the missed events are
+    incomplete.
+    """
+    events = []
+
+    for stream_id in ("3-0", "4-0", "6-0"):
+        event = create_event("jobs", Resource(id=stream_id))
+        event.stream_id = stream_id
+        events.append(event)
+
+    m_replay_events = mocker.patch(
+        "virtool.ws.server.replay_events",
+        mocker.AsyncMock(return_value=(events, True)),
+    )
+
+    ws_server._stream = mocker.Mock()
+    ws_server._last_id = "5-0"
+
+    connection = add_connection("bob")
+
+    await ws_server.replay(connection, "2-0")
+
+    assert connection.queue_depth == 2
+    assert '"event_id":"4-0"' in next(reversed(connection._queue.values()))
+
+    m_replay_events.return_value = ([], False)
+
+    reset = add_connection("fred")
+
+    await ws_server.replay(reset, "1-0")
+
+    assert list(reset._queue.values()) == [
+        '{"operation":"reset","interface":"events","event_id":null}',
+    ]
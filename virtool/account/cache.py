@@ -0,0 +1,165 @@
+"""A cache of verified API keys.
+
+Automation clients authenticate every request with an API key. Keys that have been
+verified recently are cached by their hashed secret so repeat requests do not need to
+query the database to find the key and its owner.
+
+The data layer emits a ``keys`` event when it changes or deletes keys, so every instance
+of the application can remove them from its cache.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from virtool_core.models.basemodel import BaseModel
+from virtool_core.redis import Redis
+
+from virtool.data.events import Event, listen_for_events
+
+if TYPE_CHECKING:
+    from virtool.data.streams import EventStream
+
+VERIFIED_KEY_CACHE_SIZE = 5000
+"""The maximum number of verified API keys that are cached."""
+
+VERIFIED_KEY_CACHE_TTL = 30
+"""The number of seconds a verified API key is cached for."""
+
+
+class KeyChange(BaseModel):
+    """The data of an event emitted when API keys are changed or deleted.
+
+    ``id`` is ``None`` if every key owned by the user was affected.
+    """
+
+    id: str | None
+    user_id: str
+
+
+@dataclass(frozen=True)
+class VerifiedKey:
+    """An API key that has been matched to its owner."""
+
+    handle: str
+    key_id: str
+    permissions: dict[str, bool]
+    user_id: str
+
+
+class VerifiedKeyCache:
+    """A size-bounded cache of :class:`VerifiedKey` keyed by hashed secret.
+
+    Entries expire after ``ttl`` seconds. The least recently used entry is evicted when
+    the cache is full.
+    """
+
+    def __init__(
+        self,
+        ttl: float = VERIFIED_KEY_CACHE_TTL,
+        max_size: int = VERIFIED_KEY_CACHE_SIZE,
+    ):
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, VerifiedKey]] = OrderedDict()
+
+        #: Incremented on every invalidation so keys that were looked up before one
+        #: are not cached.
+        self.generation = 0
+
+    def get(self, hashed: str) -> VerifiedKey | None:
+        """Get a verified key by its hashed secret.
+
+        :param hashed: the hashed secret
+        :return: the verified key or ``None`` if it is not cached
+        """
+        entry = self._entries.get(hashed)
+
+        if entry is None:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del self._entries[hashed]
+            return None
+
+        self._entries.move_to_end(hashed)
+
+        return entry[1]
+
+    def set(self, hashed: str, verified_key: VerifiedKey, generation: int):
+        """Cache a verified key.
+
+        The key is not cached if the cache has been invalidated since ``generation``.
+
+        :param hashed: the hashed secret
+        :param verified_key: the verified key
+        :param generation: the cache generation when the key was looked up
+        """
+        if generation != self.generation:
+            return
+
+        self._entries[hashed] = (time.monotonic() + self._ttl, verified_key)
+        self._entries.move_to_end(hashed)
+
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_key(self, key_id: str):
+        """Remove an API key from the cache.
+
+        :param key_id: the ID of the API key
+        """
+        self._invalidate(lambda verified_key: verified_key.key_id == key_id)
+
+    def invalidate_user(self, user_id: str):
+        """Remove all API keys belonging to a user from the cache.
+
+        :param user_id: the ID of the user
+        """
+        self._invalidate(lambda verified_key: verified_key.user_id == user_id)
+
+    def handle_event(self, event: Event):
+        """Invalidate cached keys affected by an event.
+
+        :param event: the event
+        """
+        if event.domain == "keys":
+            if event.data.id is None:
+                self.invalidate_user(event.data.user_id)
+            else:
+                self.invalidate_key(event.data.id)
+        elif event.domain == "users":
+            # The key owner's handle may have changed.
+            self.invalidate_user(event.data.id)
+
+    async def run(
+        self,
+        redis: Redis,
+        stream: "EventStream | None" = None,
+        group: str | None = None,
+        consumer: str | None = None,
+    ):
+        """Invalidate cached keys as events are received.
+
+        :param redis: the Redis client
+        :param stream: the event stream to read from
+        :param group: the consumer group to read as
+        :param consumer: the name of the consumer in the group
+        """
+        try:
+            async for event in listen_for_events(redis, stream, group, consumer):
+                self.handle_event(event)
+        except asyncio.CancelledError:
+            pass
+
+    def _invalidate(self, predicate):
+        self.generation += 1
+
+        for hashed in [
+            hashed
+            for hashed, (_, verified_key) in self._entries.items()
+            if predicate(verified_key)
+        ]:
+            del self._entries[hashed]
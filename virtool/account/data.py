@@ -1,3 +1,5 @@
+from dataclasses import replace
+
 from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncEngine
 from structlog import get_logger
@@ -5,6 +7,7 @@ from virtool_core.models.account import Account, AccountSettings, APIKey
 from virtool_core.models.session import Session
 
 import virtool.utils
+from virtool.account.cache import KeyChange, VerifiedKey, VerifiedKeyCache
 from virtool.account.mongo import (
     compose_password_update,
 )
@@ -20,11 +23,13 @@ from virtool.administrators.oas import UpdateUserRequest
 from virtool.authorization.client import AuthorizationClient
 from virtool.data.domain import DataLayerDomain
 from virtool.data.errors import ResourceError, ResourceNotFoundError
+from virtool.data.events import Operation, emit
 from virtool.data.topg import both_transactions
 from virtool.data.transforms import apply_transforms
 from virtool.groups.transforms import AttachGroupsTransform
 from virtool.mongo.core import Mongo
 from virtool.mongo.utils import get_one_field
+from virtool.users.cache import UserClientState
 from virtool.users.mongo import validate_credentials
 from virtool.users.pg import SQLUser
 from virtool.users.utils import limit_permissions
@@ -58,6 +63,9 @@ class AccountData(DataLayerDomain):
         self._mongo = mongo
         self._pg = pg
 
+        #: A cache of API keys that have been matched to their owners.
+        self.key_cache = VerifiedKeyCache()
+
     async def get(self, user_id: str) -> Account:
         """Get the account for the given ``user_id``.
 
@@ -281,6 +289,64 @@ class AccountData(DataLayerDomain):
             },
         )
 
+    async def authenticate_key(
+        self,
+        handle: str,
+        key: str,
+    ) -> tuple[str, UserClientState]:
+        """Get the user ID and client state for a request authenticated with an API
+        key.
+
+        The permissions in the returned state are the owner's permissions limited by
+        those of the key. Verified keys and user states are cached, so authenticating
+        with a recently used key does not query the database.
+
+        :param handle: the handle of the user that owns the key
+        :param key: the raw API key
+        :return: the user ID and client state
+        :raises ResourceNotFoundError: if the key does not exist or is not owned by the
+            user with ``handle``
+        """
+        hashed = hash_key(key)
+
+        verified_key = self.key_cache.get(hashed)
+
+        if verified_key is None:
+            generation = self.key_cache.generation
+
+            document = await self._mongo.keys.find_one(
+                {"_id": hashed},
+                ["id", "permissions", "user"],
+            )
+
+            if not document:
+                raise ResourceNotFoundError
+
+            user_id = document["user"]["id"]
+
+            verified_key = VerifiedKey(
+                handle=await get_one_field(self._mongo.users, "handle", user_id),
+                key_id=document["id"],
+                permissions=document["permissions"],
+                user_id=user_id,
+            )
+
+            self.key_cache.set(hashed, verified_key, generation)
+
+        if verified_key.handle != handle:
+            raise ResourceNotFoundError
+
+        state = await self.data.users.get_client_state(verified_key.user_id)
+
+        return verified_key.user_id, replace(
+            state,
+            force_reset=False,
+            permissions={
+                permission: value and verified_key.permissions.get(permission, False)
+                for permission, value in state.permissions.items()
+            },
+        )
+
     async def create_key(
         self,
         data: CreateKeysRequest,
@@ -321,6 +387,15 @@ class AccountData(DataLayerDomain):
         """
         await self._mongo.keys.delete_many({"user.id": user_id})
 
+        self.key_cache.invalidate_user(user_id)
+
+        emit(
+            KeyChange(id=None, user_id=user_id),
+            "keys",
+            "delete_keys",
+            Operation.DELETE,
+        )
+
     async def update_key(
         self,
         user_id: str,
@@ -358,6 +433,15 @@ class AccountData(DataLayerDomain):
             {"$set": {"permissions": new_permissions}},
         )
 
+        self.key_cache.invalidate_key(key_id)
+
+        emit(
+            KeyChange(id=key_id, user_id=user_id),
+            "keys",
+            "update_key",
+            Operation.UPDATE,
+        )
+
         return await self.get_key(user_id, key_id)
 
     async def delete_key(self, user_id: str, key_id: str):
@@ -370,9 +454,18 @@ class AccountData(DataLayerDomain):
             {"id": key_id, "user.id": user_id},
         )
 
+        self.key_cache.invalidate_key(key_id)
+
         if delete_result.deleted_count == 0:
             raise ResourceNotFoundError()
 
+        emit(
+            KeyChange(id=key_id, user_id=user_id),
+            "keys",
+            "delete_key",
+            Operation.DELETE,
+        )
+
     async def login(self, data: CreateLoginRequest) -> str:
         """Create a new session for the user with `username`.
 
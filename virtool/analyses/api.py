@@ -7,6 +7,7 @@ from aiohttp.web import (
     HTTPNotModified,
     Request,
     Response,
+    StreamResponse,
 )
 from aiohttp_pydantic import PydanticView
 from aiohttp_pydantic.oas.typing import r200, r204, r400, r403, r404, r409
@@ -271,12 +272,15 @@ class AnalysisFileView(PydanticView):
 
 @routes.view("/analyses/documents/{analysis_id}.{extension}")
 class DocumentDownloadView(PydanticView):
-    async def get(self, analysis_id: str, extension: str, /) -> r200[Response] | r404:
+    async def get(
+        self, analysis_id: str, extension: str, /
+    ) -> r200[StreamResponse] | r404:
         """
         Download an analysis.
 
         Downloads analysis data in CSV or XSLX format. The returned format depends on
-        the extension included in the request path.
+        the extension included in the request path. The file is sent using chunked
+        transfer encoding as it is generated.
 
         Status Codes:
             200: Operation successful
@@ -288,20 +292,39 @@ class DocumentDownloadView(PydanticView):
             raise APIBadRequest(f"Invalid extension: {extension}")
 
         try:
-            formatted, content_type = await get_data_from_req(
+            chunks, content_type = await get_data_from_req(
                 self.request
             ).analyses.download(analysis_id, extension)
         except ResourceNotFoundError:
             raise APINotFound()
 
-        return Response(
-            body=formatted,
+        # Generate the first chunk before the response is prepared. Loading and
+        # formatting the results happens before any data is produced, so errors there
+        # still result in an error response instead of a truncated file.
+        try:
+            first_chunk = await anext(chunks)
+        except StopAsyncIteration:
+            first_chunk = b""
+
+        resp = StreamResponse(
             headers={
                 "Content-Disposition": f"attachment; filename={analysis_id}.{extension}",
                 "Content-Type": content_type,
             },
         )
 
+        resp.enable_chunked_encoding()
+
+        await resp.prepare(self.request)
+        await resp.write(first_chunk)
+
+        async for chunk in chunks:
+            await resp.write(chunk)
+
+        await resp.write_eof()
+
+        return resp
+
 
 @routes.view("/analyses/{analysis_id}/{sequence_index}/blast")
 class BlastView(PydanticView):
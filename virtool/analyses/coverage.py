@@ -0,0 +1,224 @@
+"""NumPy-backed coverage and depth calculations for formatting Pathoscope results.
+
+These functions produce exactly the same output as the pure-Python implementations they
+replace, but are much faster for deep-sequenced samples with many long hits. Run
+``python -m tests.analyses.benchmark_coverage`` to compare them.
+
+Visvalingam-Wyatt simplification reproduces :func:`visvalingamwyatt.simplify`,
+including its tie-breaking, using a heap and a linked list of remaining points
+instead of a linear scan for every removed point.
+
+"""
+
+import heapq
+from math import inf
+
+import numpy as np
+
+SIMPLIFICATION_RATIO = 0.4
+"""The ratio of points kept when simplifying coverage coordinates."""
+
+SIMPLIFICATION_THRESHOLD = 100
+"""Coordinates are only simplified if there are more points than this."""
+
+
+def calculate_median_depths(hits: list[dict]) -> dict[str, int | float]:
+    """Calculate the median depth for all hits (sequences) in a Pathoscope result
+    document.
+
+    The returned values are Python numbers and match :func:`statistics.median`: an
+    element of ``align`` for odd lengths and the mean of the two middle elements for
+    even lengths.
+
+    :param hits: the pathoscope analysis document to calculate depths for
+    :return: a dict of median depths keyed by hit (sequence) ids
+
+    """
+    return {hit["id"]: calculate_median(hit["align"]) for hit in hits}
+
+
+def calculate_median(values: list[int]) -> int | float:
+    """Calculate the median of ``values`` the same way as :func:`statistics.median`.
+
+    :param values: a list of depths
+    :return: the median depth
+
+    """
+    length = len(values)
+
+    if length == 0:
+        raise ValueError("no median for empty data")
+
+    middle = length // 2
+
+    if length % 2:
+        return np.partition(np.asarray(values), middle)[middle].item()
+
+    partitioned = np.partition(np.asarray(values), [middle - 1, middle])
+
+    return (partitioned[middle - 1].item() + partitioned[middle].item()) / 2
+
+
+def transform_coverage_to_coordinates(
+    coverage_list: list[int],
+) -> list[tuple[int, int]] | list[list[int]]:
+    """Takes a list of read depths where the list index is equal to the read position
+    plus one and returns a list of (x, y) coordinates.
+
+    The coordinates will be simplified using Visvalingham-Wyatt algorithm if the list
+    exceeds 100 pairs.
+
+    :param coverage_list: a list of position-indexed depth values
+    :return: a list of (x, y) coordinates
+    """
+    coverage = np.asarray(coverage_list)
+
+    last = len(coverage) - 1
+
+    # Keep every position whose depth differs from either of its neighbours.
+    middle = coverage[1:-1]
+
+    change_points = (
+        np.flatnonzero((middle != coverage[:-2]) | (middle != coverage[2:])) + 1
+    )
+
+    coordinates = [
+        (0, coverage_list[0]),
+        *zip(change_points.tolist(), coverage[change_points].tolist()),
+        (last, coverage_list[last]),
+    ]
+
+    if len(coordinates) > SIMPLIFICATION_THRESHOLD:
+        return simplify(coordinates, SIMPLIFICATION_RATIO)
+
+    return coordinates
+
+
+def simplify(coordinates: list[tuple[int, int]], ratio: float) -> list[list[int]]:
+    """Simplify ``coordinates`` using the Visvalingam-Wyatt algorithm.
+
+    Gives the same result as ``visvalingamwyatt.simplify(coordinates, ratio=ratio)``.
+
+    :param coordinates: a list of (x, y) coordinates
+    :param ratio: the ratio of points to keep
+    :return: the simplified coordinates
+    """
+    if ratio <= 0 or ratio > 1:
+        raise ValueError(f"Ratio must be 0<r<=1. Got {ratio}")
+
+    points = np.asarray(coordinates)
+
+    thresholds = calculate_thresholds(points.astype(float))
+
+    count = int(ratio * len(thresholds))
+
+    if count >= len(thresholds):
+        return points.tolist()
+
+    threshold = np.sort(thresholds)[::-1][count]
+
+    return points[thresholds >= threshold][:count].tolist()
+
+
+def calculate_thresholds(points: np.ndarray) -> np.ndarray:
+    """Calculate the effective area of every point in ``points``.
+
+    A point is removed in order of increasing effective area. The first and last points
+    have an infinite area and are never removed.
+
+    :param points: an (N, 2) array of float coordinates
+    :return: the effective areas of the points
+    """
+    count = len(points)
+
+    areas = np.empty(count)
+    areas[0] = inf
+    areas[-1] = inf
+
+    if count > 2:
+        p1 = points[:-2]
+        p2 = points[1:-1]
+        p3 = points[2:]
+
+        areas[1:-1] = (
+            np.abs(
+                p2[:, 0] * (p3[:, 1] - p1[:, 1])
+                + p1[:, 0] * (p2[:, 1] - p3[:, 1])
+                + p3[:, 0] * (p1[:, 1] - p2[:, 1]),
+            )
+            / 2.0
+        )
+
+    xs = points[:, 0].tolist()
+    ys = points[:, 1].tolist()
+    areas = areas.tolist()
+
+    def triangle_area(a: int, b: int, c: int) -> float:
+        return (
+            abs(
+                xs[a] * (ys[b] - ys[c])
+                + xs[b] * (ys[c] - ys[a])
+                + xs[c] * (ys[a] - ys[b]),
+            )
+            / 2.0
+        )
+
+    previous = list(range(-1, count - 1))
+    following = list(range(1, count + 1))
+    following[-1] = -1
+
+    removed = [False] * count
+
+    heap = [(area, index) for index, area in enumerate(areas)]
+    heapq.heapify(heap)
+
+    def pop_smallest() -> tuple[float, int]:
+        # Entries are never updated in place. Skip those for removed points or
+        # outdated areas. Ties resolve to the lowest index like ``numpy.argmin``.
+        while True:
+            area, index = heapq.heappop(heap)
+
+            if not removed[index] and area == areas[index]:
+                return area, index
+
+    this_area, current = pop_smallest()
+
+    while this_area < inf:
+        removed[current] = True
+
+        left = previous[current]
+        right = following[current]
+
+        following[left] = right
+        previous[right] = left
+
+        skip = None
+
+        if following[right] != -1:
+            right_area = triangle_area(left, right, following[right])
+
+            # A neighbour can't be less significant than the point that was just
+            # removed. If its area drops below, it is removed next.
+            if right_area <= this_area:
+                right_area = this_area
+                skip = right
+
+            areas[right] = right_area
+            heapq.heappush(heap, (right_area, right))
+
+        if previous[left] != -1:
+            left_area = triangle_area(previous[left], left, right)
+
+            if left_area <= this_area:
+                left_area = this_area
+                skip = left
+
+            areas[left] = left_area
+            heapq.heappush(heap, (left_area, left))
+
+        if skip is None:
+            this_area, current = pop_smallest()
+        else:
+            this_area, current = areas[skip], skip
+
+    return np.array(areas)
@@ -1,7 +1,7 @@
 import asyncio
 import math
 from datetime import datetime
-from typing import Optional, Tuple
+from typing import AsyncIterator, Optional, Tuple
 
 import sentry_sdk
 from sqlalchemy import delete
@@ -48,6 +48,7 @@ from virtool.subtractions.db import (
     AttachSubtractionsTransform,
     subtraction_processor,
 )
+from virtool.types import ProcessRunner
 from virtool.uploads.utils import naive_writer
 from virtool.users.transforms import AttachUserTransform
 from virtool.utils import wait_for_checks
@@ -58,10 +59,17 @@ logger = get_logger("analyses")
 class AnalysisData(DataLayerDomain):
     name = "analyses"
 
-    def __init__(self, mongo: Mongo, config, pg: AsyncEngine):
+    def __init__(
+        self,
+        mongo: Mongo,
+        config,
+        pg: AsyncEngine,
+        run_in_process: ProcessRunner | None = None,
+    ):
         self._config = config
         self._mongo = mongo
         self._pg = pg
+        self._run_in_process = run_in_process
 
     async def find(
         self,
@@ -184,10 +192,11 @@ class AnalysisData(DataLayerDomain):
         analysis = await attach_analysis_files(self._pg, analysis_id, document)
 
         if analysis["ready"]:
-            analysis = await virtool.analyses.format.format_analysis(
+            analysis = await virtool.analyses.format.format_analysis_materialized(
                 self._config,
                 self._mongo,
                 analysis,
+                self._run_in_process,
             )
 
         transforms = [
@@ -419,12 +428,19 @@ class AnalysisData(DataLayerDomain):
 
         raise ResourceNotFoundError()
 
-    async def download(self, analysis_id: str, extension: str) -> Tuple[str, str]:
+    async def download(
+        self,
+        analysis_id: str,
+        extension: str,
+    ) -> Tuple[AsyncIterator[bytes], str]:
         """Get an analysis to be downloaded in CSV or XSLX format.
 
+        The formatted file is returned as an async iterator of chunks that can be
+        written to a streaming response as they are generated.
+
         :param analysis_id: the analysis ID
         :param extension: the file extension
-        :return: formatted file and file content type
+        :return: the chunks of the formatted file and the file content type
         """
         document = await self._mongo.analyses.find_one(analysis_id)
 
@@ -433,19 +449,21 @@ class AnalysisData(DataLayerDomain):
 
         if extension == "xlsx":
             return (
-                await virtool.analyses.format.format_analysis_to_excel(
+                virtool.analyses.format.format_analysis_to_excel(
                     self._config,
                     self._mongo,
                     document,
+                    self._run_in_process,
                 ),
                 "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             )
 
         return (
-            await virtool.analyses.format.format_analysis_to_csv(
+            virtool.analyses.format.format_analysis_to_csv(
                 self._config,
                 self._mongo,
                 document,
+                self._run_in_process,
             ),
             "text/csv",
         )
@@ -515,7 +533,10 @@ class AnalysisData(DataLayerDomain):
         :param results: the analysis results
         :return: the analysis
         """
-        document = await self._mongo.analyses.find_one({"_id": analysis_id}, ["ready"])
+        document = await self._mongo.analyses.find_one(
+            {"_id": analysis_id},
+            ["ready", "sample"],
+        )
 
         if not document:
             raise ResourceNotFoundError
@@ -523,6 +544,13 @@ class AnalysisData(DataLayerDomain):
         if document.get("ready"):
             raise ResourceConflictError
 
+        # Make sure stale formatted results are never served for the new results.
+        await virtool.analyses.format.remove_formatted_results(
+            self._config,
+            analysis_id,
+            document["sample"]["id"],
+        )
+
         document = await self._mongo.analyses.find_one_and_update(
             {"_id": analysis_id},
             {"$set": {"results": results, "ready": True}},
@@ -532,6 +560,8 @@ class AnalysisData(DataLayerDomain):
 
         await recalculate_workflow_tags(self._mongo, sample_id)
 
+        # Getting the analysis formats the new results and materializes them, so the
+        # first client request is served from the materialized results.
         analysis = await self.get(analysis_id, None)
 
         sample = await self.data.samples.get(sample_id)
@@ -6,22 +6,33 @@ downloads.
 
 import asyncio
 import csv
+import gzip
 import io
 import json
-import statistics
-from asyncio import gather
+import os
+import tempfile
 from collections import defaultdict
+from collections.abc import AsyncIterator, Callable, Iterator
+from pathlib import Path
 from typing import TYPE_CHECKING, Any
+from uuid import uuid4
 
 import aiofiles
+import orjson
 import openpyxl.styles
-import visvalingamwyatt as vw
+from openpyxl.cell import WriteOnlyCell
 from virtool_core.models.enums import AnalysisWorkflow
 
 import virtool.analyses.utils
+from virtool.analyses.coverage import (
+    calculate_median_depths,
+    transform_coverage_to_coordinates,
+)
+from virtool.api.custom_json import dump_bytes
 from virtool.config.cls import Config
-from virtool.history.db import patch_to_version
+from virtool.history.db import bulk_patch_to_version
 from virtool.otus.utils import format_isolate_name
+from virtool.types import ProcessRunner
 
 if TYPE_CHECKING:
     from virtool.mongo.core import Mongo
@@ -37,16 +48,16 @@ CSV_HEADERS = (
     "Coverage",
 )
 
+EXPORT_CHUNK_SIZE = 64 * 1024
+"""The approximate size in bytes of the chunks yielded by CSV and Excel exports."""
 
-def calculate_median_depths(hits: list[dict]) -> dict[str, int]:
-    """Calculate the median depth for all hits (sequences) in a Pathoscope result
-    document.
-
-    :param hits: the pathoscope analysis document to calculate depths for
-    :return: a dict of median depths keyed by hit (sequence) ids
+FORMATTED_RESULTS_VERSION = 1
+"""
+The version of the materialized formatted results format.
 
-    """
-    return {hit["id"]: statistics.median(hit["align"]) for hit in hits}
+Increment this when the output of Pathoscope or AODP formatting changes so existing
+materialized results are ignored and rebuilt.
+"""
 
 
 async def load_results(config: Config, document: dict[str, Any]) -> dict:
@@ -77,10 +88,61 @@ async def load_results(config: Config, document: dict[str, Any]) -> dict:
     return document
 
 
+def select_process_runner(
+    config: Config,
+    results: Any,
+    run_in_process: ProcessRunner | None,
+) -> ProcessRunner | None:
+    """Decide whether CPU-heavy formatting of ``results`` should be run in the process
+    pool.
+
+    Small results are formatted on the event loop because sending them to another
+    process costs more than formatting them. Results with more than
+    ``config.analysis_format_process_threshold`` hits are formatted in the process
+    pool. The hit count is used because it is a cheap proxy for the size of the
+    results.
+
+    :param config: the application config object
+    :param results: the analysis results that will be formatted
+    :param run_in_process: the application's process pool runner
+    :return: the process pool runner if formatting should be offloaded, otherwise
+        ``None``
+
+    """
+    if run_in_process is None:
+        return None
+
+    if len(results["hits"]) < config.analysis_format_process_threshold:
+        return None
+
+    return run_in_process
+
+
+async def run_format_stage(
+    run_in_process: ProcessRunner | None,
+    func: Callable,
+    *args,
+) -> Any:
+    """Call ``func`` with ``args`` in the process pool if ``run_in_process`` is
+    provided, otherwise call it directly.
+
+    :param run_in_process: the process pool runner or ``None``
+    :param func: a picklable function
+    :param args: picklable arguments for ``func``
+    :return: the return value of ``func``
+
+    """
+    if run_in_process is None:
+        return func(*args)
+
+    return await run_in_process(func, *args)
+
+
 async def format_aodp(
     config,
     mongo: "Mongo",
     document: dict[str, Any],
+    run_in_process: ProcessRunner | None = None,
 ) -> dict[str, Any]:
     """Format an AODP analysis document by retrieving the detected OTUs and
     incorporating them into the returned document.
@@ -88,13 +150,41 @@ async def format_aodp(
     :param config: the application config object
     :param mongo: the application Mongo object
     :param document: the document to format
+    :param run_in_process: a function for running CPU-heavy work in a process pool
     :return: the formatted document
 
     """
     hits = document["results"]["hits"]
 
-    patched_otus = await gather_patched_otus(config, mongo, hits)
+    run_in_process = select_process_runner(config, document["results"], run_in_process)
+
+    patched_otus = await gather_patched_otus(config, mongo, hits, run_in_process)
+
+    return {
+        **document,
+        "results": {
+            **document["results"],
+            "hits": await run_format_stage(
+                run_in_process,
+                format_aodp_hits,
+                patched_otus,
+                hits,
+            ),
+        },
+    }
+
 
+def format_aodp_hits(
+    patched_otus: dict[str, dict],
+    hits: list[dict],
+) -> list[dict[str, Any]]:
+    """Attach AODP hits to the sequences of the OTUs they were found in.
+
+    :param patched_otus: the OTUs patched to the analyzed versions keyed by id
+    :param hits: the AODP hits
+    :return: the formatted OTUs
+
+    """
     hits_by_sequence_id = defaultdict(list)
 
     for hit in hits:
@@ -108,16 +198,14 @@ async def format_aodp(
                 sequence["hits"] = hits_by_sequence_id[sequence["_id"]]
                 sequence["id"] = sequence.pop("_id")
 
-    return {
-        **document,
-        "results": {**document["results"], "hits": list(patched_otus.values())},
-    }
+    return list(patched_otus.values())
 
 
 async def format_pathoscope(
     config,
     mongo: "Mongo",
     document: dict[str, Any],
+    run_in_process: ProcessRunner | None = None,
 ) -> dict[str, Any]:
     """Format a Pathoscope analysis document by retrieving the detected OTUs and
     incorporating them into the returned document.
@@ -127,11 +215,14 @@ async def format_pathoscope(
     :param config: the application config object
     :param mongo: the application Mongo object
     :param document: the document to format
+    :param run_in_process: a function for running CPU-heavy work in a process pool
     :return: the formatted document
 
     """
     document = await load_results(config, document)
 
+    run_in_process = select_process_runner(config, document["results"], run_in_process)
+
     hits_by_otu = defaultdict(list)
 
     for hit in document["results"]["hits"]:
@@ -140,32 +231,58 @@ async def format_pathoscope(
 
         hits_by_otu[(otu_id, otu_version)].append(hit)
 
-    coros = []
-
-    for otu_specifier, hits in hits_by_otu.items():
-        otu_id, otu_version = otu_specifier
-        coros.append(format_pathoscope_hits(config, mongo, otu_id, otu_version, hits))
+    patched_otus = await bulk_patch_to_version(
+        config.data_path,
+        mongo,
+        hits_by_otu,
+        run_in_process,
+    )
 
     return {
         **document,
-        "results": {**document["results"], "hits": await gather(*coros)},
+        "results": {
+            **document["results"],
+            "hits": await run_format_stage(
+                run_in_process,
+                format_pathoscope_otus,
+                dict(hits_by_otu),
+                patched_otus,
+            ),
+        },
     }
 
 
-async def format_pathoscope_hits(
-    config,
-    mongo: "Mongo",
+def format_pathoscope_otus(
+    hits_by_otu: dict[tuple[str, int], list[dict]],
+    patched_otus: dict[tuple[str, int], dict[str, Any]],
+) -> list[dict[str, Any]]:
+    """Format the Pathoscope hits for every OTU in an analysis.
+
+    :param hits_by_otu: the hits keyed by the ``(otu_id, version)`` they were found in
+    :param patched_otus: the OTUs patched to the analyzed versions
+    :return: the formatted OTUs
+
+    """
+    return [
+        format_pathoscope_hits(otu_id, patched_otus[(otu_id, version)], hits)
+        for (otu_id, version), hits in hits_by_otu.items()
+    ]
+
+
+def format_pathoscope_hits(
     otu_id: str,
-    otu_version,
+    patched_otu: dict[str, Any],
     hits: list[dict],
-):
-    _, patched_otu, _ = await patch_to_version(
-        config.data_path,
-        mongo,
-        otu_id,
-        otu_version,
-    )
+) -> dict[str, Any]:
+    """Format the Pathoscope hits for a single OTU patched to the version used in the
+    analysis.
+
+    :param otu_id: the id of the OTU
+    :param patched_otu: the OTU patched to the analyzed version
+    :param hits: the hits for sequences in the OTU
+    :return: the formatted OTU
 
+    """
     max_sequence_length = 0
 
     for isolate in patched_otu["isolates"]:
@@ -238,6 +355,7 @@ async def format_nuvs(
     config: Config,
     mongo: "Mongo",
     document: dict[str, Any],
+    run_in_process: ProcessRunner | None = None,
 ) -> dict[str, Any]:
     """Format a NuVs analysis document by attaching the HMM annotation data to the
     results.
@@ -245,11 +363,14 @@ async def format_nuvs(
     :param config: the config object
     :param mongo: the database object
     :param document: the document to format
+    :param run_in_process: a function for running CPU-heavy work in a process pool
     :return: the formatted document
 
     """
     document = await load_results(config, document)
 
+    run_in_process = select_process_runner(config, document["results"], run_in_process)
+
     hits = document["results"]["hits"]
 
     hit_ids = list({h["hit"] for s in hits for o in s["orfs"] for h in o["hits"]})
@@ -258,90 +379,168 @@ async def format_nuvs(
 
     hmms = {d.pop("_id"): d async for d in cursor}
 
+    return {
+        **document,
+        "results": {
+            **document["results"],
+            "hits": await run_format_stage(
+                run_in_process,
+                format_nuvs_hits,
+                hits,
+                hmms,
+            ),
+        },
+    }
+
+
+def format_nuvs_hits(hits: list[dict], hmms: dict[str, dict]) -> list[dict]:
+    """Merge HMM annotation data into the ORF hits of NuVs sequences.
+
+    :param hits: the NuVs sequences
+    :param hmms: the HMM annotations keyed by HMM id
+    :return: the annotated NuVs sequences
+
+    """
     for sequence in hits:
         for orf in sequence["orfs"]:
             for hit in orf["hits"]:
                 hit.update(hmms[hit["hit"]])
 
-    return document
+    return hits
+
+
+def iter_analysis_rows(
+    formatted: dict[str, Any],
+    depths: dict[str, int | float],
+) -> Iterator[list]:
+    """Yield the rows of a CSV or Excel export of a formatted Pathoscope analysis.
+
+    :param formatted: the formatted analysis document
+    :param depths: the median depths keyed by sequence id
+    :return: a generator of rows matching :data:`CSV_HEADERS`
+
+    """
+    for otu in formatted["results"]["hits"]:
+        for isolate in otu["isolates"]:
+            for sequence in isolate["sequences"]:
+                yield [
+                    otu["name"],
+                    format_isolate_name(isolate),
+                    sequence["accession"],
+                    sequence["length"],
+                    sequence["pi"],
+                    depths.get(sequence["id"], 0),
+                    sequence["coverage"],
+                ]
 
 
 async def format_analysis_to_excel(
     config: Config,
     mongo: "Mongo",
     document: dict[str, Any],
-) -> bytes:
+    run_in_process: ProcessRunner | None = None,
+) -> AsyncIterator[bytes]:
     """Convert a pathoscope analysis document to byte-encoded Excel format for download.
 
+    The workbook is built in write-only mode in a thread, or the process pool for large
+    analyses, and spooled to a temporary file so the event loop isn't blocked and rows
+    aren't held in memory as cell objects. The file is then yielded in chunks.
+
     :param config: the config object
     :param mongo: the database object
     :param document: the document to format
-    :return: the formatted Excel workbook
+    :param run_in_process: a function for running CPU-heavy work in a process pool
+    :return: an async generator of chunks of the Excel workbook
 
     """
-    depths = calculate_median_depths(document["results"]["hits"])
+    formatted = await format_analysis_materialized(
+        config,
+        mongo,
+        document,
+        run_in_process,
+    )
 
-    formatted = await format_analysis(config, mongo, document)
+    run = (
+        select_process_runner(config, document["results"], run_in_process)
+        or asyncio.to_thread
+    )
 
-    output = io.BytesIO()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "analysis.xlsx"
 
-    wb = openpyxl.Workbook()
-    ws = wb.active
+        await run(
+            write_analysis_to_excel,
+            path,
+            f"Pathoscope for {document['sample']['id']}",
+            formatted,
+            document["results"]["hits"],
+        )
 
-    ws.title = f"Pathoscope for {document['sample']['id']}"
+        async with aiofiles.open(path, "rb") as f:
+            while chunk := await f.read(EXPORT_CHUNK_SIZE):
+                yield chunk
 
-    header_font = openpyxl.styles.Font(name="Calibri", bold=True)
 
-    for index, header in enumerate(CSV_HEADERS):
-        col = index + 1
-        cell = ws.cell(column=col, row=1, value=header)
-        cell.font = header_font
+def write_analysis_to_excel(
+    path: Path,
+    title: str,
+    formatted: dict[str, Any],
+    hits: list[dict],
+):
+    """Write an Excel workbook for a formatted Pathoscope analysis to ``path``.
 
-    rows = []
+    :param path: the path to write the workbook to
+    :param title: the title of the worksheet
+    :param formatted: the formatted analysis document
+    :param hits: the unformatted Pathoscope hits used to calculate median depths
 
-    for otu in formatted["results"]["hits"]:
-        for isolate in otu["isolates"]:
-            for sequence in isolate["sequences"]:
-                row = [
-                    otu["name"],
-                    format_isolate_name(isolate),
-                    sequence["accession"],
-                    sequence["length"],
-                    sequence["pi"],
-                    depths.get(sequence["id"], 0),
-                    sequence["coverage"],
-                ]
+    """
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet(title)
 
-                assert len(row) == len(CSV_HEADERS)
+    header_font = openpyxl.styles.Font(name="Calibri", bold=True)
 
-                rows.append(row)
+    header = []
 
-    for row_index, row in enumerate(rows):
-        row_number = row_index + 2
-        for col_index, value in enumerate(row):
-            ws.cell(column=col_index + 1, row=row_number, value=value)
+    for value in CSV_HEADERS:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = header_font
+        header.append(cell)
+
+    ws.append(header)
 
-    wb.save(output)
+    for row in iter_analysis_rows(formatted, calculate_median_depths(hits)):
+        ws.append(row)
 
-    return output.getvalue()
+    wb.save(path)
 
 
 async def format_analysis_to_csv(
     config: Config,
     mongo: "Mongo",
     document: dict[str, Any],
-) -> str:
+    run_in_process: ProcessRunner | None = None,
+) -> AsyncIterator[bytes]:
     """Convert a pathoscope analysis document to CSV format for download.
 
+    Rows are encoded and yielded in chunks of about :data:`EXPORT_CHUNK_SIZE` bytes
+    so they can be written to the response as they are generated.
+
     :param config: the app config object
     :param mongo: the app mongo object
     :param document: the document to format
-    :return: the formatted CSV data
+    :param run_in_process: a function for running CPU-heavy work in a process pool
+    :return: an async generator of chunks of the CSV data
 
     """
     depths = calculate_median_depths(document["results"]["hits"])
 
-    formatted = await format_analysis(config, mongo, document)
+    formatted = await format_analysis_materialized(
+        config,
+        mongo,
+        document,
+        run_in_process,
+    )
 
     output = io.StringIO()
 
@@ -349,34 +548,34 @@ async def format_analysis_to_csv(
 
     writer.writerow(CSV_HEADERS)
 
-    for otu in formatted["results"]["hits"]:
-        for isolate in otu["isolates"]:
-            for sequence in isolate["sequences"]:
-                row = [
-                    otu["name"],
-                    format_isolate_name(isolate),
-                    sequence["accession"],
-                    sequence["length"],
-                    sequence["pi"],
-                    depths.get(sequence["id"], 0),
-                    sequence["coverage"],
-                ]
+    for row in iter_analysis_rows(formatted, depths):
+        writer.writerow(row)
+
+        if output.tell() >= EXPORT_CHUNK_SIZE:
+            yield output.getvalue().encode()
 
-                writer.writerow(row)
+            output.seek(0)
+            output.truncate()
 
-    return output.getvalue()
+    if output.tell():
+        yield output.getvalue().encode()
 
 
 async def format_analysis(
     config: Config,
     mongo: "Mongo",
     document: dict[str, Any],
+    run_in_process: ProcessRunner | None = None,
 ) -> dict[str, any]:
     """Format an analysis document to be returned by the API.
 
+    If ``run_in_process`` is provided, CPU-heavy formatting of results with more than
+    ``config.analysis_format_process_threshold`` hits is run in the process pool.
+
     :param config: the config object
     :param mongo: the database object
     :param document: the analysis document to format
+    :param run_in_process: a function for running CPU-heavy work in a process pool
     :return: a formatted document
 
     """
@@ -386,13 +585,13 @@ async def format_analysis(
         raise ValueError("Analysis has no workflow field")
 
     if workflow == AnalysisWorkflow.nuvs.value:
-        return await format_nuvs(config, mongo, document)
+        return await format_nuvs(config, mongo, document, run_in_process)
 
     if workflow == AnalysisWorkflow.aodp.value:
-        return await format_aodp(config, mongo, document)
+        return await format_aodp(config, mongo, document, run_in_process)
 
     if "pathoscope" in workflow:
-        return await format_pathoscope(config, mongo, document)
+        return await format_pathoscope(config, mongo, document, run_in_process)
 
     if workflow == AnalysisWorkflow.iimi.value:
         return document
@@ -400,57 +599,173 @@ async def format_analysis(
     raise ValueError(f"Unknown workflow: {workflow}")
 
 
-async def gather_patched_otus(
-    config,
+def check_formatted_results_cacheable(document: dict[str, Any]) -> bool:
+    """Check whether the formatted results for an analysis can be materialized.
+
+    Only ready Pathoscope and AODP results are materialized. Their formatted results
+    only depend on the immutable analysis results and OTU versions.
+
+    :param document: the analysis document
+    :return: whether the formatted results can be materialized
+
+    """
+    workflow = document.get("workflow") or ""
+
+    return bool(document.get("ready")) and (
+        workflow == AnalysisWorkflow.aodp.value or "pathoscope" in workflow
+    )
+
+
+def compose_formatted_results_key(document: dict[str, Any]) -> str:
+    """Compose a key that identifies the state of an analysis the formatted results
+    were derived from.
+
+    Materialized results with a different key are stale.
+
+    :param document: the analysis document
+    :return: the key
+    """
+    updated_at = document.get("updated_at")
+
+    return ":".join(
+        [
+            str(FORMATTED_RESULTS_VERSION),
+            document["_id"],
+            updated_at.isoformat() if updated_at else "",
+        ],
+    )
+
+
+def read_formatted_results(path: Path, key: str) -> Any | None:
+    """Read materialized formatted results from ``path``.
+
+    Returns ``None`` if the file doesn't exist, can't be read, or was written for a
+    different ``key``.
+
+    :param path: the path to the materialized results
+    :param key: the expected key
+    :return: the formatted results or ``None``
+
+    """
+    try:
+        with gzip.open(path, "rb") as f:
+            data = orjson.loads(f.read())
+    except (FileNotFoundError, EOFError, OSError, orjson.JSONDecodeError):
+        return None
+
+    if data.get("key") != key:
+        return None
+
+    return data["results"]
+
+
+def write_formatted_results(path: Path, key: str, results: Any):
+    """Write materialized formatted results to ``path``.
+
+    The file is written to a temporary path and moved into place so a partial file is
+    never read.
+
+    :param path: the path to write the materialized results to
+    :param key: the key identifying the analysis state
+    :param results: the formatted results
+
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+
+    with gzip.open(temp_path, "wb", compresslevel=6) as f:
+        f.write(dump_bytes({"key": key, "results": results}))
+
+    os.replace(temp_path, path)
+
+
+async def format_analysis_materialized(
+    config: Config,
     mongo: "Mongo",
-    results: list[dict],
-) -> dict[str, dict]:
-    """Gather patched OTUs for each result item. Only fetch each id-version combination
-    once.
+    document: dict[str, Any],
+    run_in_process: ProcessRunner | None = None,
+) -> dict[str, Any]:
+    """Format an analysis document, reusing materialized formatted results if they
+    exist.
+
+    The formatted results of ready Pathoscope and AODP analyses are written next to
+    the analysis JSON the first time they are built. Later calls read them back instead
+    of re-patching OTUs and recalculating coverage.
 
     :param config: the config object
     :param mongo: the database object
-    :param results: the results field from a pathoscope analysis document
-    :return: a dict containing patched OTUs keyed by the OTU ID
+    :param document: the analysis document to format
+    :param run_in_process: a function for running CPU-heavy work in a process pool
+    :return: a formatted document
 
     """
-    # Use set to only id-version combinations once.
-    otu_specifiers = {(hit["otu"]["id"], hit["otu"]["version"]) for hit in results}
+    if not check_formatted_results_cacheable(document):
+        return await format_analysis(config, mongo, document, run_in_process)
 
-    patched_otus = await asyncio.gather(
-        *[
-            patch_to_version(config.data_path, mongo, otu_id, version)
-            for otu_id, version in otu_specifiers
-        ],
+    path = virtool.analyses.utils.join_formatted_results_path(
+        config.data_path,
+        document["_id"],
+        document["sample"]["id"],
     )
 
-    return {patched["_id"]: patched for _, patched, _ in patched_otus}
+    key = compose_formatted_results_key(document)
+
+    if (results := await asyncio.to_thread(read_formatted_results, path, key)) is None:
+        formatted = await format_analysis(config, mongo, document, run_in_process)
 
+        await asyncio.to_thread(
+            write_formatted_results,
+            path,
+            key,
+            formatted["results"],
+        )
+
+        return formatted
 
-def transform_coverage_to_coordinates(
-    coverage_list: list[int],
-) -> list[tuple[int, int]]:
-    """Takes a list of read depths where the list index is equal to the read position
-    plus one and returns a list of (x, y) coordinates.
+    return {**document, "results": results}
 
-    The coordinates will be simplified using Visvalingham-Wyatt algorithm if the list
-    exceeds 100 pairs.
 
-    :param coverage_list: a list of position-indexed depth values
-    :return: a list of (x, y) coordinates
+async def remove_formatted_results(config: Config, analysis_id: str, sample_id: str):
+    """Remove the materialized formatted results for an analysis if they exist.
+
+    :param config: the config object
+    :param analysis_id: the ID of the analysis
+    :param sample_id: the ID of the parent sample
     """
-    coordinates = [(0, coverage_list[0])]
+    path = virtool.analyses.utils.join_formatted_results_path(
+        config.data_path,
+        analysis_id,
+        sample_id,
+    )
 
-    last = len(coverage_list) - 1
+    await asyncio.to_thread(path.unlink, missing_ok=True)
 
-    for x in range(1, last):
-        y = coverage_list[x]
-        if y != coverage_list[x - 1] or y != coverage_list[x + 1]:
-            coordinates.append((x, y))
 
-    coordinates.append((last, coverage_list[last]))
+async def gather_patched_otus(
+    config,
+    mongo: "Mongo",
+    results: list[dict],
+    run_in_process: ProcessRunner | None = None,
+) -> dict[str, dict]:
+    """Gather patched OTUs for each result item. Only fetch each id-version combination
+    once.
 
-    if len(coordinates) > 100:
-        return vw.simplify(coordinates, ratio=0.4)
+    :param config: the config object
+    :param mongo: the database object
+    :param results: the results field from a pathoscope analysis document
+    :param run_in_process: a function for running history patching in a process pool
+    :return: a dict containing patched OTUs keyed by the OTU ID
+
+    """
+    # Use set to only id-version combinations once.
+    otu_specifiers = {(hit["otu"]["id"], hit["otu"]["version"]) for hit in results}
+
+    patched_otus = await bulk_patch_to_version(
+        config.data_path,
+        mongo,
+        otu_specifiers,
+        run_in_process,
+    )
 
-    return coordinates
+    return {patched["_id"]: patched for patched in patched_otus.values()}
@@ -90,3 +90,22 @@ def join_analysis_json_path(data_path: Path, analysis_id: str, sample_id: str) -
 
     """
     return join_analysis_path(data_path, analysis_id, sample_id) / "results.json"
+
+
+def join_formatted_results_path(
+    data_path: Path, analysis_id: str, sample_id: str
+) -> Path:
+    """
+    Join the path to the materialized formatted results for the given sample-analysis ID
+    combination.
+
+    The file stores the formatted results of a ready analysis so they don't have to be
+    recalculated for every request.
+
+    :param data_path: the path to the application data
+    :param analysis_id: the ID of the analysis
+    :param sample_id: the ID of the sample
+    :return: a path
+
+    """
+    return join_analysis_path(data_path, analysis_id, sample_id) / "formatted.json.gz"
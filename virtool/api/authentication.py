@@ -13,11 +13,11 @@ from virtool.api.policy import (
     PublicRoutePolicy,
 )
 from virtool.config import get_config_from_req
+from virtool.data.errors import ResourceNotFoundError
 from virtool.data.utils import get_data_from_req
 from virtool.errors import AuthError
 from virtool.oidc.utils import validate_token
 from virtool.users.db import B2CUserAttributes
-from virtool.users.utils import limit_permissions
 
 logger = get_logger("authn")
 
@@ -54,24 +54,27 @@ async def authenticate_with_api_key(
     req: Request, handler: Callable, handle: str, key: str
 ) -> Response:
     """Authenticate the request with the provided user handle and API key."""
-    user = await get_data_from_req(req).users.get_by_handle(handle)
-
-    logger.info("authenticating api key", user=user.id)
-
-    key = await get_data_from_req(req).account.get_key_by_secret(user.id, key)
+    try:
+        user_id, state = await get_data_from_req(req).account.authenticate_key(
+            handle, key
+        )
+    except ResourceNotFoundError:
+        state = None
 
-    if not user or not user.active or not key:
+    if not state or not state.active:
         raise APIUnauthorized(
             "Invalid authorization header", error_id="invalid_authorization_header"
         )
 
+    logger.info("authenticated api key", user=user_id)
+
     req["client"] = UserClient(
-        administrator_role=user.administrator_role,
+        administrator_role=state.administrator_role,
         authenticated=True,
         force_reset=False,
-        groups=[group.id for group in user.groups],
-        permissions=limit_permissions(user.permissions.dict(), key.permissions.dict()),
-        user_id=user.id,
+        groups=list(state.groups),
+        permissions=state.permissions,
+        user_id=user_id,
     )
 
     return await handler(req)
@@ -135,24 +138,30 @@ async def authenticate_with_b2c(req: Request, handler: Callable) -> Response:
 
 
 async def authenticate_with_session(req: Request, handler: Callable) -> Response:
-    """Authenticate the given request with session information in the cookie."""
+    """Authenticate the given request with session information in the cookie.
+
+    The user state is read from a short-lived cache, so authenticating a user that made
+    a recent request does not touch the databases.
+    """
     session = req["session"]
 
     if not session.authentication:
         raise APIUnauthorized("Requires authorization")
 
-    user = await get_data_from_req(req).users.get(session.authentication.user_id)
+    user_id = session.authentication.user_id
 
-    if not user.active:
+    state = await get_data_from_req(req).users.get_client_state(user_id)
+
+    if not state.active:
         raise APIUnauthorized("User is deactivated", error_id="deactivated_user")
 
     req["client"] = UserClient(
-        administrator_role=user.administrator_role,
+        administrator_role=state.administrator_role,
         authenticated=True,
-        force_reset=user.force_reset,
-        groups=[group.id for group in user.groups],
-        permissions=user.permissions.dict(),
-        user_id=user.id,
+        force_reset=state.force_reset,
+        groups=list(state.groups),
+        permissions=dict(state.permissions),
+        user_id=user_id,
         session_id=session.id,
     )
 
@@ -30,9 +30,11 @@ from virtool.startup import (
     startup_events,
     startup_executors,
     startup_http_client_session,
+    startup_key_cache,
     startup_routes,
     startup_sentry,
     startup_settings,
+    startup_user_client_cache,
     startup_version,
     startup_ws,
 )
@@ -100,6 +102,8 @@ def create_app(config: Config):
             startup_executors,
             startup_ws,
             startup_data,
+            startup_user_client_cache,
+            startup_key_cache,
             startup_settings,
             startup_sentry,
             startup_check_db,
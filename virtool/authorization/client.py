@@ -3,6 +3,7 @@ The client class and utilities for managing authorization.
 
 """
 import asyncio
+import time
 
 from aiohttp.web_request import Request
 from openfga_sdk import (
@@ -30,6 +31,20 @@ from virtool.authorization.results import (
 )
 from virtool.types import App
 
+AUTHORIZATION_CACHE_TTL = 5
+"""The number of seconds authorization decisions are cached for."""
+
+AUTHORIZATION_MAX_CONCURRENCY = 20
+"""The maximum number of concurrent OpenFGA requests made by a batch check."""
+
+AuthorizationCheck = tuple[
+    str,
+    Permission | ReferencePermission | AdministratorRole,
+    ResourceType,
+    str | int,
+]
+"""A user ID, permission, resource type and resource ID to check."""
+
 
 class AuthorizationClient:
     """
@@ -38,12 +53,31 @@ class AuthorizationClient:
     The client is currently backed by OpenFGA, but is built to abstract away the
     underlying authorization service.
 
+    Check decisions and administrator roles are cached for ``cache_ttl`` seconds. The
+    cache is cleared whenever relationships are added or removed through the client.
+    Changes made by other instances of the application are seen once their cached
+    decisions expire.
+
     """
 
-    def __init__(self, openfga: OpenFgaApi):
+    def __init__(
+        self,
+        openfga: OpenFgaApi,
+        cache_ttl: float = AUTHORIZATION_CACHE_TTL,
+        max_concurrency: int = AUTHORIZATION_MAX_CONCURRENCY,
+    ):
         #: The backing OpenFGA API instance.
         self.openfga = openfga
 
+        self._cache: dict[tuple, tuple[float, object]] = {}
+        self._cache_ttl = cache_ttl
+
+        #: Incremented when the cache is cleared so results of requests that started
+        #: before then are not cached.
+        self._generation = 0
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
     async def close(self):
         """Close the authorization client."""
         await self.openfga.close()
@@ -58,19 +92,90 @@ class AuthorizationClient:
         """
         Check whether a user has the given role on a resource.
         """
+        return (
+            await self.check_many([(user_id, permission, resource_type, resource_id)])
+        )[0]
 
-        response = await self.openfga.check(
-            CheckRequest(
-                tuple_key=TupleKey(
-                    user=f"user:{user_id}",
-                    relation=permission.value,
-                    object=f"{resource_type.value}:{resource_id}",
-                ),
+    async def check_many(self, checks: list[AuthorizationCheck]) -> list[bool]:
+        """
+        Check whether users have the given roles on resources.
+
+        Use this instead of calling :meth:`check` in a loop, for example when filtering
+        a list of resources. Duplicate checks are only made once and checks that aren't
+        cached are made concurrently.
+
+        :param checks: the user ID, permission, resource type, and resource ID to check
+        :return: whether each check is allowed in the same order as ``checks``
+        """
+        keys = [
+            (
+                "check",
+                f"user:{user_id}",
+                permission.value,
+                f"{resource_type.value}:{resource_id}",
+            )
+            for user_id, permission, resource_type, resource_id in checks
+        ]
+
+        decisions = {}
+        missing = []
+
+        for key in keys:
+            if key in decisions:
+                continue
+
+            decision = self._get_cached(key)
+
+            if decision is None:
+                decisions[key] = None
+                missing.append(key)
+            else:
+                decisions[key] = decision
+
+        if missing:
+            generation = self._generation
+
+            results = await asyncio.gather(
+                *[self._check(user, relation, obj) for _, user, relation, obj in missing]
+            )
+
+            for key, allowed in zip(missing, results):
+                decisions[key] = allowed
+                self._set_cached(key, allowed, generation)
+
+        return [decisions[key] for key in keys]
+
+    async def _check(self, user: str, relation: str, obj: str) -> bool:
+        async with self._semaphore:
+            response = await self.openfga.check(
+                CheckRequest(
+                    tuple_key=TupleKey(user=user, relation=relation, object=obj),
+                )
             )
-        )
 
         return response.allowed
 
+    def _get_cached(self, key: tuple):
+        entry = self._cache.get(key)
+
+        if entry is None:
+            return None
+
+        if entry[0] <= time.monotonic():
+            del self._cache[key]
+            return None
+
+        return entry[1]
+
+    def _set_cached(self, key: tuple, value, generation: int):
+        if generation == self._generation:
+            self._cache[key] = (time.monotonic() + self._cache_ttl, value)
+
+    def clear_cache(self):
+        """Clear all cached authorization decisions."""
+        self._cache.clear()
+        self._generation += 1
+
     async def get_space_roles(self, space_id: int) -> list[str]:
         """
         Return a list of base roles for a space.
@@ -91,17 +196,27 @@ class AuthorizationClient:
     async def get_administrator(
         self, user_id: str
     ) -> tuple[str, AdministratorRole | None]:
-        response = await self.openfga.read(
-            ReadRequest(
-                tuple_key=TupleKey(user=f"user:{user_id}", object="app:virtool"),
+        key = ("administrator", user_id)
+
+        if cached := self._get_cached(key):
+            return cached
+
+        generation = self._generation
+
+        async with self._semaphore:
+            response = await self.openfga.read(
+                ReadRequest(
+                    tuple_key=TupleKey(user=f"user:{user_id}", object="app:virtool"),
+                )
             )
-        )
 
         role = None
         if response.tuples:
             role = AdministratorRole(response.tuples[0].key.relation)
             user_id = response.tuples[0].key.user.split(":")[1]
 
+        self._set_cached(key, (user_id, role), generation)
+
         return user_id, role
 
     async def list_administrators(self) -> list[tuple[str, AdministratorRole]]:
@@ -131,28 +246,25 @@ class AuthorizationClient:
         :param user_id: the id of the user
         :return: a list of space ids
         """
-        response = await self.openfga.read(
-            ReadRequest(
-                tuple_key=TupleKey(
-                    user=f"user:{user_id}", relation="member", object="space:"
-                ),
-            )
+        responses = await asyncio.gather(
+            *[
+                self.openfga.read(
+                    ReadRequest(
+                        tuple_key=TupleKey(
+                            user=f"user:{user_id}", relation=relation, object="space:"
+                        ),
+                    )
+                )
+                for relation in ("member", "owner")
+            ]
         )
 
-        test = [int(relation.key.object.split(":")[1]) for relation in response.tuples]
-
-        response = await self.openfga.read(
-            ReadRequest(
-                tuple_key=TupleKey(
-                    user=f"user:{user_id}", relation="owner", object="space:"
-                ),
-            )
+        return sorted(
+            int(relation.key.object.split(":")[1])
+            for response in responses
+            for relation in response.tuples
         )
 
-        test2 = [int(relation.key.object.split(":")[1]) for relation in response.tuples]
-
-        return sorted([*test, *test2])
-
     async def list_user_roles(self, user_id: str, space_id: int) -> list[SpaceRoleType]:
         response = await self.openfga.read(
             ReadRequest(
@@ -253,6 +365,8 @@ class AuthorizationClient:
             [asyncio.create_task(self.openfga.write(request)) for request in requests]
         )
 
+        self.clear_cache()
+
         result = AddRelationshipResult(0, 0)
 
         for aw in done:
@@ -288,6 +402,8 @@ class AuthorizationClient:
             [asyncio.create_task(self.openfga.write(request)) for request in requests]
         )
 
+        self.clear_cache()
+
         result = RemoveRelationshipResult(0, 0)
 
         for aw in done:
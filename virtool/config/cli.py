@@ -16,11 +16,15 @@ from virtool.config.cls import (
 )
 from virtool.config.options import (
     address_options,
+    analysis_format_process_threshold_option,
     b2c_options,
     base_url_option,
     data_path_option,
     dev_option,
+    event_queue_options,
+    event_stream_options,
     flags_option,
+    job_timeout_batch_size_option,
     mongodb_connection_string_option,
     no_check_db_option,
     no_revision_check_option,
@@ -66,10 +70,13 @@ def server():
 
 @server.command("api")
 @address_options
+@analysis_format_process_threshold_option
 @b2c_options
 @base_url_option
 @data_path_option
 @dev_option
+@event_queue_options
+@event_stream_options
 @flags_option
 @mongodb_connection_string_option
 @no_check_db_option
@@ -91,6 +98,8 @@ def start_api_server(**kwargs):
 @address_options
 @data_path_option
 @dev_option
+@event_queue_options
+@event_stream_options
 @flags_option
 @mongodb_connection_string_option
 @no_check_db_option
@@ -165,6 +174,9 @@ def tasks():
 @address_options
 @data_path_option
 @dev_option
+@event_queue_options
+@event_stream_options
+@job_timeout_batch_size_option
 @mongodb_connection_string_option
 @no_revision_check_option
 @openfga_options
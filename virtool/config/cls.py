@@ -15,6 +15,27 @@ from pymongo.uri_parser import parse_uri
 from virtool.authorization.openfga import OpenfgaScheme
 from virtool.flags import FlagName
 
+ANALYSIS_FORMAT_PROCESS_THRESHOLD = 1000
+"""
+The default number of analysis hits above which CPU-heavy formatting is run in the
+process pool.
+"""
+
+EVENT_BLOCK_TIMEOUT = 5.0
+"""The default number of seconds an emitter waits for space in a full event queue."""
+
+EVENT_OVERFLOW_POLICY = "block"
+"""The default policy for events emitted when the event queue is full."""
+
+EVENT_QUEUE_SIZE = 10000
+"""The default maximum number of events waiting to be published."""
+
+EVENT_STREAM_MAX_LENGTH = 100000
+"""The default approximate number of events retained in the Redis event stream."""
+
+JOB_TIMEOUT_BATCH_SIZE = 500
+"""The default maximum number of dead jobs timed out in a single bulk write."""
+
 
 @dataclass
 class MigrationConfig:
@@ -63,6 +84,13 @@ class ServerConfig:
     redis_connection_string: str
     use_b2c: bool
     sentry_dsn: str | None
+    analysis_format_process_threshold: int = ANALYSIS_FORMAT_PROCESS_THRESHOLD
+    event_block_timeout: float = EVENT_BLOCK_TIMEOUT
+    event_overflow_policy: str = EVENT_OVERFLOW_POLICY
+    event_queue_size: int = EVENT_QUEUE_SIZE
+    event_stream_max_length: int = EVENT_STREAM_MAX_LENGTH
+    job_timeout_batch_size: int = JOB_TIMEOUT_BATCH_SIZE
+    use_event_stream: bool = False
 
     @property
     def mongodb_database(self) -> str:
@@ -88,6 +116,13 @@ class TaskRunnerConfig:
     postgres_connection_string: str
     redis_connection_string: str
     sentry_dsn: str
+    analysis_format_process_threshold: int = ANALYSIS_FORMAT_PROCESS_THRESHOLD
+    event_block_timeout: float = EVENT_BLOCK_TIMEOUT
+    event_overflow_policy: str = EVENT_OVERFLOW_POLICY
+    event_queue_size: int = EVENT_QUEUE_SIZE
+    event_stream_max_length: int = EVENT_STREAM_MAX_LENGTH
+    job_timeout_batch_size: int = JOB_TIMEOUT_BATCH_SIZE
+    use_event_stream: bool = False
 
     @property
     def mongodb_database(self) -> str:
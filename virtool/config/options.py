@@ -14,6 +14,14 @@ import os
 
 import click
 
+from virtool.config.cls import (
+    ANALYSIS_FORMAT_PROCESS_THRESHOLD,
+    EVENT_BLOCK_TIMEOUT,
+    EVENT_OVERFLOW_POLICY,
+    EVENT_QUEUE_SIZE,
+    EVENT_STREAM_MAX_LENGTH,
+    JOB_TIMEOUT_BATCH_SIZE,
+)
 from virtool.flags import FlagName
 
 
@@ -79,6 +87,71 @@ def b2c_options(func):
     return func
 
 
+def event_stream_options(func):
+    for decorator in [
+        click.option(
+            "--use-event-stream",
+            default=get_from_environment("use_event_stream", False),
+            help="Publish and receive events using a Redis stream instead of pub/sub",
+            is_flag=True,
+        ),
+        click.option(
+            "--event-stream-max-length",
+            default=get_from_environment(
+                "event_stream_max_length",
+                EVENT_STREAM_MAX_LENGTH,
+            ),
+            help="The approximate number of events retained in the event stream",
+            type=int,
+        ),
+    ]:
+        func = decorator(func)
+
+    return func
+
+
+def event_queue_options(func):
+    for decorator in [
+        click.option(
+            "--event-queue-size",
+            default=get_from_environment("event_queue_size", EVENT_QUEUE_SIZE),
+            help="The maximum number of events waiting to be published",
+            type=int,
+        ),
+        click.option(
+            "--event-overflow-policy",
+            default=get_from_environment(
+                "event_overflow_policy",
+                EVENT_OVERFLOW_POLICY,
+            ),
+            help="What to do with events emitted when the event queue is full. "
+            "Spilling requires --use-event-stream",
+            type=click.Choice(["merge", "block", "spill"], case_sensitive=False),
+        ),
+        click.option(
+            "--event-block-timeout",
+            default=get_from_environment("event_block_timeout", EVENT_BLOCK_TIMEOUT),
+            help="The number of seconds to wait for space in a full event queue when "
+            "the overflow policy is block",
+            type=float,
+        ),
+    ]:
+        func = decorator(func)
+
+    return func
+
+
+analysis_format_process_threshold_option = click.option(
+    "--analysis-format-process-threshold",
+    default=get_from_environment(
+        "analysis_format_process_threshold",
+        ANALYSIS_FORMAT_PROCESS_THRESHOLD,
+    ),
+    help="The number of analysis hits above which formatting is run in a separate "
+    "process",
+    type=int,
+)
+
 base_url_option = click.option(
     "--base-url",
     default=get_from_environment("base_url", ""),
@@ -109,6 +182,13 @@ flags_option = click.option(
     default=[],
 )
 
+job_timeout_batch_size_option = click.option(
+    "--job-timeout-batch-size",
+    default=get_from_environment("job_timeout_batch_size", JOB_TIMEOUT_BATCH_SIZE),
+    help="The maximum number of dead jobs timed out in a single database write",
+    type=int,
+)
+
 mongodb_connection_string_option = click.option(
     "--mongodb-connection-string",
     default=get_from_environment(
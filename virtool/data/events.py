@@ -1,20 +1,33 @@
 import asyncio
 import functools
 from asyncio import CancelledError
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
-from typing import AsyncGenerator, Awaitable, Callable
+from itertools import count
+from typing import TYPE_CHECKING, AsyncGenerator, Awaitable, Callable
 
+import orjson
 from structlog import get_logger
 from virtool_core.models.basemodel import BaseModel
 from virtool_core.redis import Redis
 
 from virtool.api.custom_json import dump_string
+from virtool.config.cls import EVENT_BLOCK_TIMEOUT, EVENT_QUEUE_SIZE
 from virtool.utils import get_model_by_name, timestamp
 
+if TYPE_CHECKING:
+    from virtool.data.streams import EventStream
+
 logger = get_logger("events")
 
+EVENT_COALESCING_WINDOW = 0.05
+"""The default number of seconds that events are collected for before publishing."""
+
+EVENT_BATCH_SIZE = 500
+"""The default maximum number of events published in a single message."""
+
 
 class Operation(str, Enum):
     """The possible operations that can be performed on a resource."""
@@ -33,6 +46,46 @@ class Event:
     operation: Operation
     timestamp: datetime
 
+    #: The ID of the event in the event stream if it was received from one.
+    stream_id: str | None = None
+
+
+class EventOverflowPolicy(str, Enum):
+    """What to do when an event is emitted and the event queue is full.
+
+    Updates to a resource that already has an update waiting in the queue are always
+    merged into the waiting update, so they never need space in the queue.
+
+    ``MERGE`` drops other events when the queue is full.
+
+    ``BLOCK`` makes emitters that can wait, such as methods decorated with ``@emits``,
+    wait up to a timeout for space in the queue before dropping the event. Events
+    emitted with ``emit()`` are dropped immediately.
+
+    ``SPILL`` adds events that don't fit in the queue directly to the event stream
+    instead of dropping them. Spilled events can be received before events that were
+    emitted earlier and are still waiting in the queue. Events are dropped if no event
+    stream is configured.
+    """
+
+    MERGE = "merge"
+    BLOCK = "block"
+    SPILL = "spill"
+
+
+def _get_event_key(event: Event, unique_keys: count) -> tuple:
+    """Get a key that is shared by update events for the same resource.
+
+    Other events get a unique key from ``unique_keys``.
+    """
+    if event.operation == Operation.UPDATE:
+        resource_id = getattr(event.data, "id", None)
+
+        if resource_id is not None:
+            return event.domain, resource_id
+
+    return (next(unique_keys),)
+
 
 class _InternalEventsTarget:
     """A target for emitting events that are used internally by the application.
@@ -42,23 +95,144 @@ class _InternalEventsTarget:
 
     """
 
-    q = asyncio.Queue(maxsize=1000)
+    def __init__(self):
+        self.max_size = EVENT_QUEUE_SIZE
+        self.policy = EventOverflowPolicy.BLOCK
+        self.block_timeout = EVENT_BLOCK_TIMEOUT
+        self.stream: "EventStream | None" = None
+        self._spill_tasks: set[asyncio.Task] = set()
+        self.clear()
+
+    @property
+    def full(self) -> bool:
+        return len(self._events) >= self.max_size
+
+    @property
+    def metrics(self) -> dict[str, float | int]:
+        """The event queue depth, counts of dropped, merged, and spilled events, and
+        the latency of the most recently published event.
+        """
+        return {
+            "depth": len(self._events),
+            "dropped": self.dropped,
+            "merged": self.merged,
+            "publish_latency": self.publish_latency,
+            "spilled": self.spilled,
+        }
+
+    @property
+    def spilling(self) -> bool:
+        return self.policy == EventOverflowPolicy.SPILL and self.stream is not None
 
     def emit(self, event: Event):
-        for _ in range(3):
+        """Add an event to the queue without waiting."""
+        key = _get_event_key(event, self._unique_keys)
+
+        if key in self._events:
+            del self._events[key]
+            self.merged += 1
+        elif self.full:
+            if self.spilling:
+                task = asyncio.create_task(self._spill(event))
+                self._spill_tasks.add(task)
+                task.add_done_callback(self._spill_tasks.discard)
+            else:
+                self._drop(event)
+
+            return
+
+        self._events[key] = event
+        self._ready.set()
+
+    async def put(self, event: Event):
+        """Add an event to the queue, waiting for space if the queue is full and the
+        overflow policy is ``BLOCK``.
+
+        If the policy is ``SPILL``, an event that doesn't fit in the queue is added to
+        the event stream before returning.
+        """
+        if (
+            self.spilling
+            and self.full
+            and _get_event_key(event, self._unique_keys) not in self._events
+        ):
+            await self._spill(event)
+            return
+
+        if self.policy == EventOverflowPolicy.BLOCK and self.full:
             try:
-                self.q.put_nowait(event)
-                return
-            except asyncio.QueueFull:
-                asyncio.sleep(5)
-        logger.error("event queue full after multiple retries. dropping event.")
+                async with asyncio.timeout(self.block_timeout):
+                    while self.full:
+                        self._space.clear()
+                        await self._space.wait()
+            except TimeoutError:
+                pass
+
+        self.emit(event)
 
     async def get(self) -> Event:
         """Get an event from the target."""
-        return await self.q.get()
+        while not self._events:
+            self._ready.clear()
+            await self._ready.wait()
+
+        return self.get_nowait()
+
+    def get_nowait(self) -> Event:
+        """Get an event from the target without waiting.
+
+        :raises asyncio.QueueEmpty: if there are no events
+        """
+        if not self._events:
+            raise asyncio.QueueEmpty
+
+        _, event = self._events.popitem(last=False)
+        self._space.set()
+
+        return event
+
+    def _drop(self, event: Event):
+        self.dropped += 1
+        logger.error(
+            "event queue full. dropping event.",
+            domain=event.domain,
+            name=event.name,
+        )
+
+    async def _spill(self, event: Event):
+        """Add an event that doesn't fit in the queue directly to the event stream.
+
+        The event is dropped if it can't be serialized or added to the stream.
+        """
+        serialized = _serialize_event(event)
+
+        if serialized is None:
+            self.dropped += 1
+            return
+
+        try:
+            await self.stream.add([dump_string(serialized)])
+        except Exception:
+            logger.exception(
+                "could not spill event to event stream. dropping event.",
+                domain=event.domain,
+                name=event.name,
+            )
+            self.dropped += 1
+            return
+
+        self.spilled += 1
 
     def clear(self):
-        self.q = asyncio.Queue()
+        self._events: OrderedDict[tuple, Event] = OrderedDict()
+        self._ready = asyncio.Event()
+        self._space = asyncio.Event()
+        self._unique_keys = count()
+
+        self.dropped = 0
+        self.merged = 0
+        self.publish_latency = 0.0
+        self.spilled = 0
 
 
 _events_target = _InternalEventsTarget()
@@ -73,6 +247,37 @@ def dangerously_clear_events():
     _events_target.clear()
 
 
+def configure_events(
+    max_size: int = EVENT_QUEUE_SIZE,
+    policy: EventOverflowPolicy = EventOverflowPolicy.BLOCK,
+    block_timeout: float = EVENT_BLOCK_TIMEOUT,
+    stream: "EventStream | None" = None,
+):
+    """Configure the internal event queue.
+
+    This is called at startup using the ``event_queue_size``, ``event_overflow_policy``
+    and ``event_block_timeout`` configuration options.
+
+    :param max_size: the maximum number of events waiting to be published
+    :param policy: what to do when an event is emitted and the queue is full
+    :param block_timeout: how long emitters wait for space with the ``BLOCK`` policy
+    :param stream: the event stream overflowing events are added to with the
+        ``SPILL`` policy
+    """
+    if policy == EventOverflowPolicy.SPILL and stream is None:
+        logger.warning("event overflow policy is spill but there is no event stream")
+
+    _events_target.max_size = max_size
+    _events_target.policy = EventOverflowPolicy(policy)
+    _events_target.block_timeout = block_timeout
+    _events_target.stream = stream
+
+
+def get_event_metrics() -> dict[str, float | int]:
+    """Get gauges for the internal event queue."""
+    return _events_target.metrics
+
+
 async def dangerously_get_event() -> Event:
     """Get an event directly from the target.
 
@@ -83,7 +288,11 @@ async def dangerously_get_event() -> Event:
 
 
 def emit(data: BaseModel, domain: str, name: str, operation: Operation):
-    """Emit an event."""
+    """Emit an event.
+
+    If the event queue is full, the event is added to the event stream in the
+    background when the overflow policy is ``SPILL``. Otherwise, it is dropped.
+    """
     if data is None:
         logger.warning("emit event with no data")
     else:
@@ -98,6 +307,30 @@ def emit(data: BaseModel, domain: str, name: str, operation: Operation):
         )
 
 
+async def emit_and_wait(
+    data: BaseModel,
+    domain: str,
+    name: str,
+    operation: Operation,
+):
+    """Emit an event, waiting for space in the event queue if it is full and the
+    overflow policy is ``BLOCK``, or for the event to be added to the event stream if
+    the policy is ``SPILL``.
+    """
+    if data is None:
+        logger.warning("emit event with no data")
+    else:
+        await _events_target.put(
+            Event(
+                data=data,
+                domain=domain,
+                name=name,
+                operation=operation,
+                timestamp=timestamp(),
+            ),
+        )
+
+
 def emits(operation: Operation, domain: str | None = None, name: str | None = None):
     """Emits the return value of the decorated method as an event.
 
@@ -123,7 +356,12 @@ def emits(operation: Operation, domain: str | None = None, name: str | None = No
 
             return_value = await func(*args, **kwargs)
 
-            emit(return_value, domain or obj.name, emitted_name, operation)
+            await emit_and_wait(
+                return_value,
+                domain or obj.name,
+                emitted_name,
+                operation,
+            )
 
             return return_value
 
@@ -135,12 +373,26 @@ def emits(operation: Operation, domain: str | None = None, name: str | None = No
 class EventPublisher:
     """Publishes events emitted in the application.
 
-    Events are published using Redis pub/sub.
+    Events are published using Redis pub/sub, or added to an :class:`EventStream` if
+    one is provided.
+
+    Events are collected for ``window`` seconds and published in batches of up to
+    ``batch_size`` events in a single message. Only the last update for each resource
+    in a window is published.
 
     """
 
-    def __init__(self, redis: Redis):
+    def __init__(
+        self,
+        redis: Redis,
+        window: float = EVENT_COALESCING_WINDOW,
+        batch_size: int = EVENT_BATCH_SIZE,
+        stream: "EventStream | None" = None,
+    ):
         self._redis = redis
+        self._window = window
+        self._batch_size = batch_size
+        self._stream = stream
 
     async def run(self):
         """Start the event publisher."""
@@ -148,49 +400,153 @@ class EventPublisher:
 
         try:
             while True:
-                event = await _events_target.get()
-
-                try:
-                    data = event.data.dict()
-                except AttributeError:
-                    logger.exception(
-                        "Encountered exception while publishing event",
-                        domain=event.domain,
-                        name=event.name,
-                        operation=event.operation,
-                    )
-                    continue
+                events = await self._collect()
+
+                for i in range(0, len(events), self._batch_size):
+                    await self._publish(events[i : i + self._batch_size])
+        except CancelledError:
+            pass
+
+    async def _collect(self) -> list[Event]:
+        """Wait for an event and collect all events emitted within the coalescing
+        window after it.
+
+        Update events for the same resource are coalesced so only the last one is kept.
+        The last update takes the position of the earlier ones, so it is always
+        published after any other event for the same resource in the window.
+        """
+        unique_keys = count()
+
+        collected: OrderedDict[tuple, Event] = OrderedDict()
 
+        event = await _events_target.get()
+
+        await asyncio.sleep(self._window)
+
+        while True:
+            key = _get_event_key(event, unique_keys)
+
+            collected.pop(key, None)
+            collected[key] = event
+
+            try:
+                event = _events_target.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+
+        return list(collected.values())
+
+    async def _publish(self, events: list[Event]):
+        """Publish a batch of events.
+
+        The batch is published in a single pub/sub message or added to the event
+        stream in a single round trip.
+        """
+        serialized = [
+            item for item in (_serialize_event(event) for event in events) if item
+        ]
+
+        if serialized:
+            if self._stream:
+                await self._stream.add([dump_string(item) for item in serialized])
+            else:
                 await self._redis.publish(
                     "channel:events",
-                    dump_string(
-                        {
-                            "domain": event.domain,
-                            "name": event.name,
-                            "operation": event.operation,
-                            "payload": {
-                                "data": data,
-                                "model": event.data.__class__.__name__,
-                            },
-                            "timestamp": event.timestamp,
-                        },
-                    ),
+                    dump_string({"events": serialized}),
                 )
 
-                logger.info(
-                    "Published event",
-                    domain=event.domain,
-                    name=event.name,
-                    operation=event.operation,
-                )
-        except CancelledError:
-            pass
+            _events_target.publish_latency = (
+                timestamp() - min(event.timestamp for event in events)
+            ).total_seconds()
+
+            logger.info(
+                "Published events",
+                count=len(serialized),
+                **_events_target.metrics,
+            )
+
 
+def _serialize_event(event: Event) -> dict | None:
+    """Get a JSON-serializable representation of an event.
+
+    Returns ``None`` if the event data can't be serialized.
+    """
+    try:
+        data = event.data.dict()
+    except AttributeError:
+        logger.exception(
+            "Encountered exception while publishing event",
+            domain=event.domain,
+            name=event.name,
+            operation=event.operation,
+        )
+        return None
+
+    return {
+        "domain": event.domain,
+        "name": event.name,
+        "operation": event.operation,
+        "payload": {
+            "data": data,
+            "model": event.data.__class__.__name__,
+        },
+        "timestamp": event.timestamp,
+    }
+
+
+def _deserialize_event(serialized: dict, stream_id: str | None = None) -> Event:
+    """Create an event from its serialized representation."""
+    payload = serialized.pop("payload")
+    cls = get_model_by_name(payload["model"])
+
+    return Event(**serialized, data=cls(**payload["data"]), stream_id=stream_id)
+
+
+async def listen_for_events(
+    redis: Redis,
+    stream: "EventStream | None" = None,
+    group: str | None = None,
+    consumer: str | None = None,
+) -> AsyncGenerator[Event, None]:
+    """Yield events as they are received.
+
+    Events are read from the event stream as ``consumer`` in the consumer ``group`` if
+    a stream is provided. Otherwise, they are received using Redis pub/sub. Handles
+    both batched messages and messages containing a single event.
+
+    :param redis: the Redis client
+    :param stream: the event stream to read from
+    :param group: the consumer group to read as
+    :param consumer: the name of the consumer in the group
+    """
+    if stream:
+        async for stream_id, raw in stream.read_group(group, consumer):
+            yield _deserialize_event(orjson.loads(raw), stream_id)
+
+        return
 
-async def listen_for_events(redis: Redis) -> AsyncGenerator[Event, None]:
-    """Yield events as they are received."""
     async for received in redis.subscribe("channel:events"):
-        payload = received.pop("payload")
-        cls = get_model_by_name(payload["model"])
+        for serialized in received.get("events", [received]):
+            yield _deserialize_event(serialized)
+
+
+async def replay_events(
+    stream: "EventStream",
+    after_id: str,
+    count: int,
+) -> tuple[list[Event], bool]:
+    """Get the events added to the event stream after ``after_id``.
+
+    The returned flag is ``False`` if the stream no longer holds every event after
+    ``after_id`` or there are more than ``count`` of them.
+
+    :param stream: the event stream
+    :param after_id: the stream ID of the last event the caller received
+    :param count: the maximum number of events to return
+    :return: the events and whether they are complete
+    """
+    entries, complete = await stream.read_after(after_id, count)
 
-        yield Event(**received, data=cls(**payload["data"]))
+    return [
+        _deserialize_event(orjson.loads(raw), stream_id) for stream_id, raw in entries
+    ], complete
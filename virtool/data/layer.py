@@ -28,6 +28,7 @@ from virtool.spaces.data import SpacesData
 from virtool.subtractions.data import SubtractionsData
 from virtool.tasks.client import TasksClient
 from virtool.tasks.data import TasksData
+from virtool.types import ProcessRunner
 from virtool.uploads.data import UploadsData
 from virtool.users.data import UsersData
 from virtool.users.sessions import SessionData
@@ -83,6 +84,7 @@ def create_data_layer(
     config: Config,
     client,
     redis: Redis,
+    run_in_process: ProcessRunner | None = None,
 ) -> DataLayer:
     """Create and return a data layer object.
 
@@ -92,6 +94,7 @@ def create_data_layer(
     :param config: the application config object
     :param client: an async HTTP client session for the server
     :param redis: the redis object
+    :param run_in_process: a function for running CPU-heavy work in a process pool
     :return: the application data layer
     """
     jobs_client = JobsClient(redis)
@@ -99,13 +102,13 @@ def create_data_layer(
     data_layer = DataLayer(
         AccountData(authorization_client, mongo, pg),
         AdministratorsData(authorization_client, mongo, pg),
-        AnalysisData(mongo, config, pg),
+        AnalysisData(mongo, config, pg, run_in_process),
         BLASTData(client, mongo, pg),
         GroupsData(authorization_client, mongo, pg),
         HistoryData(config.data_path, mongo),
         HmmsData(client, config, mongo, pg),
         IndexData(mongo, config, pg),
-        JobsData(jobs_client, mongo, pg),
+        JobsData(jobs_client, mongo, pg, config.job_timeout_batch_size),
         LabelsData(mongo, pg),
         MessagesData(pg, mongo),
         MLData(config, HTTPClient(client), pg),
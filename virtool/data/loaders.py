@@ -0,0 +1,235 @@
+"""Loaders coalesce lookups of resources by ID into batched queries.
+
+Transforms often need the same kind of resource for many documents. For example,
+:class:`~virtool.users.transforms.AttachUserTransform` and the nested transforms of
+:class:`~virtool.jobs.transforms.AttachJobTransform` both need users. Rather than
+querying for the resources themselves, transforms request them from a loader:
+
+.. code-block:: python
+
+   user = await get_loaders().mongo(mongo.users, ATTACH_PROJECTION).load("bob")
+
+Every key requested from a loader in the same event loop tick is fetched in a single
+``$in`` or ``IN`` query. Loaded values are kept for the lifetime of the loader scope, so
+a key is only fetched once however many documents and transforms request it.
+
+A loader scope is opened by :func:`loader_scope`. :func:`~virtool.data.transforms
+.apply_transforms` opens one if it isn't called inside a scope already, so nested
+transforms share loaders with the transforms that apply them.
+
+"""
+
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    TypeVar,
+)
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from virtool.pg.base import Base
+
+if TYPE_CHECKING:
+    from virtool.mongo.core import Collection
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class DataLoader(Generic[K, V]):
+    """Loads values by key, batching requests made in the same event loop tick.
+
+    ``batch_load`` is called with a list of unique keys and must return a ``dict`` of
+    the values it found. Keys that are not in the returned ``dict`` load as ``None``.
+    """
+
+    def __init__(self, batch_load: Callable[[list[K]], Awaitable[dict[K, V]]]):
+        self._batch_load = batch_load
+        self._futures: dict[K, asyncio.Future] = {}
+        self._queue: list[K] = []
+        self._tasks: set[asyncio.Task] = set()
+
+        #: The number of batch queries made by the loader.
+        self.batch_count = 0
+
+    def load(self, key: K) -> "asyncio.Future[V | None]":
+        """Request the value for ``key``.
+
+        :param key: the key to load
+        :return: a future that resolves to the value or ``None`` if it doesn't exist
+        """
+        if key in self._futures:
+            return self._futures[key]
+
+        loop = asyncio.get_running_loop()
+
+        future = loop.create_future()
+        self._futures[key] = future
+
+        if not self._queue:
+            # Wait for an extra loop iteration so tasks that were started alongside the
+            # first request, such as those created by ``asyncio.gather``, can add their
+            # keys to the batch.
+            loop.call_soon(loop.call_soon, self._dispatch)
+
+        self._queue.append(key)
+
+        return future
+
+    async def load_many(self, keys: Iterable[K]) -> list[V | None]:
+        """Load the values for many keys.
+
+        :param keys: the keys to load
+        :return: the values in the same order as ``keys``
+        """
+        return list(await asyncio.gather(*[self.load(key) for key in keys]))
+
+    def _dispatch(self):
+        keys, self._queue = self._queue, []
+
+        task = asyncio.create_task(self._resolve(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _resolve(self, keys: list[K]):
+        self.batch_count += 1
+
+        try:
+            values = await self._batch_load(keys)
+        except Exception as err:
+            for key in keys:
+                # Failed keys are retried the next time they are requested.
+                future = self._futures.pop(key)
+
+                if not future.done():
+                    future.set_exception(err)
+
+            return
+
+        for key in keys:
+            future = self._futures[key]
+
+            if not future.done():
+                future.set_result(values.get(key))
+
+
+class LoaderRegistry:
+    """The loaders used in a loader scope.
+
+    Loaders are created on first use and shared by everything that requests a loader
+    for the same source.
+    """
+
+    def __init__(self):
+        self._loaders: dict[Hashable, DataLoader] = {}
+
+    def get(
+        self,
+        key: Hashable,
+        batch_load: Callable[[list], Awaitable[dict]],
+    ) -> DataLoader:
+        """Get the loader identified by ``key``, creating it with ``batch_load`` if it
+        doesn't exist.
+
+        :param key: identifies the loader
+        :param batch_load: the batch load function for a new loader
+        :return: the loader
+        """
+        try:
+            return self._loaders[key]
+        except KeyError:
+            loader = self._loaders[key] = DataLoader(batch_load)
+            return loader
+
+    def mongo(
+        self,
+        collection: "Collection",
+        projection: list[str] | tuple[str, ...],
+    ) -> DataLoader[Any, dict]:
+        """Get a loader for MongoDB documents by ``_id``.
+
+        Documents are returned unprocessed with the fields in ``projection``.
+
+        :param collection: the collection to load documents from
+        :param projection: the fields to include in loaded documents
+        :return: the loader
+        """
+        projection = tuple(sorted(projection))
+
+        async def batch_load(ids: list) -> dict:
+            return {
+                document["_id"]: document
+                async for document in collection.find(
+                    {"_id": {"$in": ids}},
+                    list(projection),
+                )
+            }
+
+        return self.get(("mongo", collection.name, projection), batch_load)
+
+    def pg(self, pg: AsyncEngine, model: type[Base]) -> DataLoader[int, Base]:
+        """Get a loader for SQL rows by ``id``.
+
+        :param pg: the application Postgres client
+        :param model: the model to load rows of
+        :return: the loader
+        """
+
+        async def batch_load(ids: list[int]) -> dict[int, Base]:
+            async with AsyncSession(pg) as session:
+                result = await session.execute(select(model).where(model.id.in_(ids)))
+
+                return {row.id: row for row in result.scalars()}
+
+        return self.get(("pg", model), batch_load)
+
+    @property
+    def batch_count(self) -> int:
+        """The number of batch queries made by all loaders in the registry."""
+        return sum(loader.batch_count for loader in self._loaders.values())
+
+
+_registry: ContextVar[LoaderRegistry | None] = ContextVar("loaders", default=None)
+
+
+@contextmanager
+def loader_scope() -> Iterator[LoaderRegistry]:
+    """Open a loader scope if one isn't open already.
+
+    Loaded values are cached until the outermost scope exits, so don't open a scope
+    around code that changes the resources being loaded.
+
+    :return: the registry for the scope
+    """
+    registry = _registry.get()
+
+    if registry is not None:
+        yield registry
+        return
+
+    registry = LoaderRegistry()
+    token = _registry.set(registry)
+
+    try:
+        yield registry
+    finally:
+        _registry.reset(token)
+
+
+def get_loaders() -> LoaderRegistry:
+    """Get the loader registry for the current scope.
+
+    A new registry that isn't shared with anything else is returned if no scope is
+    open.
+    """
+    return _registry.get() or LoaderRegistry()
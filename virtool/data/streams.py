@@ -0,0 +1,244 @@
+"""An event transport built on Redis Streams.
+
+Unlike pub/sub, events added to the stream are retained up to a capped length, so
+websocket clients can catch up on events published after the last one they saw.
+
+Every process that reads the stream uses its own consumer groups, named using
+:func:`create_consumer_name`, so each process receives every event. Groups start at the
+end of the stream when they are created and are destroyed when the stream is closed.
+
+Groups left behind by processes that stopped without closing the stream, along with
+their pending events, are destroyed by :meth:`EventStream.prune_groups` when another
+process starts.
+
+"""
+
+import os
+import secrets
+import socket
+from typing import AsyncGenerator
+
+from redis.asyncio import Redis as RedisClient
+from redis.exceptions import ResponseError
+from structlog import get_logger
+
+from virtool.config.cls import EVENT_STREAM_MAX_LENGTH
+
+logger = get_logger("events")
+
+EVENT_STREAM_KEY = "stream:events"
+"""The Redis key of the event stream."""
+
+EVENT_STREAM_GROUP_MAX_IDLE = 3600000
+"""The number of milliseconds after which a consumer group with no active consumers is
+considered abandoned.
+"""
+
+
+class EventStream:
+    """Adds serialized events to a Redis stream and reads them back.
+
+    The Redis client shared by the rest of the application does not expose stream
+    commands, so the stream uses its own connection.
+    """
+
+    def __init__(
+        self,
+        redis_connection_string: str,
+        max_length: int = EVENT_STREAM_MAX_LENGTH,
+    ):
+        self._client = RedisClient.from_url(
+            redis_connection_string,
+            decode_responses=True,
+        )
+        self._max_length = max_length
+
+        #: The consumer groups created by this stream.
+        self._groups: set[str] = set()
+
+    async def close(self):
+        """Destroy the consumer groups created by the stream and close the stream
+        connection.
+        """
+        for group in self._groups:
+            try:
+                await self._client.xgroup_destroy(EVENT_STREAM_KEY, group)
+            except ResponseError:
+                logger.warning(
+                    "could not destroy event stream consumer group",
+                    group=group,
+                )
+
+        self._groups.clear()
+
+        await self._client.aclose()
+
+    async def prune_groups(self, max_idle: int = EVENT_STREAM_GROUP_MAX_IDLE):
+        """Destroy consumer groups whose consumers have all been idle for longer than
+        ``max_idle`` milliseconds.
+
+        Active consumers read the stream at least every few seconds, so these groups
+        belong to processes that stopped without closing the stream. Destroying them
+        also discards their pending events.
+
+        :param max_idle: the idle time in milliseconds after which a group is pruned
+        """
+        try:
+            groups = await self._client.xinfo_groups(EVENT_STREAM_KEY)
+        except ResponseError:
+            # The stream doesn't exist yet.
+            return
+
+        for group in groups:
+            name = group["name"]
+
+            try:
+                consumers = await self._client.xinfo_consumers(EVENT_STREAM_KEY, name)
+            except ResponseError:
+                # The group was destroyed by another process.
+                continue
+
+            if not consumers or any(c["idle"] < max_idle for c in consumers):
+                continue
+
+            await self._client.xgroup_destroy(EVENT_STREAM_KEY, name)
+
+            logger.info(
+                "pruned abandoned event stream consumer group",
+                group=name,
+                pending=group["pending"],
+            )
+
+    async def add(self, events: list[str]) -> list[str]:
+        """Add serialized events to the stream in a single pipelined round trip.
+
+        The stream is trimmed to approximately ``max_length`` events.
+
+        :param events: the serialized events
+        :return: the stream IDs of the events
+        """
+        async with self._client.pipeline(transaction=False) as pipe:
+            for event in events:
+                pipe.xadd(
+                    EVENT_STREAM_KEY,
+                    {"event": event},
+                    maxlen=self._max_length,
+                    approximate=True,
+                )
+
+            return await pipe.execute()
+
+    async def read_group(
+        self,
+        group: str,
+        consumer: str,
+        count: int = 100,
+        block: int = 5000,
+    ) -> AsyncGenerator[tuple[str, str], None]:
+        """Yield stream IDs and serialized events as a consumer in a consumer group.
+
+        The group is created at the end of the stream if it doesn't exist. Events that
+        were delivered to the consumer but not acknowledged before it stopped are
+        yielded first. Events are acknowledged after each read batch has been yielded.
+
+        :param group: the consumer group name
+        :param consumer: the consumer name
+        :param count: the maximum number of events to read at once
+        :param block: the number of milliseconds to wait for new events
+        """
+        await self._create_group(group)
+
+        # Start with this consumer's pending events, then switch to new events once
+        # they have all been acknowledged.
+        read_id = "0"
+
+        while True:
+            response = await self._client.xreadgroup(
+                group,
+                consumer,
+                {EVENT_STREAM_KEY: read_id},
+                count=count,
+                block=None if read_id == "0" else block,
+            )
+
+            entries = response[0][1] if response else []
+
+            if not entries:
+                read_id = ">"
+                continue
+
+            for entry_id, fields in entries:
+                yield entry_id, fields["event"]
+
+            await self._client.xack(
+                EVENT_STREAM_KEY,
+                group,
+                *[entry_id for entry_id, _ in entries],
+            )
+
+    async def read_after(
+        self,
+        after_id: str,
+        count: int,
+    ) -> tuple[list[tuple[str, str]], bool]:
+        """Get the events added after a stream ID.
+
+        The returned flag is ``False`` if some events after ``after_id`` are no longer
+        retained or there are more than ``count`` of them. The reader cannot catch up
+        from the stream in that case.
+
+        :param after_id: the ID of the last event the reader has seen
+        :param count: the maximum number of events to return
+        :return: the stream IDs and serialized events, and whether they are complete
+        """
+        first = await self._client.xrange(EVENT_STREAM_KEY, count=1)
+
+        if first and compare_stream_ids(first[0][0], after_id) > 0:
+            return [], False
+
+        entries = await self._client.xrange(
+            EVENT_STREAM_KEY,
+            min=f"({after_id}",
+            count=count + 1,
+        )
+
+        return (
+            [(entry_id, fields["event"]) for entry_id, fields in entries[:count]],
+            len(entries) <= count,
+        )
+
+    async def _create_group(self, group: str):
+        try:
+            await self._client.xgroup_create(
+                EVENT_STREAM_KEY,
+                group,
+                id="$",
+                mkstream=True,
+            )
+            logger.info("created event stream consumer group", group=group)
+        except ResponseError as err:
+            if "BUSYGROUP" not in str(err):
+                raise
+
+        self._groups.add(group)
+
+
+def create_consumer_name() -> str:
+    """Create a consumer name that is unique to the current process.
+
+    Processes on the same host and restarted processes get different names, so no
+    two processes share a consumer group.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+
+
+def compare_stream_ids(a: str, b: str) -> int:
+    """Compare two stream IDs.
+
+    :return: a negative number if ``a`` is older, zero if equal, and a positive number
+        if ``a`` is newer
+    """
+    a_ms, a_seq = (int(part) for part in a.split("-"))
+    b_ms, b_seq = (int(part) for part in b.split("-"))
+
+    return (a_ms - b_ms) or (a_seq - b_seq)
@@ -37,7 +37,7 @@ is resolved.
 Transforms are classes that inherit from :class:`AbstractTransform`. Minimally, you must
 override the :meth:`prepare_one` and :meth:`attach_one` methods. If :meth:`prepare_many`
 is not overridden, :meth:`prepare_one` will be called concurrently for each document in
-the list.
+the list, with at most :attr:`AbstractTransform.concurrency` calls running at once.
 
 Overriding :meth:`prepare_many` and :meth:`attach_many` allows you to optimize the
 preparation and attachment of data to many documents. For example, if you wanted to
@@ -45,17 +45,78 @@ attach user data to a large list of documents, and you expect many of the docume
 have the same user ID, you could override :meth:`prepare_many` to only query the user
 collection once for each unique user ID.
 
+Transforms that load data through :func:`virtool.data.loaders.get_loaders` should
+override :meth:`prepare_many` and use ``load_many``. The concurrency limit in the
+default :meth:`prepare_many` would otherwise split each loader batch into groups of
+:attr:`AbstractTransform.concurrency` keys.
+
+The time spent preparing and attaching is recorded in a Sentry span and in counters for
+each transform class. Use :func:`get_transform_metrics` to find transforms that prepare
+many documents one at a time and would benefit from their own :meth:`prepare_many`.
+
 """
 
 import asyncio
+import time
 from abc import ABC, abstractmethod
 from asyncio import gather
-from typing import Any
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Iterator
 
 import sentry_sdk
 
+from virtool.data.loaders import loader_scope
 from virtool.types import Document
 
+TRANSFORM_CONCURRENCY = 10
+"""The default maximum number of documents prepared or attached at once by the default
+:meth:`AbstractTransform.prepare_many` and :meth:`AbstractTransform.attach_many`.
+"""
+
+
+@dataclass
+class TransformMetrics:
+    """Counters for a transform class."""
+
+    #: The number of times documents were prepared.
+    prepare_count: int = 0
+
+    #: The number of documents prepared.
+    document_count: int = 0
+
+    #: The number of documents prepared one at a time by the default
+    #: :meth:`AbstractTransform.prepare_many`.
+    unbatched_document_count: int = 0
+
+    #: The total time spent preparing documents in seconds.
+    prepare_seconds: float = 0.0
+
+    #: The total time spent attaching prepared data in seconds.
+    attach_seconds: float = 0.0
+
+
+_metrics: dict[str, TransformMetrics] = {}
+
+
+def get_transform_metrics() -> dict[str, dict[str, float | int]]:
+    """Get the counters for every transform class that has been applied.
+
+    :return: the counters keyed by transform class name
+    """
+    return {name: asdict(metrics) for name, metrics in sorted(_metrics.items())}
+
+
+async def _gather_limited(aws: list[Awaitable], limit: int) -> list:
+    """Await ``aws`` concurrently with at most ``limit`` running at once."""
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(aw: Awaitable):
+        async with semaphore:
+            return await aw
+
+    return await gather(*[run(aw) for aw in aws])
+
 
 class AbstractTransform(ABC):
     """A base class for writing transforms.
@@ -68,6 +129,11 @@ class AbstractTransform(ABC):
 
     """
 
+    #: The maximum number of documents the default :meth:`prepare_many` and
+    #: :meth:`attach_many` work on at once. Override this for transforms that are
+    #: expensive to run concurrently.
+    concurrency: int = TRANSFORM_CONCURRENCY
+
     def preprocess(self, document: Document) -> Document:
         """Perform any necessary operations on documents before the transform is
         applied.
@@ -91,20 +157,75 @@ class AbstractTransform(ABC):
         documents: list[Document],
         prepared: Document,
     ) -> list[Document]:
-        return [
-            await self.attach_one(document, prepared[document["id"]])
-            for document in documents
-        ]
+        return await _gather_limited(
+            [
+                self.attach_one(document, prepared[document["id"]])
+                for document in documents
+            ],
+            self.concurrency,
+        )
 
     @abstractmethod
     async def prepare_one(self, document: Document) -> Any: ...
 
     async def prepare_many(self, documents: list[Document]) -> Any:
+        _get_metrics(self).unbatched_document_count += len(documents)
+
+        prepared = await _gather_limited(
+            [self.prepare_one(document) for document in documents],
+            self.concurrency,
+        )
+
         return {
-            document["id"]: await self.prepare_one(document) for document in documents
+            document["id"]: result for document, result in zip(documents, prepared)
         }
 
 
+def _get_metrics(transform: AbstractTransform) -> TransformMetrics:
+    name = transform.__class__.__name__
+
+    try:
+        return _metrics[name]
+    except KeyError:
+        metrics = _metrics[name] = TransformMetrics()
+        return metrics
+
+
+@contextmanager
+def _measure(transform: AbstractTransform, stage: str) -> Iterator[TransformMetrics]:
+    """Record a Sentry span and the time spent on a stage of a transform."""
+    metrics = _get_metrics(transform)
+
+    start = time.perf_counter()
+
+    with sentry_sdk.start_span(
+        op=f"transform.{stage}",
+        description=transform.__class__.__name__,
+    ):
+        try:
+            yield metrics
+        finally:
+            elapsed = time.perf_counter() - start
+
+            if stage == "prepare":
+                metrics.prepare_seconds += elapsed
+            else:
+                metrics.attach_seconds += elapsed
+
+
+async def _prepare(transform: AbstractTransform, documents: Document | list[Document]):
+    """Prepare one or many documents for a transform and record metrics."""
+    with _measure(transform, "prepare") as metrics:
+        metrics.prepare_count += 1
+
+        if isinstance(documents, list):
+            metrics.document_count += len(documents)
+            return await transform.prepare_many(documents)
+
+        metrics.document_count += 1
+        return await transform.prepare_one(documents)
+
+
 async def apply_transforms(
     documents: Document | list[Document],
     pipeline: list[AbstractTransform],
@@ -118,6 +239,10 @@ async def apply_transforms(
     methods, they will be used. Otherwise, :meth:`prepare_one` and :meth:`attach_one`
     will be called concurrently for each document.
 
+    Transforms are prepared in a loader scope (see :mod:`virtool.data.loaders`), so
+    resources requested by several transforms or nested transforms are only queried
+    once.
+
     :param documents: a single document or list of documents
     :param pipeline: a list of transforms to apply
     :return: one transformed document or a list of transformed documents
@@ -125,20 +250,21 @@ async def apply_transforms(
     with sentry_sdk.start_span(
         op="apply_transforms",
         description=", ".join([p.__class__.__name__ for p in pipeline]),
-    ):
+    ), loader_scope():
         if isinstance(documents, list):
             all_prepared = await gather(
                 *[
-                    transform.prepare_many([transform.preprocess(d) for d in documents])
+                    _prepare(transform, [transform.preprocess(d) for d in documents])
                     for transform in pipeline
                 ],
             )
 
             for prepared, transform in zip(all_prepared, pipeline):
-                documents = await transform.attach_many(
-                    [transform.preprocess(d) for d in documents],
-                    prepared,
-                )
+                with _measure(transform, "attach"):
+                    documents = await transform.attach_many(
+                        [transform.preprocess(d) for d in documents],
+                        prepared,
+                    )
 
             return documents
 
@@ -147,12 +273,16 @@ async def apply_transforms(
         # In this case, we are dealing with a single document.
         prepared = await asyncio.gather(
             *[
-                transform.prepare_one(transform.preprocess(document))
+                _prepare(transform, transform.preprocess(document))
                 for transform in pipeline
             ],
         )
 
         for p, transform in zip(prepared, pipeline):
-            document = await transform.attach_one(transform.preprocess(document), p)
+            with _measure(transform, "attach"):
+                document = await transform.attach_one(
+                    transform.preprocess(document),
+                    p,
+                )
 
         return document
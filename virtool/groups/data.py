@@ -187,6 +187,8 @@ class GroupsData:
                     self._mongo, mongo_session, pg_session, group.id
                 )
 
+        self.data.users.client_cache.invalidate_group(group_id)
+
         return await self.get(group_id)
 
     async def delete(self, group_id: int):
@@ -217,4 +219,6 @@ class GroupsData:
                 self._mongo, mongo_session, pg_session, group_id
             )
 
+        self.data.users.client_cache.invalidate_group(group_id)
+
         emit(group, "groups", "delete", Operation.DELETE)
@@ -0,0 +1,228 @@
+"""A process-wide cache of OTUs patched to historical versions.
+
+Reconstructing an OTU at an old version is expensive. Analysis formatting, index JSON
+generation and reference cloning all ask for the same versions repeatedly, so the
+reconstructed OTUs are cached here.
+
+A reverted version number can be reused for different content, so versions are keyed
+by ``(otu_id, version, created_at)``, where ``created_at`` is the creation time of the
+history change for the version. A reused version has a new change and therefore a new
+key. This holds in every process sharing the database, so no cross-process invalidation
+is needed.
+
+Cached OTUs are stored pickled. This makes it possible to account for their size in
+bytes and means every caller gets its own copy that can be modified freely.
+
+"""
+
+import asyncio
+import pickle
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+
+from structlog import get_logger
+
+from virtool.types import Document
+
+logger = get_logger("history")
+
+PATCHED_OTU_CACHE_SIZE = 256 * 1024 * 1024
+"""The default memory budget for the patched OTU cache in bytes."""
+
+PatchedOTUKey = tuple[str, int | str, datetime]
+"""A key identifying an OTU version as ``(otu_id, version, created_at)``."""
+
+
+class PatchedOTUCache:
+    """A bounded LRU cache of patched OTUs keyed by ``(otu_id, version, created_at)``.
+
+    Concurrent requests for the same key share a single reconstruction.
+
+    """
+
+    def __init__(self, max_bytes: int = PATCHED_OTU_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        """The maximum combined size of cached OTUs in bytes."""
+
+        self.hits = 0
+        """The number of lookups served from the cache."""
+
+        self.misses = 0
+        """The number of lookups that required a reconstruction."""
+
+        self.evictions = 0
+        """The number of OTUs evicted to stay within ``max_bytes``."""
+
+        self.size = 0
+        """The combined size of cached OTUs in bytes."""
+
+        self.generation = 0
+        """
+        Incremented on every invalidation so OTUs reconstructed from history that was
+        read before one are not cached.
+        """
+
+        self._entries: OrderedDict[PatchedOTUKey, bytes] = OrderedDict()
+        self._pending: dict[PatchedOTUKey, asyncio.Future] = {}
+
+    def __contains__(self, key: PatchedOTUKey) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> dict[str, int]:
+        """The cache counters and current size."""
+        return {
+            "count": len(self._entries),
+            "evictions": self.evictions,
+            "hits": self.hits,
+            "max_bytes": self.max_bytes,
+            "misses": self.misses,
+            "size": self.size,
+        }
+
+    async def get(
+        self,
+        key: PatchedOTUKey,
+        load: Callable[[], Awaitable[Document | None]],
+    ) -> Document | None:
+        """Get the patched OTU for ``key``, calling ``load`` to reconstruct it if it is
+        not cached.
+
+        If a reconstruction for ``key`` is already in progress, wait for it instead of
+        starting another one.
+
+        :param key: the ``(otu_id, version, created_at)`` key
+        :param load: a coroutine function that reconstructs the OTU
+        :return: a copy of the patched OTU
+
+        """
+        if (pickled := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return pickle.loads(pickled)
+
+        if (pending := self._pending.get(key)) is not None:
+            self.hits += 1
+
+            try:
+                return pickle.loads(await asyncio.shield(pending))
+            except asyncio.CancelledError:
+                # The caller performing the reconstruction was cancelled. Try again
+                # unless this caller was the one cancelled.
+                if not pending.cancelled():
+                    raise
+
+                return await self.get(key, load)
+
+        self.misses += 1
+
+        generation = self.generation
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+
+        try:
+            pickled = pickle.dumps(await load(), protocol=pickle.HIGHEST_PROTOCOL)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as err:
+            future.set_exception(err)
+
+            # Mark the exception as retrieved in case there are no waiters.
+            future.exception()
+
+            raise
+        else:
+            future.set_result(pickled)
+            self._put(key, pickled, generation)
+        finally:
+            self._pending.pop(key, None)
+
+        return pickle.loads(pickled)
+
+    def get_many(
+        self,
+        keys: list[PatchedOTUKey],
+    ) -> dict[PatchedOTUKey, Document | None]:
+        """Get copies of the cached OTUs for ``keys`` without loading missing ones.
+
+        Keys that are not cached are left out of the returned ``dict``.
+
+        :param keys: the ``(otu_id, version, created_at)`` keys to look up
+        :return: the cached OTUs keyed by their keys
+
+        """
+        found = {}
+
+        for key in keys:
+            if (pickled := self._entries.get(key)) is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                found[key] = pickle.loads(pickled)
+
+        return found
+
+    def put(self, key: PatchedOTUKey, otu: Document | None, generation: int):
+        """Cache a patched OTU that was reconstructed outside of :meth:`get`.
+
+        The OTU is not cached if the cache has been invalidated since ``generation``.
+
+        :param key: the ``(otu_id, version, created_at)`` key
+        :param otu: the patched OTU
+        :param generation: the cache generation when reconstruction started
+        """
+        self._put(key, pickle.dumps(otu, protocol=pickle.HIGHEST_PROTOCOL), generation)
+
+    def invalidate(self, otu_id: str):
+        """Remove all cached versions of the OTU identified by ``otu_id``.
+
+        Call this when history for the OTU is deleted. Stale versions would not be
+        requested again because their keys include the change creation time, but this
+        frees their memory and stops reconstructions in progress from being cached.
+
+        :param otu_id: the id of the OTU to invalidate
+        """
+        self.generation += 1
+
+        for key in [key for key in self._entries if key[0] == otu_id]:
+            self.size -= len(self._entries.pop(key))
+
+    def clear(self):
+        """Remove all cached OTUs and reset the counters."""
+        self._entries.clear()
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+    def _put(self, key: PatchedOTUKey, pickled: bytes, generation: int):
+        if generation != self.generation:
+            return
+
+        size = len(pickled)
+
+        if size > self.max_bytes:
+            logger.info("patched otu too large to cache", key=key, size=size)
+            return
+
+        if key in self._entries:
+            self.size -= len(self._entries.pop(key))
+
+        self._entries[key] = pickled
+        self.size += size
+
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+
+patched_otu_cache = PatchedOTUCache()
+"""The process-wide patched OTU cache."""
@@ -7,9 +7,20 @@ import virtool.otus.utils
 from virtool.data.errors import ResourceConflictError, ResourceNotFoundError
 from virtool.data.transforms import apply_transforms
 from virtool.errors import DatabaseError
-from virtool.history.db import HISTORY_PROJECTION, DiffTransform, patch_to_version
+from virtool.history.cache import patched_otu_cache
+from virtool.history.db import (
+    HISTORY_PROJECTION,
+    DiffTransform,
+    patch_to_version,
+    write_snapshots,
+)
+from virtool.history.utils import SNAPSHOT_INTERVAL, remove_snapshot_files
 from virtool.mongo.core import Mongo
 from virtool.references.transforms import AttachReferenceTransform
+from virtool.tasks.progress import (
+    AbstractProgressHandler,
+    AccumulatingProgressHandlerWrapper,
+)
 from virtool.users.transforms import AttachUserTransform
 from virtool.utils import base_processor
 
@@ -101,5 +112,35 @@ class HistoryData:
                 )
 
             await self._mongo.history.delete_many({"_id": {"$in": history_to_delete}})
+
+            await remove_snapshot_files(self.data_path, history_to_delete)
+
+            patched_otu_cache.invalidate(otu_id)
         except DatabaseError:
             raise ResourceConflictError()
+
+    async def build_snapshots(self, progress_handler: AbstractProgressHandler):
+        """Write missing snapshots for all OTUs with enough history to have them.
+
+        Snapshots let ``patch_to_version`` start from a nearby full OTU instead of
+        replaying every change. This backfills snapshots for history that was written
+        before snapshots existed. OTUs in removed references are skipped.
+
+        :param progress_handler: a progress handler to report progress to
+        """
+        otu_ids = await self._mongo.history.distinct(
+            "otu.id",
+            {
+                "otu.version": {"$gte": SNAPSHOT_INTERVAL},
+                "reference.id": {"$in": await self._mongo.references.distinct("_id")},
+            },
+        )
+
+        if not otu_ids:
+            return await progress_handler.set_progress(100)
+
+        tracker = AccumulatingProgressHandlerWrapper(progress_handler, len(otu_ids))
+
+        for otu_id in otu_ids:
+            await write_snapshots(self.data_path, self._mongo, otu_id)
+            await tracker.add(1)
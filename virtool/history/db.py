@@ -1,7 +1,10 @@
 """Work with OTU history in the database."""
 
 import asyncio
+from collections import defaultdict
+from collections.abc import Iterable
 from copy import deepcopy
+from datetime import datetime
 from pathlib import Path
 from typing import Any, Optional
 
@@ -17,16 +20,22 @@ import virtool.utils
 from virtool.api.utils import paginate
 from virtool.config import get_config_from_app
 from virtool.data.transforms import AbstractTransform, apply_transforms
+from virtool.history.cache import patched_otu_cache
 from virtool.history.utils import (
     calculate_diff,
     compose_history_description,
     derive_otu_information,
+    is_snapshot_version,
+    join_snapshot_path,
+    read_snapshot_file,
+    restore_snapshot,
     write_diff_file,
+    write_snapshot_file,
 )
 from virtool.mongo.core import Mongo
 from virtool.mongo.utils import get_mongo_from_app
 from virtool.references.transforms import AttachReferenceTransform
-from virtool.types import Document
+from virtool.types import Document, ProcessRunner
 from virtool.users.db import ATTACH_PROJECTION
 from virtool.users.transforms import AttachUserTransform
 from virtool.utils import base_processor
@@ -121,6 +130,12 @@ async def add(
 
         await mongo.history.insert_one(dict(document, diff="file"), session=session)
 
+    if new is not None and is_snapshot_version(otu_version):
+        history_path = data_path / "history"
+        await asyncio.to_thread(history_path.mkdir, parents=True, exist_ok=True)
+
+        await write_snapshot_file(data_path, otu_id, otu_version, new)
+
     return document
 
 
@@ -175,6 +190,9 @@ async def prepare_add(
         await write_diff_file(data_path, otu_id, otu_version, document["diff"])
         document["diff"] = "file"
 
+    if new is not None and is_snapshot_version(otu_version):
+        await write_snapshot_file(data_path, otu_id, otu_version, new)
+
     return document
 
 
@@ -278,6 +296,63 @@ async def get_most_recent_change(
     )
 
 
+async def revert_change(
+    data_path: Path,
+    patched: Document | None,
+    change: Document,
+) -> Document | None:
+    """Revert a single change on a joined OTU.
+
+    The passed ``patched`` OTU must be at the version produced by ``change``. The
+    returned OTU is at the version immediately before the change.
+
+    :param data_path: the data path
+    :param patched: the joined OTU at the version of the change
+    :param change: the change document to revert
+    :return: the joined OTU before the change was made
+
+    """
+    return revert_loaded_change(patched, await load_change_diff(data_path, change))
+
+
+async def load_change_diff(data_path: Path, change: Document) -> Document:
+    """Replace the diff of ``change`` with the contents of its diff file if the diff was
+    too large to store in the database.
+
+    :param data_path: the data path
+    :param change: the change document
+    :return: the change document with its diff loaded
+
+    """
+    if change["diff"] == "file":
+        change["diff"] = await virtool.history.utils.read_diff_file(
+            data_path,
+            change["otu"]["id"],
+            change["otu"]["version"],
+        )
+
+    return change
+
+
+def revert_loaded_change(patched: Document | None, change: Document) -> Document | None:
+    """Revert a single change whose diff has already been loaded on a joined OTU.
+
+    This doesn't perform any I/O, so it can be called in another process.
+
+    :param patched: the joined OTU at the version of the change
+    :param change: the change document to revert
+    :return: the joined OTU before the change was made
+
+    """
+    if change["method_name"] == "remove":
+        return change["diff"]
+
+    if change["method_name"] == "create":
+        return None
+
+    return dictdiffer.patch(dictdiffer.swap(change["diff"]), patched)
+
+
 async def patch_to_version(
     data_path: Path,
     mongo: "Mongo",
@@ -286,7 +361,9 @@ async def patch_to_version(
 ) -> tuple:
     """Take a joined otu back in time to the passed ``version``.
 
-    Uses the diffs in the change documents associated with the otu.
+    Uses the diffs in the change documents associated with the otu. If a snapshot
+    exists for a version at or above the target ``version``, patching starts from the
+    nearest snapshot rather than the current otu, so only a few diffs are applied.
 
     :param data_path: the data path
     :param mongo: the database object
@@ -302,36 +379,355 @@ async def patch_to_version(
     if "version" in current and current["version"] == version:
         return current, deepcopy(current), reverted_history_ids
 
-    patched = deepcopy(current)
+    # Sort the changes by descending version. Diffs are only loaded for the changes
+    # that actually need to be reverted.
+    reverted_versions = {}
 
-    # Sort the changes by descending timestamp.
     async for change in mongo.history.find(
         {"otu.id": otu_id},
+        ["_id", "otu"],
         sort=[("otu.version", -1)],
     ):
         if change["otu"]["version"] == "removed" or change["otu"]["version"] > version:
             reverted_history_ids.append(change["_id"])
+            reverted_versions[change["_id"]] = change["otu"]["version"]
+        else:
+            break
 
-            if change["diff"] == "file":
-                change["diff"] = await virtool.history.utils.read_diff_file(
-                    data_path,
-                    otu_id,
-                    change["otu"]["version"],
-                )
-
-            if change["method_name"] == "remove":
-                patched = change["diff"]
-
-            elif change["method_name"] == "create":
-                patched = None
+    patched = deepcopy(current)
+    replay_ids = reverted_history_ids
+
+    # Snapshots are deleted when an otu is removed, so they are only read for otus
+    # that still exist.
+    snapshot_versions = (
+        sorted(
+            v
+            for v in [version, *reverted_versions.values()]
+            if is_snapshot_version(v)
+        )
+        if current
+        else []
+    )
 
-            else:
-                diff = dictdiffer.swap(change["diff"])
-                patched = dictdiffer.patch(diff, patched)
-        else:
+    for snapshot_version in snapshot_versions:
+        snapshot = await read_snapshot_file(data_path, otu_id, snapshot_version)
+
+        if snapshot is not None:
+            patched = restore_snapshot(snapshot, current)
+            replay_ids = [
+                change_id
+                for change_id in reverted_history_ids
+                if reverted_versions[change_id] != "removed"
+                and reverted_versions[change_id] <= snapshot_version
+            ]
             break
 
+    if replay_ids:
+        async for change in mongo.history.find(
+            {"_id": {"$in": replay_ids}},
+            ["_id", "diff", "method_name", "otu"],
+            sort=[("otu.version", -1)],
+        ):
+            patched = await revert_change(data_path, patched, change)
+
     if current == {}:
         current = None
 
     return current, patched, reverted_history_ids
+
+
+async def get_change_timestamps(
+    mongo: "Mongo",
+    otu_versions: Iterable[tuple[str, int | str]],
+) -> dict[tuple[str, int | str], datetime]:
+    """Get the creation times of the history changes for OTU versions in one query.
+
+    Together with the OTU id and version, the creation time identifies the content of a
+    version even if the version number is reused after a revert. Versions without a
+    change are left out of the returned ``dict``.
+
+    :param mongo: the database object
+    :param otu_versions: the ``(otu_id, version)`` pairs to look up
+    :return: the creation times keyed by ``(otu_id, version)``
+
+    """
+    change_ids = [f"{otu_id}.{version}" for otu_id, version in otu_versions]
+
+    if not change_ids:
+        return {}
+
+    return {
+        (change["otu"]["id"], change["otu"]["version"]): change["created_at"]
+        async for change in mongo.history.find(
+            {"_id": {"$in": change_ids}},
+            ["created_at", "otu"],
+        )
+    }
+
+
+async def get_patched_otu(
+    data_path: Path,
+    mongo: "Mongo",
+    otu_id: str,
+    version: str | int,
+) -> Document | None:
+    """Get a joined otu patched to the passed ``version``.
+
+    Patched otus are served from the process-wide
+    :data:`~virtool.history.cache.patched_otu_cache` when possible.
+
+    :param data_path: the data path
+    :param mongo: the database object
+    :param otu_id: the id of the otu to patch
+    :param version: the version to patch to
+    :return: the patched otu
+
+    """
+
+    async def load() -> Document | None:
+        _, patched, _ = await patch_to_version(data_path, mongo, otu_id, version)
+        return patched
+
+    created_at = (await get_change_timestamps(mongo, [(otu_id, version)])).get(
+        (otu_id, version),
+    )
+
+    if created_at is None:
+        return await load()
+
+    return await patched_otu_cache.get((otu_id, version, created_at), load)
+
+
+async def bulk_patch_to_version(
+    data_path: Path,
+    mongo: "Mongo",
+    otu_versions: Iterable[tuple[str, int | str]],
+    run_in_process: ProcessRunner | None = None,
+) -> dict[tuple[str, int | str], Document | None]:
+    """Take many joined otus back in time to the passed versions at once.
+
+    This is equivalent to calling :func:`get_patched_otu` for every
+    ``(otu_id, version)`` pair, but uses a fixed number of database queries: the
+    otus are joined in bulk and the history of every otu that needs patching is
+    streamed in a single query sorted by otu id and descending version.
+
+    If ``run_in_process`` is provided, the changes are applied in another process.
+
+    :param data_path: the data path
+    :param mongo: the database object
+    :param otu_versions: the ``(otu_id, version)`` pairs to patch, such as
+        ``manifest.items()``
+    :param run_in_process: a function for running the patching in a process pool
+    :return: the patched otus keyed by ``(otu_id, version)``
+
+    """
+    keys = list(dict.fromkeys(otu_versions))
+
+    generation = patched_otu_cache.generation
+
+    created_at = await get_change_timestamps(mongo, keys)
+
+    patched = {
+        (otu_id, version): otu
+        for (otu_id, version, _), otu in patched_otu_cache.get_many(
+            [(*key, created_at[key]) for key in keys if key in created_at],
+        ).items()
+    }
+
+    targets = defaultdict(set)
+
+    for otu_id, version in keys:
+        if (otu_id, version) not in patched:
+            targets[otu_id].add(version)
+
+    if not targets:
+        return patched
+
+    current_otus = {
+        otu["_id"]: otu
+        for otu in await virtool.otus.db.bulk_join_ids(mongo, list(targets))
+    }
+
+    states = {}
+
+    for otu_id, versions in targets.items():
+        current = current_otus.get(otu_id)
+
+        if current is not None and current["version"] in versions:
+            patched[(otu_id, current["version"])] = deepcopy(current)
+            versions.discard(current["version"])
+
+        if versions:
+            states[otu_id] = await _create_bulk_patch_state(
+                data_path,
+                otu_id,
+                current,
+                sorted(versions, reverse=True),
+            )
+
+    if states:
+        async for change in mongo.history.find(
+            {"otu.id": {"$in": list(states)}},
+            ["_id", "diff", "method_name", "otu"],
+            sort=[("otu.id", 1), ("otu.version", -1)],
+        ):
+            state = states[change["otu"]["id"]]
+            change_version = change["otu"]["version"]
+
+            # Changes above a snapshot are already reflected in it.
+            if state["start"] is not None and (
+                change_version == "removed" or change_version > state["start"]
+            ):
+                continue
+
+            # Changes at or below the oldest target version don't need to be reverted.
+            if change_version != "removed" and change_version <= state["targets"][-1]:
+                continue
+
+            state["changes"].append(await load_change_diff(data_path, change))
+
+        if run_in_process is None:
+            patched.update(apply_bulk_patch_states(states))
+        else:
+            patched.update(await run_in_process(apply_bulk_patch_states, states))
+
+    for otu_id, versions in targets.items():
+        for version in versions:
+            if (otu_id, version) in created_at:
+                patched_otu_cache.put(
+                    (otu_id, version, created_at[(otu_id, version)]),
+                    patched[(otu_id, version)],
+                    generation,
+                )
+
+    return {key: patched[key] for key in keys}
+
+
+def apply_bulk_patch_states(
+    states: dict[str, dict],
+) -> dict[tuple[str, int | str], Document | None]:
+    """Revert the changes collected by :func:`bulk_patch_to_version` for each otu.
+
+    The changes for each otu must be in descending version order. This doesn't perform
+    any I/O, so it can be called in another process.
+
+    :param states: the patch states keyed by otu id
+    :return: the patched otus keyed by ``(otu_id, version)``
+
+    """
+    patched = {}
+
+    for otu_id, state in states.items():
+        otu = state["otu"]
+        targets = list(state["targets"])
+
+        for change in state["changes"]:
+            change_version = change["otu"]["version"]
+
+            if change_version != "removed":
+                while targets and targets[0] >= change_version:
+                    patched[(otu_id, targets.pop(0))] = otu
+
+            otu = revert_loaded_change(otu, change)
+
+        for version in targets:
+            patched[(otu_id, version)] = otu
+
+    return patched
+
+
+async def _create_bulk_patch_state(
+    data_path: Path,
+    otu_id: str,
+    current: Document | None,
+    targets: list[int | str],
+) -> dict:
+    """Create the starting state for patching an otu in
+    :func:`bulk_patch_to_version`.
+
+    Patching starts from the nearest snapshot at or above the highest target version
+    if one exists. Otherwise, it starts from the current otu.
+
+    """
+    state = {
+        "changes": [],
+        "otu": deepcopy(current),
+        "start": None,
+        "targets": targets,
+    }
+
+    if current is None:
+        return state
+
+    interval = virtool.history.utils.SNAPSHOT_INTERVAL
+
+    snapshot_version = -(-targets[0] // interval) * interval
+
+    while snapshot_version < current["version"]:
+        if snapshot := await read_snapshot_file(data_path, otu_id, snapshot_version):
+            return {
+                **state,
+                "otu": restore_snapshot(snapshot, current),
+                "start": snapshot_version,
+            }
+
+        snapshot_version += interval
+
+    return state
+
+
+async def write_snapshots(data_path: Path, mongo: "Mongo", otu_id: str) -> int:
+    """Write any missing snapshots for the otu identified by ``otu_id``.
+
+    Nothing is written for removed otus.
+
+    Walks the history of the otu once, from the most recent change to the oldest,
+    and writes a snapshot for each snapshot version that does not have one yet.
+
+    :param data_path: the data path
+    :param mongo: the database object
+    :param otu_id: the id of the otu to write snapshots for
+    :return: the number of snapshots written
+
+    """
+    missing = [
+        v
+        for v in await mongo.history.distinct("otu.version", {"otu.id": otu_id})
+        if is_snapshot_version(v)
+        and not await asyncio.to_thread(
+            join_snapshot_path(data_path, otu_id, v).exists,
+        )
+    ]
+
+    if not missing:
+        return 0
+
+    history_path = data_path / "history"
+    await asyncio.to_thread(history_path.mkdir, parents=True, exist_ok=True)
+
+    patched = await virtool.otus.db.join(mongo, otu_id)
+
+    if patched is None:
+        return 0
+
+    lowest = min(missing)
+    written = 0
+
+    async for change in mongo.history.find(
+        {"otu.id": otu_id},
+        ["_id", "diff", "method_name", "otu"],
+        sort=[("otu.version", -1)],
+    ):
+        change_version = change["otu"]["version"]
+
+        if change_version != "removed":
+            if change_version < lowest:
+                break
+
+            if change_version in missing:
+                await write_snapshot_file(data_path, otu_id, change_version, patched)
+                written += 1
+
+        patched = await revert_change(data_path, patched, change)
+
+    return written
@@ -0,0 +1,32 @@
+from tempfile import TemporaryDirectory
+from typing import TYPE_CHECKING, Dict
+
+from virtool.tasks.task import BaseTask
+
+if TYPE_CHECKING:
+    from virtool.data.layer import DataLayer
+
+
+class BuildHistorySnapshotsTask(BaseTask):
+    """Write missing OTU history snapshots.
+
+    Backfills full OTU snapshots for history that was recorded before snapshots were
+    written alongside changes.
+
+    """
+
+    name = "build_history_snapshots"
+
+    def __init__(
+        self,
+        task_id: int,
+        data: "DataLayer",
+        context: Dict,
+        temp_dir: TemporaryDirectory,
+    ):
+        super().__init__(task_id, data, context, temp_dir)
+
+        self.steps = [self.build_snapshots]
+
+    async def build_snapshots(self):
+        await self.data.history.build_snapshots(self.create_progress_handler())
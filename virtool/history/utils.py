@@ -12,6 +12,24 @@ from virtool_core.models.enums import HistoryMethod
 
 from virtool.config import get_config_from_app
 
+SNAPSHOT_INTERVAL = 25
+"""
+The number of OTU versions between full snapshots of a joined OTU.
+
+A snapshot is written for every OTU version that is a positive multiple of this
+value. Reconstructing an old version starts from the nearest snapshot at or above the
+target version instead of replaying every change from the current OTU.
+"""
+
+SNAPSHOT_EXCLUDED_FIELDS = ("last_indexed_version",)
+"""
+OTU fields that are changed without recording history.
+
+They are left out of snapshots. When patching starts from a snapshot, they are taken
+from the current OTU, just as they are when every change is reverted from the current
+OTU.
+"""
+
 
 def calculate_diff(old: dict, new: dict) -> list:
     """
@@ -183,6 +201,39 @@ def join_diff_path(data_path: Path, otu_id: str, otu_version: Union[int, str]) -
     return data_path / "history" / f"{otu_id}_{otu_version}.json"
 
 
+def join_snapshot_path(
+    data_path: Path, otu_id: str, otu_version: Union[int, str]
+) -> Path:
+    """
+    Derive the path to a snapshot file based on the application
+    `data_path` configuration and the OTU ID and version.
+
+    Snapshots are stored next to diff files in the history directory.
+
+    :param data_path: the application data path
+    :param otu_id: the OTU ID to join a snapshot path for
+    :param otu_version: the OTU version to join a snapshot path for
+    :return: the snapshot path
+
+    """
+    return data_path / "history" / f"{otu_id}_{otu_version}.snapshot.json"
+
+
+def is_snapshot_version(otu_version: Union[int, str]) -> bool:
+    """
+    Check whether a full snapshot should be kept for the passed OTU version.
+
+    :param otu_version: an OTU version
+    :return: whether the version is a snapshot version
+
+    """
+    return (
+        isinstance(otu_version, int)
+        and otu_version > 0
+        and otu_version % SNAPSHOT_INTERVAL == 0
+    )
+
+
 def json_encoder(o):
     """
     A custom JSON encoder function that stores `datetime` objects
@@ -254,3 +305,144 @@ async def write_diff_file(
     async with aiofiles.open(path, "w") as f:
         json_string = json.dumps(body, default=json_encoder)
         await f.write(json_string)
+
+
+async def read_snapshot_file(
+    data_path: Path, otu_id: str, otu_version: Union[int, str]
+) -> Optional[dict]:
+    """
+    Read a history snapshot JSON file.
+
+    Returns ``None`` if no snapshot exists for the OTU version.
+
+    :param data_path: the application data path
+    :param otu_id: the OTU ID
+    :param otu_version: the OTU version
+    :return: the joined OTU at the version or ``None``
+
+    """
+    path = join_snapshot_path(data_path, otu_id, otu_version)
+
+    try:
+        async with aiofiles.open(path, "r") as f:
+            return json.loads(await f.read(), object_hook=json_object_hook)
+    except FileNotFoundError:
+        return None
+
+
+async def remove_snapshot_files(data_path: Path, id_list: List[str]):
+    """
+    Remove the snapshot files for multiple change IDs (`id_list`).
+
+    Change IDs without snapshots are ignored.
+
+    :param data_path: the application data path
+    :param id_list: a list of change IDs to remove snapshot files for
+
+    """
+    for change_id in id_list:
+        otu_id, otu_version = change_id.split(".")
+
+        path = join_snapshot_path(data_path, otu_id, otu_version)
+
+        try:
+            await to_thread(os.remove, path)
+        except FileNotFoundError:
+            pass
+
+
+async def remove_otu_snapshot_files(data_path: Path, otu_ids: List[str]):
+    """
+    Remove all snapshot files for multiple OTU IDs (`otu_ids`).
+
+    Call this when OTUs are removed. Diff files are kept, so the history of a removed
+    OTU can still be reconstructed.
+
+    :param data_path: the application data path
+    :param otu_ids: a list of OTU IDs to remove snapshot files for
+
+    """
+    history_path = data_path / "history"
+
+    for otu_id in otu_ids:
+        for path in await to_thread(
+            list, history_path.glob(f"{otu_id}_*.snapshot.json")
+        ):
+            try:
+                await to_thread(os.remove, path)
+            except FileNotFoundError:
+                pass
+
+
+async def remove_change_files(data_path: Path, id_list: List[str]):
+    """
+    Remove the diff and snapshot files for multiple change IDs (`id_list`).
+
+    Use this to clean up after changes that were never committed. Change IDs without
+    files are ignored.
+
+    :param data_path: the application data path
+    :param id_list: a list of change IDs to remove files for
+
+    """
+    for change_id in id_list:
+        otu_id, otu_version = change_id.split(".")
+
+        for path in (
+            join_diff_path(data_path, otu_id, otu_version),
+            join_snapshot_path(data_path, otu_id, otu_version),
+        ):
+            try:
+                await to_thread(os.remove, path)
+            except FileNotFoundError:
+                pass
+
+
+async def write_snapshot_file(
+    data_path: Path, otu_id: str, otu_version: Union[int, str], otu: dict
+):
+    """
+    Write a full snapshot of a joined OTU at the passed version.
+
+    Fields in :data:`SNAPSHOT_EXCLUDED_FIELDS` are not written. The snapshot is written
+    to a temporary file and moved into place so readers never see a partial snapshot.
+
+    :param data_path: the application data path
+    :param otu_id: the OTU ID
+    :param otu_version: the OTU version
+    :param otu: the joined OTU document at the version
+
+    """
+    path = join_snapshot_path(data_path, otu_id, otu_version)
+    temp_path = path.with_suffix(".tmp")
+
+    otu = {
+        key: value for key, value in otu.items() if key not in SNAPSHOT_EXCLUDED_FIELDS
+    }
+
+    async with aiofiles.open(temp_path, "w") as f:
+        await f.write(json.dumps(otu, default=json_encoder))
+
+    await to_thread(os.replace, temp_path, path)
+
+
+def restore_snapshot(snapshot: dict, current: dict) -> dict:
+    """
+    Restore a joined OTU from a snapshot.
+
+    Fields that are changed without recording history are taken from the `current`
+    joined OTU instead of the snapshot.
+
+    :param snapshot: the snapshot of the OTU
+    :param current: the current joined OTU
+    :return: the joined OTU at the snapshot version
+
+    """
+    return {
+        **{
+            key: value
+            for key, value in snapshot.items()
+            if key not in SNAPSHOT_EXCLUDED_FIELDS
+        },
+        **{key: current[key] for key in SNAPSHOT_EXCLUDED_FIELDS if key in current},
+    }
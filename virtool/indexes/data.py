@@ -1,5 +1,4 @@
 import asyncio
-from asyncio import to_thread
 from pathlib import Path
 from typing import List, Union
 
@@ -13,7 +12,6 @@ from virtool_core.models.reference import ReferenceNested
 
 import virtool.history.db
 import virtool.indexes.db
-from virtool.api.custom_json import dump_bytes
 from virtool.api.utils import compose_regex_query, paginate
 from virtool.config import Config
 from virtool.data.errors import (
@@ -39,7 +37,7 @@ from virtool.references.db import lookup_nested_reference_by_id
 from virtool.references.transforms import AttachReferenceTransform
 from virtool.uploads.utils import multipart_file_chunker, naive_writer
 from virtool.users.transforms import AttachUserTransform
-from virtool.utils import base_processor, compress_json_with_gzip, wait_for_checks
+from virtool.utils import base_processor, wait_for_checks
 
 logger = get_logger("indexes")
 
@@ -52,6 +50,9 @@ class IndexData:
         self._mongo = mongo
         self._pg = pg
 
+        self._json_builds: dict[Path, asyncio.Task] = {}
+        """In-progress ``otus.json.gz`` builds keyed by their target path."""
+
     async def find(
         self,
         ready: bool,
@@ -179,15 +180,25 @@ class IndexData:
         )
 
         if not json_path.exists():
-            patched_otus = await virtool.indexes.db.get_patched_otus(
-                self._mongo,
-                self._config,
-                index["manifest"],
-            )
-
-            json_string = dump_bytes(patched_otus)
-
-            await to_thread(compress_json_with_gzip, json_string, json_path)
+            if (build := self._json_builds.get(json_path)) is None:
+                build = asyncio.create_task(
+                    virtool.indexes.db.write_patched_otus_json(
+                        self._mongo,
+                        self._config,
+                        index["manifest"],
+                        json_path,
+                    ),
+                )
+
+                self._json_builds[json_path] = build
+
+                build.add_done_callback(
+                    lambda _: self._json_builds.pop(json_path, None),
+                )
+
+            # Shield the build so a cancelled request doesn't abort it for other
+            # requests waiting on the same file.
+            await asyncio.shield(build)
 
         return json_path
 
@@ -1,8 +1,12 @@
 """Work with indexes in the database."""
 
 import asyncio
-import asyncio.tasks
+import gzip
+import os
+from asyncio import to_thread
+from pathlib import Path
 from typing import Any, List, Mapping, Optional
+from uuid import uuid4
 
 import pymongo
 from motor.motor_asyncio import AsyncIOMotorClientSession
@@ -12,6 +16,7 @@ import virtool.history.db
 import virtool.pg.utils
 import virtool.references.db
 import virtool.utils
+from virtool.api.custom_json import dump_bytes
 from virtool.api.utils import paginate
 from virtool.config.cls import Config
 from virtool.data.transforms import AbstractTransform, apply_transforms
@@ -21,7 +26,7 @@ from virtool.mongo.core import Mongo
 from virtool.references.transforms import AttachReferenceTransform
 from virtool.types import Document
 from virtool.users.transforms import AttachUserTransform
-from virtool.utils import base_processor
+from virtool.utils import base_processor, chunk_list
 
 INDEX_FILE_NAMES = (
     "reference.fa.gz",
@@ -34,6 +39,9 @@ INDEX_FILE_NAMES = (
     "reference.rev.2.bt2",
 )
 
+INDEX_JSON_BATCH_SIZE = 250
+"""The number of OTUs patched and written at a time when generating ``otus.json.gz``."""
+
 
 class IndexFilesTransform(AbstractTransform):
     def __init__(self, base_url: str, pg: AsyncEngine):
@@ -289,33 +297,56 @@ async def get_unbuilt_stats(mongo: "Mongo", ref_id: Optional[str] = None) -> dic
     }
 
 
-async def get_patched_otus(
+async def write_patched_otus_json(
     mongo: "Mongo",
     config: Config,
     manifest: dict[str, int],
-) -> list[dict]:
-    """Get joined OTUs patched to a specific version based on a manifest of OTU ids and
-    versions.
+    target: Path,
+    batch_size: int = INDEX_JSON_BATCH_SIZE,
+):
+    """Write the OTUs in ``manifest`` patched to their indexed versions as a gzipped
+    JSON array at ``target``.
+
+    OTUs are patched ``batch_size`` at a time and each batch is written straight into
+    the gzip stream, so memory use is bounded by the batch size rather than the size
+    of the reference. The file is written to a temporary path and moved into place when
+    complete, so a partial file is never served.
 
     :param mongo: the application mongodb client
     :param config: the application configuration
     :param manifest: the manifest
+    :param target: the path to write the gzipped JSON to
+    :param batch_size: the number of OTUs to patch and write at a time
 
     """
-    return [
-        j[1]
-        for j in await asyncio.tasks.gather(
-            *[
-                virtool.history.db.patch_to_version(
-                    config.data_path,
-                    mongo,
-                    patch_id,
-                    patch_version,
-                )
-                for patch_id, patch_version in manifest.items()
-            ],
-        )
-    ]
+    temp_path = target.with_name(f"{target.name}.{uuid4().hex}.tmp")
+
+    await to_thread(target.parent.mkdir, parents=True, exist_ok=True)
+
+    f = await to_thread(gzip.open, temp_path, "wb")
+
+    try:
+        await to_thread(f.write, b"[")
+
+        for index, batch in enumerate(chunk_list(list(manifest.items()), batch_size)):
+            patched_otus = await virtool.history.db.bulk_patch_to_version(
+                config.data_path,
+                mongo,
+                batch,
+            )
+
+            chunk = b",".join(dump_bytes(patched_otus[key]) for key in batch)
+
+            await to_thread(f.write, b"," + chunk if index else chunk)
+
+        await to_thread(f.write, b"]")
+        await to_thread(f.close)
+    except BaseException:
+        await to_thread(f.close)
+        await to_thread(temp_path.unlink, missing_ok=True)
+        raise
+
+    await to_thread(os.replace, temp_path, target)
 
 
 async def update_last_indexed_versions(
@@ -21,6 +21,8 @@ from virtool.api.schema import schema
 from virtool.jobs.oas import (
     JobResponse,
     ArchiveJobsRequest,
+    PushJobUpdatesRequest,
+    PushJobUpdatesResponse,
 )
 
 routes = Routes()
@@ -96,6 +98,32 @@ class JobsView(PydanticView):
         return json_response(data=errors, status=400)
 
 
+@routes.jobs_api.view("/jobs/updates")
+class JobUpdatesView(PydanticView):
+    async def post(
+        self, data: PushJobUpdatesRequest
+    ) -> r200[PushJobUpdatesResponse] | r400:
+        """
+        Push job updates.
+
+        Applies pings and status updates for many jobs in one request. Each update
+        is authenticated with the key of its job, so a single runner can report on
+        all of the jobs it is running.
+
+        The outcome of each update is returned in the same order as the request.
+        Status updates for finished jobs are not applied.
+
+        Status Codes:
+            200: Successful operation
+            400: Invalid input
+        """
+        return json_response(
+            await get_data_from_req(self.request).jobs.push_updates(
+                data.pings, data.statuses
+            )
+        )
+
+
 @routes.view("/jobs/{job_id}")
 class JobView(PydanticView):
     async def get(self, job_id: str, /) -> r200[JobResponse] | r404:
@@ -11,6 +11,8 @@ from virtool.utils import hash_key
 
 PUBLIC_ROUTES = [("PATCH", "/jobs")]
 
+PUBLIC_PATHS = [("POST", "/jobs/updates")]
+
 
 @web.middleware
 async def middleware(request: Request, handler: RouteHandler):
@@ -25,7 +27,10 @@ async def middleware(request: Request, handler: RouteHandler):
     *401 NOT AUTHORIZED*
         When the `Authorization` header is invalid, or missing.
     """
-    if (request.method, os.path.split(request.path)[0]) in PUBLIC_ROUTES:
+    if (request.method, request.path) in PUBLIC_PATHS or (
+        request.method,
+        os.path.split(request.path)[0],
+    ) in PUBLIC_ROUTES:
         return await handler(request)
 
     try:
@@ -0,0 +1,95 @@
+"""A buffer that coalesces items added by concurrent callers so they can be written
+together.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Generic, List, Tuple, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class CoalescingBuffer(Generic[T, R]):
+    """Collects items added by concurrent callers and passes them to ``flush`` in a
+    single call.
+
+    Items are flushed ``delay`` seconds after the first item is added to an empty buffer
+    or as soon as ``max_size`` items are waiting. Flushes run one at a time in the order
+    they were started, so items are always flushed in the order they were added.
+
+    ``flush`` must return one result for each item it is passed. Each caller receives
+    the results for its own items.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[List[T]], Awaitable[List[R]]],
+        delay: float = 0.05,
+        max_size: int = 500,
+    ):
+        self._flush = flush
+        self._delay = delay
+        self._max_size = max_size
+        self._lock = asyncio.Lock()
+        self._pending: List[Tuple[T, asyncio.Future]] = []
+        self._tasks: set[asyncio.Task] = set()
+        self._timer: asyncio.TimerHandle | None = None
+
+    async def add_many(self, items: List[T]) -> List[R]:
+        """Add items to the buffer and wait for them to be flushed.
+
+        :param items: the items to add
+        :return: the flush results for the items in the same order
+        """
+        if not items:
+            return []
+
+        loop = asyncio.get_running_loop()
+
+        futures = []
+
+        for item in items:
+            future = loop.create_future()
+            self._pending.append((item, future))
+            futures.append(future)
+
+        if len(self._pending) >= self._max_size:
+            self._start_flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._delay, self._start_flush)
+
+        return list(await asyncio.gather(*futures))
+
+    async def close(self):
+        """Flush any waiting items and wait for all flushes to finish."""
+        self._start_flush()
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _start_flush(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+        pending, self._pending = self._pending, []
+
+        if pending:
+            task = asyncio.create_task(self._run(pending))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, pending: List[Tuple[T, asyncio.Future]]):
+        async with self._lock:
+            try:
+                results = await self._flush([item for item, _ in pending])
+            except Exception as err:
+                for _, future in pending:
+                    if not future.done():
+                        future.set_exception(err)
+
+                return
+
+        for (_, future), result in zip(pending, results):
+            if not future.done():
+                future.set_result(result)
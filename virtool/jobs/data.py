@@ -1,12 +1,16 @@
 import asyncio
 import math
+import time
 from asyncio import gather
 from collections import defaultdict
 from typing import Dict, List, Optional
 
 import arrow
-from pymongo.results import UpdateResult
+from motor.motor_asyncio import AsyncIOMotorClientSession
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError
 from sqlalchemy.ext.asyncio import AsyncEngine
+from structlog import get_logger
 from virtool_core.models.job import (
     Job,
     JobAcquired,
@@ -18,46 +22,222 @@ from virtool_core.models.job import (
 from virtool_core.models.user import UserNested
 
 import virtool.utils
+from virtool.config.cls import JOB_TIMEOUT_BATCH_SIZE
 from virtool.data.errors import ResourceConflictError, ResourceNotFoundError
 from virtool.data.events import Operation, emit, emits
 from virtool.data.transforms import apply_transforms
+from virtool.jobs.buffer import CoalescingBuffer
 from virtool.jobs.client import AbstractJobsClient, JobCancellationResult
-from virtool.jobs.utils import check_job_is_running_or_waiting, compose_status
+from virtool.jobs.utils import (
+    JobPingUpdate,
+    JobStatusUpdate,
+    JobUpdateOutcome,
+    JobUpdateResult,
+    JobUpdateResults,
+    check_job_is_running_or_waiting,
+    compose_status,
+    compose_status_summary,
+)
 from virtool.mongo.core import Mongo
-from virtool.mongo.utils import get_one_field
+from virtool.mongo.utils import id_exists
 from virtool.types import Document
+from virtool.users.db import ATTACH_PROJECTION
 from virtool.users.transforms import AttachUserTransform
-from virtool.utils import base_processor
+from virtool.utils import base_processor, hash_key
+
+logger = get_logger("jobs")
+
+JOB_COUNTS_ID = "job_counts"
+"""The ID of the document in the ``status`` collection that stores job counts."""
+
+JOB_COUNTS_RECONCILE_ATTEMPTS = 5
+"""The number of times job counts are recalculated when jobs change state while they
+are being recalculated.
+"""
+
+JOB_USER_CACHE_TTL = 60
+"""The number of seconds nested user data is cached for when pushing job statuses."""
+
+FINISHED_STATES = [
+    JobState.COMPLETE.value,
+    JobState.CANCELLED.value,
+    JobState.ERROR.value,
+    JobState.TERMINATED.value,
+    JobState.TIMEOUT.value,
+]
+"""Job states that no further status updates can be pushed after."""
+
+
+def compose_job_fields(document: Document) -> Document:
+    """Add the ``id`` field and the fields derived from the status list to a job
+    document.
+
+    :param document: the job document
+    :return: the job document with the derived fields
+    """
+    status = document["status"]
+    last_update = status[-1]
+
+    return {
+        **document,
+        "id": document["_id"],
+        "state": last_update["state"],
+        "stage": last_update["stage"],
+        "created_at": status[0]["timestamp"],
+        "progress": last_update["progress"],
+    }
 
 
 class JobsData:
     name = "jobs"
 
-    def __init__(self, client: AbstractJobsClient, mongo: Mongo, pg: AsyncEngine):
+    def __init__(
+        self,
+        client: AbstractJobsClient,
+        mongo: Mongo,
+        pg: AsyncEngine,
+        timeout_batch_size: int = JOB_TIMEOUT_BATCH_SIZE,
+    ):
         self._client = client
         self._mongo = mongo
         self._pg = pg
+        self._timeout_batch_size = timeout_batch_size
+        self._user_cache: Dict[str, tuple[float, Document]] = {}
+        self._update_buffer: CoalescingBuffer[
+            JobPingUpdate | JobStatusUpdate,
+            JobUpdateOutcome,
+        ] = CoalescingBuffer(self._apply_updates)
 
     async def _get_counts(self) -> Dict[str, Dict[str, int]]:
-        counts = defaultdict(dict)
+        """Get the number of non-archived jobs for each state and workflow.
 
-        async for a in self._mongo.jobs.aggregate(
-            [
-                {"$match": {"archived": False}},
-                {"$addFields": {"last_status": {"$last": "$status"}}},
-                {
-                    "$group": {
-                        "_id": {"workflow": "$workflow", "state": "$last_status.state"},
-                        "count": {"$sum": 1},
+        The counts are kept up to date by the methods that change job states, so this is
+        a single document read. The counts are recalculated if they haven't been stored
+        yet.
+        """
+        document = await self._mongo.status.find_one(JOB_COUNTS_ID, ["counts"])
+
+        if document is None:
+            return await self.reconcile_counts()
+
+        return {
+            state: workflow_counts
+            for state, counts in document["counts"].items()
+            if (
+                workflow_counts := {
+                    workflow: count for workflow, count in counts.items() if count > 0
+                }
+            )
+        }
+
+    async def _update_counts(
+        self,
+        workflow: str,
+        old_state: str | None,
+        new_state: str | None,
+        session: AsyncIOMotorClientSession | None = None,
+    ):
+        """Move a non-archived job from the ``old_state`` count to the ``new_state``
+        count for its workflow.
+
+        Pass ``None`` for ``old_state`` when a job is added to the counts and for
+        ``new_state`` when it is removed.
+
+        Nothing is written if the counts haven't been stored yet. They will be
+        calculated from scratch the next time they are read.
+        """
+        if old_state == new_state:
+            return
+
+        increments = {}
+
+        if old_state:
+            increments[f"counts.{old_state}.{workflow}"] = -1
+
+        if new_state:
+            increments[f"counts.{new_state}.{workflow}"] = 1
+
+        await self._increment_counts(increments, session)
+
+    async def _increment_counts(
+        self,
+        increments: Dict[str, int],
+        session: AsyncIOMotorClientSession | None = None,
+    ):
+        """Apply ``increments`` to the stored job counts.
+
+        The ``revision`` of the counts is incremented in the same write so
+        :meth:`reconcile_counts` can tell if the counts changed while it was
+        recalculating them.
+
+        :param increments: the increments keyed by ``counts.{state}.{workflow}``
+        :param session: an optional Motor session to use
+        """
+        await self._mongo.status.update_one(
+            {"_id": JOB_COUNTS_ID},
+            {"$inc": {**increments, "revision": 1}},
+            session=session,
+        )
+
+    async def reconcile_counts(self) -> Dict[str, Dict[str, int]]:
+        """Recalculate the stored job counts from the jobs collection.
+
+        This fixes any drift between the stored counts and the jobs. It is run
+        periodically by :class:`~virtool.jobs.tasks.ReconcileJobCountsTask`.
+
+        The recalculated counts are written with a single update that only matches if
+        the counts ``revision`` hasn't changed since the recalculation started. If a job
+        changed state in the meantime, the counts are recalculated again so its
+        increment isn't overwritten.
+
+        :return: the recalculated counts
+        """
+        for _ in range(JOB_COUNTS_RECONCILE_ATTEMPTS):
+            document = await self._mongo.status.find_one(JOB_COUNTS_ID, ["revision"])
+
+            counts = defaultdict(dict)
+
+            async for a in self._mongo.jobs.aggregate(
+                [
+                    {"$match": {"archived": False}},
+                    {
+                        "$group": {
+                            "_id": {"workflow": "$workflow", "state": "$state"},
+                            "count": {"$sum": 1},
+                        },
                     },
-                },
-            ],
-        ):
-            workflow = a["_id"]["workflow"]
-            state = a["_id"]["state"]
-            counts[state][workflow] = a["count"]
+                ],
+            ):
+                workflow = a["_id"]["workflow"]
+                state = a["_id"]["state"]
+                counts[state][workflow] = a["count"]
 
-        return dict(counts)
+            counts = dict(counts)
+
+            if document is None:
+                try:
+                    await self._mongo.status.insert_one(
+                        {"_id": JOB_COUNTS_ID, "counts": counts, "revision": 0},
+                    )
+                except DuplicateKeyError:
+                    continue
+
+                return counts
+
+            update_result = await self._mongo.status.update_one(
+                {"_id": JOB_COUNTS_ID, "revision": document.get("revision")},
+                {"$set": {"counts": counts}},
+            )
+
+            if update_result.matched_count:
+                return counts
+
+        logger.warning(
+            "Could not reconcile job counts",
+            attempts=JOB_COUNTS_RECONCILE_ATTEMPTS,
+        )
+
+        return counts
 
     async def find(
         self,
@@ -72,81 +252,34 @@ class JobsData:
         if page > 1:
             skip_count = (page - 1) * per_page
 
-        match_query = {
+        query = {
             **({"archived": archived} if archived is not None else {}),
             **({"user.id": {"$in": users}} if users else {}),
+            **({"state": {"$in": [state.value for state in states]}} if states else {}),
         }
 
-        match_state = (
-            {"state": {"$in": [state.value for state in states]}} if states else {}
+        total_count, found_count, data = await gather(
+            self._mongo.jobs.count_documents({}),
+            self._mongo.jobs.count_documents(query),
+            self._mongo.jobs.find(
+                query,
+                [
+                    "_id",
+                    "archived",
+                    "created_at",
+                    "progress",
+                    "stage",
+                    "state",
+                    "user",
+                    "workflow",
+                ],
+                sort=[("created_at", -1)],
+                skip=skip_count,
+                limit=per_page,
+            ).to_list(None),
         )
 
-        data = {}
-        found_count = 0
-        total_count = 0
-        page_count = 0
-
-        async for paginate_dict in self._mongo.jobs.aggregate(
-            [
-                {
-                    "$facet": {
-                        "total_count": [{"$count": "total_count"}],
-                        "found_count": [
-                            {"$match": match_query},
-                            {"$set": {"last_status": {"$last": "$status"}}},
-                            {"$set": {"state": "$last_status.state"}},
-                            {"$match": match_state},
-                            {"$count": "found_count"},
-                        ],
-                        "data": [
-                            {"$match": match_query},
-                            {
-                                "$set": {
-                                    "last_status": {"$last": "$status"},
-                                    "first_status": {"$first": "$status"},
-                                },
-                            },
-                            {
-                                "$set": {
-                                    "created_at": "$first_status.timestamp",
-                                    "progress": "$last_status.progress",
-                                    "state": "$last_status.state",
-                                    "stage": "$last_status.stage",
-                                },
-                            },
-                            {"$match": match_state},
-                            {"$sort": {"created_at": -1}},
-                            {"$skip": skip_count},
-                            {"$limit": per_page},
-                        ],
-                    },
-                },
-                {
-                    "$project": {
-                        "data": {
-                            "_id": True,
-                            "created_at": True,
-                            "archived": True,
-                            "progress": True,
-                            "stage": True,
-                            "state": True,
-                            "user": True,
-                            "workflow": True,
-                        },
-                        "total_count": {
-                            "$arrayElemAt": ["$total_count.total_count", 0],
-                        },
-                        "found_count": {
-                            "$arrayElemAt": ["$found_count.found_count", 0],
-                        },
-                    },
-                },
-            ],
-        ):
-            data = paginate_dict["data"]
-            found_count = paginate_dict.get("found_count", 0)
-            total_count = paginate_dict.get("total_count", 0)
-            page_count = int(math.ceil(found_count / per_page))
+        page_count = int(math.ceil(found_count / per_page))
 
         documents = await apply_transforms(
             [base_processor(d) for d in data],
@@ -187,16 +320,19 @@ class JobsData:
         :param job_id: an optional ID to use for the new job
 
         """
+        status = compose_status(JobState.WAITING, None)
+
         document = {
+            **compose_status_summary(status),
             "acquired": False,
             "archived": False,
             "args": job_args,
+            "created_at": status["timestamp"],
             "key": None,
             "ping": None,
             "rights": {},
             "space": {"id": space_id},
-            "state": JobState.WAITING.value,
-            "status": [compose_status(JobState.WAITING, None)],
+            "status": [status],
             "user": {"id": user_id},
             "workflow": workflow,
         }
@@ -205,6 +341,8 @@ class JobsData:
             document["_id"] = job_id
 
         document = await self._mongo.jobs.insert_one(document)
+
+        await self._update_counts(workflow, None, document["state"])
         await self._client.enqueue(workflow, document["_id"])
 
         return await self.get(document["_id"])
@@ -220,24 +358,59 @@ class JobsData:
         if document is None:
             raise ResourceNotFoundError()
 
-        status = document["status"]
-
-        last_update = status[-1]
-
         document = await apply_transforms(
-            {
-                **document,
-                "id": document["_id"],
-                "state": last_update["state"],
-                "stage": last_update["stage"],
-                "created_at": status[0]["timestamp"],
-                "progress": status[-1]["progress"],
-            },
+            compose_job_fields(document),
             [AttachUserTransform(self._mongo)],
         )
 
         return Job(**document)
 
+    async def _get_nested_user(self, user_id: str) -> Document:
+        """Get the nested user data for a job, using a short-lived cache.
+
+        Status updates are pushed frequently by running jobs, so the user data attached
+        to the emitted job is cached to avoid a user lookup on every update.
+
+        :param user_id: the ID of the user
+        :return: the nested user data
+        """
+        now = time.monotonic()
+
+        cached = self._user_cache.get(user_id)
+
+        if cached and cached[0] > now:
+            return cached[1]
+
+        user = base_processor(
+            await self._mongo.users.find_one(user_id, ATTACH_PROJECTION),
+        )
+
+        if user is None:
+            raise KeyError(f"Document contains non-existent user: {user_id}.")
+
+        self._user_cache = {
+            key: value for key, value in self._user_cache.items() if value[0] > now
+        }
+        self._user_cache[user_id] = (now + JOB_USER_CACHE_TTL, user)
+
+        return user
+
+    async def _compose_job(self, document: Document) -> Job:
+        """Compose a job from a complete job document using cached user data.
+
+        :param document: the job document
+        :return: the job
+        """
+        return Job(
+            **{
+                **compose_job_fields(document),
+                "user": {
+                    **document["user"],
+                    **await self._get_nested_user(document["user"]["id"]),
+                },
+            },
+        )
+
     @emits(Operation.UPDATE)
     async def acquire(self, job_id: str) -> JobAcquired:
         """Set the `started` field on a job to `True` and return the complete document.
@@ -246,30 +419,37 @@ class JobsData:
         :return: the complete job document
 
         """
-        acquired = await get_one_field(self._mongo.jobs, "acquired", job_id)
-
-        if acquired is None:
-            raise ResourceNotFoundError("Job not found")
-
-        if acquired is True:
-            raise ResourceConflictError("Job already acquired")
-
         key, hashed = virtool.utils.generate_key()
 
-        await self._mongo.jobs.update_one(
-            {"_id": job_id},
+        status = compose_status(JobState.PREPARING, None, progress=3)
+
+        document = await self._mongo.jobs.find_one_and_update(
+            {"_id": job_id, "acquired": {"$ne": True}},
             {
                 "$set": {
+                    **compose_status_summary(status),
                     "acquired": True,
                     "key": hashed,
-                    "state": JobState.PREPARING.value,
-                },
-                "$push": {
-                    "status": compose_status(JobState.PREPARING, None, progress=3),
                 },
+                "$push": {"status": status},
             },
+            projection=["archived", "state", "workflow"],
+            return_document=ReturnDocument.BEFORE,
         )
 
+        if document is None:
+            if await id_exists(self._mongo.jobs, job_id):
+                raise ResourceConflictError("Job already acquired")
+
+            raise ResourceNotFoundError("Job not found")
+
+        if not document.get("archived"):
+            await self._update_counts(
+                document["workflow"],
+                document.get("state"),
+                status["state"],
+            )
+
         job = await self.get(job_id)
 
         return JobAcquired(**job.dict(), key=key)
@@ -282,15 +462,20 @@ class JobsData:
         :return: the complete job document
 
         """
-        archived = await get_one_field(self._mongo.jobs, "archived", job_id)
+        document = await self._mongo.jobs.find_one_and_update(
+            {"_id": job_id, "archived": {"$ne": True}},
+            {"$set": {"archived": True}},
+            projection=["state", "workflow"],
+            return_document=ReturnDocument.BEFORE,
+        )
 
-        if archived is None:
-            raise ResourceNotFoundError("Job not found")
+        if document is None:
+            if await id_exists(self._mongo.jobs, job_id):
+                raise ResourceConflictError("Job already archived")
 
-        if archived is True:
-            raise ResourceConflictError("Job already archived")
+            raise ResourceNotFoundError("Job not found")
 
-        await self._mongo.jobs.update_one({"_id": job_id}, {"$set": {"archived": True}})
+        await self._update_counts(document["workflow"], document.get("state"), None)
 
         return await self.get(job_id)
 
@@ -322,7 +507,10 @@ class JobsData:
         :return: the updated job document
 
         """
-        document = await self._mongo.jobs.find_one({"_id": job_id}, ["status"])
+        document = await self._mongo.jobs.find_one(
+            {"_id": job_id},
+            ["archived", "status", "workflow"],
+        )
 
         if document is None:
             raise ResourceNotFoundError
@@ -335,22 +523,35 @@ class JobsData:
         if result == JobCancellationResult.REMOVED_FROM_QUEUE:
             latest = document["status"][-1]
 
-            update_result: UpdateResult = await self._mongo.jobs.update_one(
-                {"_id": job_id},
+            status = compose_status(
+                JobState.CANCELLED,
+                latest["stage"],
+                progress=latest["progress"],
+            )
+
+            document = await self._mongo.jobs.find_one_and_update(
+                {"_id": job_id, "state": {"$nin": FINISHED_STATES}},
                 {
-                    "$push": {
-                        "status": compose_status(
-                            JobState.CANCELLED,
-                            latest["stage"],
-                            progress=latest["progress"],
-                        ),
-                    },
+                    "$set": compose_status_summary(status),
+                    "$push": {"status": status},
                 },
+                projection=["archived", "state", "workflow"],
+                return_document=ReturnDocument.BEFORE,
             )
 
-            if update_result.modified_count == 0:
+            if document is None:
+                if await id_exists(self._mongo.jobs, job_id):
+                    raise ResourceConflictError("Not cancellable")
+
                 raise ResourceNotFoundError
 
+            if not document.get("archived"):
+                await self._update_counts(
+                    document["workflow"],
+                    document.get("state"),
+                    status["state"],
+                )
+
         return await self.get(job_id)
 
     async def push_status(
@@ -363,20 +564,21 @@ class JobsData:
         error: Optional[dict] = None,
         progress: Optional[int] = None,
     ):
-        status = await get_one_field(self._mongo.jobs, "status", job_id)
-
-        if status is None:
-            raise ResourceNotFoundError
-
-        if JobState(status[-1]["state"]) in (
-            JobState.COMPLETE,
-            JobState.CANCELLED,
-            JobState.ERROR,
-            JobState.TERMINATED,
-            JobState.TIMEOUT,
-        ):
-            raise ResourceConflictError("Job is finished")
-
+        """Push a status update to a job.
+
+        The update is only applied if the job is not finished. The updated document is
+        returned by the same write, so the emitted job is composed without reading the
+        job again.
+
+        :param job_id: the ID of the job
+        :param state: the new state
+        :param stage: the new stage
+        :param step_name: the name of the current workflow step
+        :param step_description: the description of the current workflow step
+        :param error: error details if the job has failed
+        :param progress: the progress of the job
+        :return: the new status
+        """
         status_update = compose_status(
             state,
             stage,
@@ -386,17 +588,201 @@ class JobsData:
             progress,
         )
 
-        await self._mongo.jobs.update_one(
-            {"_id": job_id},
-            {"$set": {"state": state.value}, "$push": {"status": status_update}},
+        document = await self._mongo.jobs.find_one_and_update(
+            {"_id": job_id, "state": {"$nin": FINISHED_STATES}},
+            {
+                "$set": compose_status_summary(status_update),
+                "$push": {"status": status_update},
+            },
         )
 
-        job = await self.get(job_id)
+        if document is None:
+            if await id_exists(self._mongo.jobs, job_id):
+                raise ResourceConflictError("Job is finished")
+
+            raise ResourceNotFoundError
+
+        status = document["status"]
+
+        if not document.get("archived"):
+            await self._update_counts(
+                document["workflow"],
+                status[-2]["state"] if len(status) > 1 else None,
+                status_update["state"],
+            )
+
+        job = await self._compose_job(document)
 
         emit(job, self.name, "push_status", Operation.UPDATE)
 
         return job.status[-1]
 
+    async def push_updates(
+        self,
+        pings: List[JobPingUpdate],
+        statuses: List[JobStatusUpdate],
+    ) -> JobUpdateResults:
+        """Apply a batch of pings and status updates sent by job runners.
+
+        Updates from concurrent batches are coalesced and written together. Each update
+        is authenticated using its job key. Status updates are not applied to finished
+        jobs.
+
+        :param pings: the pings to apply
+        :param statuses: the status updates to apply
+        :return: the outcome of each ping and status update
+        """
+        outcomes = await self._update_buffer.add_many([*pings, *statuses])
+
+        return JobUpdateResults(
+            pings=[
+                JobUpdateResult(job_id=ping.job_id, outcome=outcome)
+                for ping, outcome in zip(pings, outcomes)
+            ],
+            statuses=[
+                JobUpdateResult(job_id=status.job_id, outcome=outcome)
+                for status, outcome in zip(statuses, outcomes[len(pings) :])
+            ],
+        )
+
+    async def close(self):
+        """Write any buffered pings and status updates.
+
+        Called when the jobs API shuts down so updates received just before shutdown
+        are not lost.
+        """
+        await self._update_buffer.close()
+
+    async def _apply_updates(
+        self,
+        updates: List[JobPingUpdate | JobStatusUpdate],
+    ) -> List[JobUpdateOutcome]:
+        """Write a batch of buffered pings and status updates.
+
+        The affected jobs are read once to authenticate the updates. The pings and
+        status updates are then written in one ordered bulk write. Each status update
+        only matches its job if the job isn't finished.
+
+        The jobs with status updates are read once after the write. A status update is
+        reported as applied and counted if its status was pushed to the job. The state
+        before it in the job's status list is used as the old state for the counts,
+        which are updated once for the whole batch.
+
+        :param updates: the updates to apply
+        :return: the outcome of each update
+        """
+        documents = {
+            document["_id"]: document
+            async for document in self._mongo.jobs.find(
+                {"_id": {"$in": list({update.job_id for update in updates})}},
+                ["key"],
+            )
+        }
+
+        outcomes: List[JobUpdateOutcome | None] = [None] * len(updates)
+        operations = []
+        statuses = {}
+        statuses_by_job = defaultdict(list)
+
+        ping = {"pinged_at": virtool.utils.timestamp()}
+
+        for index, update in enumerate(updates):
+            document = documents.get(update.job_id)
+
+            if document is None or document["key"] != hash_key(update.key):
+                outcomes[index] = JobUpdateOutcome.UNAUTHORIZED
+            elif isinstance(update, JobPingUpdate):
+                operations.append(
+                    UpdateOne({"_id": update.job_id}, {"$set": {"ping": ping}}),
+                )
+                outcomes[index] = JobUpdateOutcome.APPLIED
+            else:
+                status = compose_status(
+                    update.state,
+                    update.stage,
+                    update.step_name,
+                    update.step_description,
+                    update.error.dict() if update.error else None,
+                    update.progress,
+                )
+
+                # MongoDB stores timestamps with millisecond precision. Truncate the
+                # timestamp so the status can be found in the job after the write.
+                status["timestamp"] = status["timestamp"].replace(
+                    microsecond=status["timestamp"].microsecond // 1000 * 1000,
+                )
+
+                operations.append(
+                    UpdateOne(
+                        {"_id": update.job_id, "state": {"$nin": FINISHED_STATES}},
+                        {
+                            "$set": compose_status_summary(status),
+                            "$push": {"status": status},
+                        },
+                    ),
+                )
+
+                statuses[index] = status
+                statuses_by_job[update.job_id].append(index)
+
+        if operations:
+            await self._mongo.jobs.bulk_write(operations)
+
+        if not statuses_by_job:
+            return outcomes
+
+        updated_documents = {
+            document["_id"]: document
+            async for document in self._mongo.jobs.find(
+                {"_id": {"$in": list(statuses_by_job)}},
+            )
+        }
+
+        count_increments = defaultdict(int)
+        emitted_documents = []
+
+        for job_id, indexes in statuses_by_job.items():
+            document = updated_documents.get(job_id)
+            job_statuses = document["status"] if document else []
+
+            position = 0
+
+            for index in indexes:
+                try:
+                    position = job_statuses.index(statuses[index], position)
+                except ValueError:
+                    outcomes[index] = JobUpdateOutcome.FINISHED
+                    continue
+
+                outcomes[index] = JobUpdateOutcome.APPLIED
+
+                if not document.get("archived") and position > 0:
+                    workflow = document["workflow"]
+                    old_state = job_statuses[position - 1]["state"]
+                    new_state = statuses[index]["state"]
+                    count_increments[f"counts.{old_state}.{workflow}"] -= 1
+                    count_increments[f"counts.{new_state}.{workflow}"] += 1
+
+                position += 1
+
+            if JobUpdateOutcome.APPLIED in (outcomes[index] for index in indexes):
+                emitted_documents.append(document)
+
+        if count_increments := {
+            key: value for key, value in count_increments.items() if value
+        }:
+            await self._increment_counts(count_increments)
+
+        for document in emitted_documents:
+            emit(
+                await self._compose_job(document),
+                self.name,
+                "push_status",
+                Operation.UPDATE,
+            )
+
+        return outcomes
+
     async def delete(self, job_id: str):
         """Delete a job by its ID.
 
@@ -412,11 +798,17 @@ class JobsData:
                 "Job is running or waiting and cannot be removed.",
             )
 
-        delete_result = await self._mongo.jobs.delete_one({"_id": job_id})
+        document = await self._mongo.jobs.find_one_and_delete(
+            {"_id": job_id},
+            projection=["archived", "state", "workflow"],
+        )
 
-        if delete_result.deleted_count == 0:
+        if document is None:
             raise ResourceNotFoundError
 
+        if not document.get("archived"):
+            await self._update_counts(document["workflow"], document.get("state"), None)
+
         emit(job, "jobs", "delete", Operation.DELETE)
 
     async def force_delete(self):
@@ -424,6 +816,7 @@ class JobsData:
         job_ids = await self._mongo.jobs.distinct("_id")
         await gather(*[self._client.cancel(job_id) for job_id in job_ids])
         await self._mongo.jobs.delete_many({"_id": {"$in": job_ids}})
+        await self.reconcile_counts()
 
     async def timeout(self):
         """Timeout dead jobs.
@@ -434,50 +827,118 @@ class JobsData:
         Times out all jobs that have a ping field and haven't received a ping in 5
         minutes.
 
+        Dead jobs are found using the index on ``state`` and ``ping.pinged_at`` and
+        timed out in bulk writes of up to ``timeout_batch_size`` jobs. An update is
+        emitted for each job that is timed out. Jobs that change state while they are
+        being timed out are skipped for the rest of the sweep.
+
         """
         now = arrow.utcnow()
 
-        async with self._mongo.create_session() as session:
-            async for document in self._mongo.jobs.find(
-                {
-                    "$expr": {
-                        "$in": [
-                            {"$last": "$status.state"},
-                            [
-                                JobState.RUNNING.value,
-                                JobState.PREPARING.value,
-                            ],
-                        ],
-                    },
-                    "$or": [
-                        {"ping.pinged_at": {"$lt": now.shift(minutes=-5).naive}},
-                        {
-                            "ping": None,
-                            "status.0.timestamp": {"$lt": now.shift(days=-30).naive},
-                        },
-                    ],
-                },
-                session=session,
-            ):
-                latest = document["status"][-1]
+        query = {
+            "state": {"$in": [JobState.RUNNING.value, JobState.PREPARING.value]},
+            "$or": [
+                {"ping.pinged_at": {"$lt": now.shift(minutes=-5).naive}},
+                {"ping": None, "created_at": {"$lt": now.shift(days=-30).naive}},
+            ],
+        }
+
+        skipped = set()
+
+        while True:
+            documents = await self._mongo.jobs.find(
+                {**query, "_id": {"$nin": list(skipped)}} if skipped else query,
+                limit=self._timeout_batch_size,
+            ).to_list(None)
 
-                await self._mongo.jobs.update_one(
-                    {"_id": document["_id"]},
+            if not documents:
+                break
+
+            timed_out_ids = await self._timeout_batch(documents)
+
+            skipped.update(
+                document["_id"]
+                for document in documents
+                if document["_id"] not in timed_out_ids
+            )
+
+            if len(documents) < self._timeout_batch_size:
+                break
+
+    async def _timeout_batch(self, documents: List[Document]) -> set[str]:
+        """Time out a batch of dead jobs in a single bulk write.
+
+        Each job is only updated if its state hasn't changed since it was read, so a
+        job that reports a new state while the sweep is running is left alone.
+
+        :param documents: the complete job documents to time out
+        :return: the IDs of the jobs that were timed out
+        """
+        operations = []
+        timed_out = {}
+
+        old_states = {}
+
+        for document in documents:
+            latest = document["status"][-1]
+            old_states[document["_id"]] = document["state"]
+
+            status = compose_status(
+                JobState.TIMEOUT,
+                latest["stage"],
+                latest["step_name"],
+                latest["step_description"],
+                None,
+                latest["progress"],
+            )
+
+            operations.append(
+                UpdateOne(
+                    {"_id": document["_id"], "state": document["state"]},
                     {
-                        "$set": {"state": JobState.TIMEOUT.value},
-                        "$push": {
-                            "status": compose_status(
-                                JobState.TIMEOUT,
-                                latest["stage"],
-                                latest["step_name"],
-                                latest["step_description"],
-                                None,
-                                latest["progress"],
-                            ),
-                        },
+                        "$set": compose_status_summary(status),
+                        "$push": {"status": status},
                     },
-                    session=session,
-                )
+                ),
+            )
+
+            timed_out[document["_id"]] = {
+                **document,
+                **compose_status_summary(status),
+                "status": [*document["status"], status],
+            }
+
+        result = await self._mongo.jobs.bulk_write(operations, ordered=False)
+
+        if result.modified_count < len(operations):
+            timed_out_ids = await self._mongo.jobs.distinct(
+                "_id",
+                {"_id": {"$in": list(timed_out)}, "state": JobState.TIMEOUT.value},
+            )
+
+            timed_out = {job_id: timed_out[job_id] for job_id in timed_out_ids}
+
+        count_increments = defaultdict(int)
+
+        for document in timed_out.values():
+            if not document.get("archived"):
+                workflow = document["workflow"]
+                old_state = old_states[document["_id"]]
+                count_increments[f"counts.{old_state}.{workflow}"] -= 1
+                count_increments[f"counts.{JobState.TIMEOUT.value}.{workflow}"] += 1
+
+        if count_increments:
+            await self._increment_counts(count_increments)
+
+        for document in timed_out.values():
+            emit(
+                await self._compose_job(document),
+                self.name,
+                "timeout",
+                Operation.UPDATE,
+            )
+
+        return set(timed_out)
 
     async def relist(self):
         """Relist jobs in redis.
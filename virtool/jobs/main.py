@@ -7,6 +7,7 @@ import virtool.api.accept
 import virtool.jobs.auth
 from virtool.api.errors import error_middleware
 from virtool.config.cls import ServerConfig
+from virtool.data.utils import get_data_from_app
 from virtool.jobs.routes import startup_routes
 from virtool.startup import (
     startup_data,
@@ -58,6 +59,8 @@ async def create_app(config: ServerConfig):
 
 
 async def shutdown(app: App):
+    await get_data_from_app(app).jobs.close()
+
     try:
         app["redis"].close()
     except KeyError:
@@ -1,8 +1,8 @@
-from typing import List
-
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, conlist, validator
 from virtool_core.models.job import JobMinimal, Job
 
+from virtool.jobs.utils import JobPingUpdate, JobStatusUpdate, JobUpdateResults
+
 
 class GetJobResponse(JobMinimal):
     class Config:
@@ -364,3 +364,36 @@ class ArchiveJobSchema(BaseModel):
 
 class ArchiveJobsRequest(BaseModel):
     update: ArchiveJobSchema
+
+
+class PushJobUpdatesRequest(BaseModel):
+    pings: conlist(JobPingUpdate, max_items=1000) = []
+    statuses: conlist(JobStatusUpdate, max_items=1000) = []
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "pings": [{"job_id": "splu0pq3", "key": "key_1"}],
+                "statuses": [
+                    {
+                        "job_id": "qs3d5bnp",
+                        "key": "key_2",
+                        "progress": 33,
+                        "stage": "eliminate_subtraction",
+                        "state": "running",
+                        "step_description": "Map remaining reads to the subtraction.",
+                        "step_name": "Eliminate Subtraction",
+                    },
+                ],
+            }
+        }
+
+
+class PushJobUpdatesResponse(JobUpdateResults):
+    class Config:
+        schema_extra = {
+            "example": {
+                "pings": [{"job_id": "splu0pq3", "outcome": "applied"}],
+                "statuses": [{"job_id": "qs3d5bnp", "outcome": "finished"}],
+            }
+        }
@@ -33,6 +33,31 @@ class TimeoutJobsTask(BaseTask):
         await self.data.jobs.timeout()
 
 
+class ReconcileJobCountsTask(BaseTask):
+    """Recalculate the stored job counts.
+
+    Job counts are updated incrementally as jobs change state. This fixes any drift
+    caused by jobs that were changed outside of the data layer or by failed updates.
+
+    """
+
+    name = "reconcile_job_counts"
+
+    def __init__(
+        self,
+        task_id: int,
+        data: "DataLayer",
+        context: Dict,
+        temp_dir: TemporaryDirectory,
+    ):
+        super().__init__(task_id, data, context, temp_dir)
+
+        self.steps = [self.reconcile_counts]
+
+    async def reconcile_counts(self):
+        await self.data.jobs.reconcile_counts()
+
+
 class RelistJobsTask(BaseTask):
     """relist jobs in redis
 
@@ -1,5 +1,6 @@
 from typing import TYPE_CHECKING
 
+from virtool.data.loaders import get_loaders
 from virtool.data.transforms import AbstractTransform, apply_transforms
 from virtool.types import Document
 from virtool.users.transforms import AttachUserTransform
@@ -24,7 +25,9 @@ class AttachJobTransform(AbstractTransform):
         if job_id is None:
             return None
 
-        job = await self._mongo.jobs.find_one(job_id, ATTACHED_JOB_PROJECTION)
+        loader = get_loaders().mongo(self._mongo.jobs, ATTACHED_JOB_PROJECTION)
+
+        job = await loader.load(job_id)
 
         if job is None:
             return None
@@ -50,13 +53,11 @@ class AttachJobTransform(AbstractTransform):
     ) -> dict[str, Document | None]:
         job_ids = {get_safely(d, "job", "id") for d in documents}
 
-        jobs = [
-            base_processor(d)
-            async for d in self._mongo.jobs.find(
-                {"_id": {"$in": list(job_ids)}},
-                ATTACHED_JOB_PROJECTION,
-            )
-        ]
+        job_ids.discard(None)
+
+        loader = get_loaders().mongo(self._mongo.jobs, ATTACHED_JOB_PROJECTION)
+
+        jobs = [base_processor(d) for d in await loader.load_many(job_ids) if d]
 
         jobs = await apply_transforms(jobs, [AttachUserTransform(self._mongo)])
 
@@ -1,5 +1,7 @@
-from typing import Optional
+from enum import Enum
+from typing import List, Optional
 
+from pydantic import BaseModel, conint, root_validator, validator
 from virtool_core.models.job import JobState
 
 import virtool.utils
@@ -15,6 +17,64 @@ WORKFLOW_NAMES = (
 )
 
 
+class JobUpdateError(BaseModel):
+    """Error details included in a status update for a failed job."""
+
+    type: str
+    traceback: List[str]
+    details: List[str]
+
+
+class JobPingUpdate(BaseModel):
+    """A ping for a job sent as part of a batch of updates."""
+
+    job_id: str
+    key: str
+
+
+class JobStatusUpdate(BaseModel):
+    """A status update for a job sent as part of a batch of updates."""
+
+    job_id: str
+    key: str
+    error: JobUpdateError | None = None
+    progress: conint(ge=0, le=100)
+    stage: str
+    state: JobState
+    step_description: str | None = None
+    step_name: str | None = None
+
+    @validator("state")
+    def check_state(cls, state: JobState) -> JobState:
+        if state in (JobState.PREPARING, JobState.TIMEOUT):
+            raise ValueError(f"The `state` field cannot be `{state.value}`")
+        return state
+
+    @root_validator(skip_on_failure=True)
+    def check_error(cls, values):
+        if values["state"] == JobState.ERROR and not values["error"]:
+            raise ValueError("Missing error information")
+        return values
+
+
+class JobUpdateOutcome(str, Enum):
+    APPLIED = "applied"
+    FINISHED = "finished"
+    UNAUTHORIZED = "unauthorized"
+
+
+class JobUpdateResult(BaseModel):
+    job_id: str
+    outcome: JobUpdateOutcome
+
+
+class JobUpdateResults(BaseModel):
+    """The outcome of each ping and status update in a batch of job updates."""
+
+    pings: List[JobUpdateResult]
+    statuses: List[JobUpdateResult]
+
+
 def compose_status(
     state: Optional[JobState],
     stage: Optional[str],
@@ -45,6 +105,24 @@ def compose_status(
     }
 
 
+def compose_status_summary(status: Document) -> Document:
+    """
+    Compose the fields that summarize the latest status of a job.
+
+    These fields are set on the job document whenever a status is pushed so that jobs
+    can be filtered, sorted, and counted by their current state using indexes instead
+    of reading the ``status`` list.
+
+    :param status: the latest status subdocument
+    :return: an update for the job document
+    """
+    return {
+        "progress": status["progress"],
+        "stage": status["stage"],
+        "state": status["state"],
+    }
+
+
 def check_job_is_running_or_waiting(document: Document) -> bool:
     """
     Returns a boolean indicating whether the passed job document is in the running or
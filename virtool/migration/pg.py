@@ -9,7 +9,7 @@ from structlog import get_logger
 from virtool.migration.cls import AppliedRevision
 from virtool.pg.base import Base
 
-REQUIRED_VIRTOOL_REVISION = "141c7ecb99b7"
+REQUIRED_VIRTOOL_REVISION = "xn3hgz7e7ehm"
 
 logger = get_logger("migration")
 
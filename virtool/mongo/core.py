@@ -38,6 +38,7 @@ class Collection:
         self.drop_index = self._collection.drop_index
         self.drop_indexes = self._collection.drop_indexes
         self.find_one = self._collection.find_one
+        self.find_one_and_delete = self._collection.find_one_and_delete
         self.find = self._collection.find
         self.rename = self._collection.rename
         self.replace_one = self._collection.replace_one
@@ -51,14 +52,20 @@ class Collection:
         projection: Projection | None = None,
         upsert: bool = False,
         session: AsyncIOMotorClientSession | None = None,
+        return_document: ReturnDocument = ReturnDocument.AFTER,
     ) -> Document | None:
         """Update a document and return the updated result.
 
+        Pass ``ReturnDocument.BEFORE`` as ``return_document`` to get the document as it
+        was before the update instead.
+
         :param query: a MongoDB query used to select the documents to update
         :param update: a MongoDB update
         :param projection: a projection to apply to the document instead of the default
         :param upsert: insert a new document if no existing document is found
         :param session: an optional Motor session to use
+        :param return_document: whether to return the document before or after the
+            update
         :return: the updated document
 
         """
@@ -66,7 +73,7 @@ class Collection:
             query,
             update,
             projection=projection,
-            return_document=ReturnDocument.AFTER,
+            return_document=return_document,
             upsert=upsert,
             session=session,
         )
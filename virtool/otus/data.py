@@ -18,6 +18,7 @@ from virtool.history.utils import (
     compose_create_description,
     compose_edit_description,
     compose_remove_description,
+    remove_otu_snapshot_files,
 )
 from virtool.mongo.core import Mongo
 from virtool.mongo.utils import get_one_field
@@ -324,7 +325,8 @@ class OTUData:
     async def remove(self, otu_id: str, user_id: str) -> DeleteResult | None:
         """Remove an OTU.
 
-        Create a history document to record the change.
+        Create a history document to record the change. Snapshots of the OTU are
+        removed once the change is committed.
 
         :param otu_id: the ID of the OTU
         :param user_id: the ID of the requesting user
@@ -366,7 +368,11 @@ class OTUData:
 
             return delete_result
 
-        return await self._mongo.with_transaction(func)
+        delete_result = await self._mongo.with_transaction(func)
+
+        await remove_otu_snapshot_files(self._data_path, [otu_id])
+
+        return delete_result
 
     async def add_isolate(
         self,
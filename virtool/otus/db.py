@@ -209,7 +209,8 @@ async def bulk_join_documents(
         dict_entry.append(sequence)
 
     merged_documents = [
-        virtool.otus.utils.merge_otu(otu, sequences[otu["_id"]]) for otu in otus
+        virtool.otus.utils.merge_otu(otu, sequences.get(otu["_id"], []))
+        for otu in otus
     ]
 
     return merged_documents
@@ -1,12 +1,15 @@
 import asyncio
 from asyncio import FIRST_COMPLETED, CancelledError, Queue
+from contextlib import suppress
 from datetime import datetime
 from pathlib import Path
 from typing import Callable
 
 from motor.motor_asyncio import AsyncIOMotorClientSession
+from virtool_core.models.enums import HistoryMethod
 
 from virtool.history.db import prepare_add
+from virtool.history.utils import derive_otu_information, remove_change_files
 from virtool.mongo.core import Collection, Mongo
 from virtool.mongo.identifier import AbstractIdProvider
 from virtool.otus.db import bulk_join_ids, bulk_join_query
@@ -29,7 +32,14 @@ from virtool.references.db import (
 from virtool.tasks.progress import AccumulatingProgressHandlerWrapper
 from virtool.types import Document
 
+BATCH_SIZE = 25
+"""The default number of items buffered before they are written in one operation."""
+
+INSERT_BATCH_SIZE = 100
+"""The number of items written in one operation when populating a new reference."""
+
 WORKER_COUNT = 25
+"""The default number of concurrent workers processing buffered chunks."""
 
 
 class WorkerPool:
@@ -37,10 +47,11 @@ class WorkerPool:
         self,
         queue: Queue,
         session: AsyncIOMotorClientSession,
+        worker_count: int = WORKER_COUNT,
     ):
         self._queue = queue
         self._session = session
-        self._workers = [asyncio.create_task(self._work()) for _ in range(WORKER_COUNT)]
+        self._workers = [asyncio.create_task(self._work()) for _ in range(worker_count)]
 
     async def _work(self):
         while True:
@@ -56,7 +67,11 @@ class WorkerPool:
             except CancelledError:
                 break
 
-    async def close(self):
+    async def join(self):
+        """Wait until every queued chunk has been processed.
+
+        If a worker fails, its exception is raised instead.
+        """
         join_task = asyncio.create_task(self._queue.join())
 
         await asyncio.wait([join_task, *self._workers], return_when=FIRST_COMPLETED)
@@ -64,15 +79,43 @@ class WorkerPool:
         if exceptions := [
             worker.exception() for worker in self._workers if worker.done()
         ]:
+            join_task.cancel()
             raise exceptions[0]
 
+    async def close(self):
+        try:
+            await self.join()
+        finally:
+            for worker in self._workers:
+                worker.cancel()
+
+    async def abort(self):
+        """Discard queued chunks, let chunks that are being written finish, and stop
+        the workers.
+
+        Worker exceptions are not raised. Aborting happens while another error is
+        already being handled.
+        """
+        while not self._queue.empty():
+            self._queue.get_nowait()
+            self._queue.task_done()
+
+        with suppress(Exception):
+            await self.join()
+
         for worker in self._workers:
             worker.cancel()
 
 
 class BaseDataBuffer:
-    def __init__(self, update_function: Callable, queue: Queue):
+    def __init__(
+        self,
+        update_function: Callable,
+        queue: Queue,
+        batch_size: int = BATCH_SIZE,
+    ):
         self._buffer = []
+        self.batch_size = batch_size
         self.update_function = update_function
         self.queue = queue
         self.flush_buffer = False
@@ -87,7 +130,7 @@ class BaseDataBuffer:
             self.flush()
 
     def flush(self):
-        if len(self._buffer) >= 25 or self.flush_buffer:
+        if len(self._buffer) >= self.batch_size or self.flush_buffer:
             self.queue.put_nowait(
                 DataChunk(self._buffer, self.update_function),
             )
@@ -110,6 +153,7 @@ class OTUDataBuffer(BaseDataBuffer):
         task_queue: Queue,
         collection: "Collection",
         id_provider: AbstractIdProvider,
+        batch_size: int = BATCH_SIZE,
     ):
         async def func(
             change_buffer: list[BufferData],
@@ -128,10 +172,15 @@ class OTUDataBuffer(BaseDataBuffer):
             for update in updates:
                 await update.callback(update.data["_id"])
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
     @classmethod
-    def update_buffer(cls, task_queue: Queue, collection: "Collection"):
+    def update_buffer(
+        cls,
+        task_queue: Queue,
+        collection: "Collection",
+        batch_size: int = BATCH_SIZE,
+    ):
         async def func(
             change_buffer: list[BufferData],
             session: AsyncIOMotorClientSession,
@@ -143,10 +192,15 @@ class OTUDataBuffer(BaseDataBuffer):
             for update in change_buffer:
                 await update.callback()
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
     @classmethod
-    def delete_buffer(cls, task_queue: Queue, collection: "Collection"):
+    def delete_buffer(
+        cls,
+        task_queue: Queue,
+        collection: "Collection",
+        batch_size: int = BATCH_SIZE,
+    ):
         async def func(
             change_buffer: list[BufferData],
             session: AsyncIOMotorClientSession,
@@ -158,10 +212,15 @@ class OTUDataBuffer(BaseDataBuffer):
             for update in change_buffer:
                 await update.callback()
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
     @classmethod
-    def history_insert_buffer(cls, task_queue: Queue, collection: "Collection"):
+    def history_insert_buffer(
+        cls,
+        task_queue: Queue,
+        collection: "Collection",
+        batch_size: int = BATCH_SIZE,
+    ):
         async def func(
             change_buffer: list[BufferData],
             session: AsyncIOMotorClientSession,
@@ -171,7 +230,7 @@ class OTUDataBuffer(BaseDataBuffer):
                 session=session,
             )
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
 
 class OTUDataBulkUpdater:
@@ -179,9 +238,10 @@ class OTUDataBulkUpdater:
         self,
         mongo: "Mongo",
         user_id: str,
-        progress_tracker: AccumulatingProgressHandlerWrapper,
+        progress_tracker: AccumulatingProgressHandlerWrapper | None,
         task_queue: Queue,
         prepare_history: Callable,
+        batch_size: int = BATCH_SIZE,
     ):
         self.user_id = user_id
         self.progress_tracker = progress_tracker
@@ -190,33 +250,66 @@ class OTUDataBulkUpdater:
         self.update_sequence_buffer = OTUDataBuffer.update_buffer(
             task_queue,
             mongo.sequences,
+            batch_size,
         )
 
         self.insert_sequence_buffer = OTUDataBuffer.insert_buffer(
             task_queue,
             mongo.sequences,
             mongo.id_provider,
+            batch_size,
+        )
+        self.update_otu_buffer = OTUDataBuffer.update_buffer(
+            task_queue,
+            mongo.otus,
+            batch_size,
         )
-        self.update_otu_buffer = OTUDataBuffer.update_buffer(task_queue, mongo.otus)
         self.insert_otu_buffer = OTUDataBuffer.insert_buffer(
             task_queue,
             mongo.otus,
             mongo.id_provider,
+            batch_size,
         )
         self.delete_sequence_buffer = OTUDataBuffer.delete_buffer(
             task_queue,
             mongo.sequences,
+            batch_size,
+        )
+        self.delete_otus_buffer = OTUDataBuffer.delete_buffer(
+            task_queue,
+            mongo.otus,
+            batch_size,
         )
-        self.delete_otus_buffer = OTUDataBuffer.delete_buffer(task_queue, mongo.otus)
         self.update_references_buffer = OTUDataBuffer.update_buffer(
             task_queue,
             mongo.references,
+            batch_size,
         )
         self.update_history_buffer = OTUDataBuffer.history_insert_buffer(
             task_queue,
             mongo.history,
+            batch_size,
         )
 
+    @property
+    def otu_buffers(self) -> list[BaseDataBuffer]:
+        """The buffers that write OTUs and references."""
+        return [
+            self.update_otu_buffer,
+            self.insert_otu_buffer,
+            self.delete_otus_buffer,
+            self.update_references_buffer,
+        ]
+
+    @property
+    def sequence_buffers(self) -> list[BaseDataBuffer]:
+        """The buffers that write sequences after their OTUs are written."""
+        return [
+            self.update_sequence_buffer,
+            self.insert_sequence_buffer,
+            self.delete_sequence_buffer,
+        ]
+
     def update(self, updates: list[OTUUpdate]):
         for update in updates:
             self.update_otu_buffer.add(
@@ -242,19 +335,9 @@ class OTUDataBulkUpdater:
     async def insert_history(self, history_inserts: list[Document]):
         for history_insert in history_inserts:
             self.update_history_buffer.add(DBBufferData(history_insert))
-        await self.progress_tracker.add(len(history_inserts))
 
-    async def finish(self):
-        await asyncio.gather(
-            self.update_otu_buffer.finish(),
-            self.insert_otu_buffer.finish(),
-            self.delete_otus_buffer.finish(),
-            self.update_references_buffer.finish(),
-            self.update_sequence_buffer.finish(),
-            self.insert_sequence_buffer.finish(),
-            self.delete_sequence_buffer.finish(),
-            self.update_history_buffer.finish(),
-        )
+        if self.progress_tracker:
+            await self.progress_tracker.add(len(history_inserts))
 
     def _otu_changed(self, otu_change: OTUChange):
         async def func(otu_id: str = None):
@@ -264,6 +347,10 @@ class OTUDataBulkUpdater:
 
             self._insert_sequences(otu_change)
 
+            # OTUs without sequence changes won't be completed by a sequence callback.
+            if otu_change.is_complete:
+                await self.prepare_history(otu_change)
+
         return func
 
     def _insert_sequences(self, otu_change: OTUChange):
@@ -311,6 +398,7 @@ class OTUUpdateBuffer(BaseDataBuffer):
         ref_id: str,
         user_id: str,
         created_at: datetime,
+        batch_size: int = BATCH_SIZE,
     ):
         async def func(data: list[OTUUpdateBufferData], session):
             old_otus = await bulk_join_query(
@@ -331,7 +419,7 @@ class OTUUpdateBuffer(BaseDataBuffer):
                     insert_otu = prepare_insert_otu(otu, created_at, ref_id, user_id)
                     update_db.insert(insert_otu)
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
     @classmethod
     def prepare_update_buffer(
@@ -340,6 +428,7 @@ class OTUUpdateBuffer(BaseDataBuffer):
         bulk_db_updater: OTUDataBulkUpdater,
         mongo: "Mongo",
         ref_id: str,
+        batch_size: int = BATCH_SIZE,
     ):
         async def func(otu_data: list[OTUData], session):
             updates = await bulk_prepare_update_joined_otu(
@@ -351,7 +440,7 @@ class OTUUpdateBuffer(BaseDataBuffer):
             if updates:
                 bulk_db_updater.update(updates)
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
     @classmethod
     def prepare_insert_history_buffer(
@@ -361,7 +450,15 @@ class OTUUpdateBuffer(BaseDataBuffer):
         mongo: "Mongo",
         user_id: str,
         data_path: Path,
+        change_ids: set[str],
+        batch_size: int = BATCH_SIZE,
     ):
+        """Create a buffer that inserts history for OTU changes.
+
+        The ID of every change is added to ``change_ids`` before its diff and snapshot
+        files are written, so the files can be removed if the changes are rolled back.
+        """
+
         async def func(
             data: list[OTUUpdateBufferData],
             session: AsyncIOMotorClientSession,
@@ -369,7 +466,7 @@ class OTUUpdateBuffer(BaseDataBuffer):
             docs = [
                 otu_data.data.otu_id
                 for otu_data in data
-                if otu_data.data.history_method in ("update", "create")
+                if otu_data.data.history_method != HistoryMethod.remove
             ]
 
             joined_documents = await bulk_join_ids(mongo, docs, session)
@@ -377,19 +474,30 @@ class OTUUpdateBuffer(BaseDataBuffer):
                 document["_id"]: document for document in joined_documents
             }
 
-            inserts = [
-                await prepare_add(
-                    otu_data.data.history_method,
+            for otu_data in data:
+                otu_id, _, otu_version, _ = derive_otu_information(
                     otu_data.data.old,
                     joined_documents.get(otu_data.data.otu_id),
-                    user_id,
-                    data_path,
                 )
-                for otu_data in data
-            ]
+                change_ids.add(f"{otu_id}.{otu_version}")
+
+            # Large diffs and snapshots are written to files concurrently.
+            inserts = await asyncio.gather(
+                *[
+                    prepare_add(
+                        otu_data.data.history_method,
+                        otu_data.data.old,
+                        joined_documents.get(otu_data.data.otu_id),
+                        user_id,
+                        data_path,
+                    )
+                    for otu_data in data
+                ],
+            )
+
             await bulk_db_updater.insert_history(inserts)
 
-        return cls(func, task_queue)
+        return cls(func, task_queue, batch_size)
 
 
 class BulkOTUUpdater:
@@ -400,16 +508,23 @@ class BulkOTUUpdater:
         user_id: str,
         created_at: datetime,
         data_path: Path,
-        progress_tracker: AccumulatingProgressHandlerWrapper,
+        progress_tracker: AccumulatingProgressHandlerWrapper | None,
         session: AsyncIOMotorClientSession,
+        batch_size: int = BATCH_SIZE,
+        worker_count: int = WORKER_COUNT,
     ):
         self.session = session
         self.mongo = mongo
         self.created_at = created_at
+        self.data_path = data_path
         self.ref_id = ref_id
         self.user_id = user_id
         self.task_queue = asyncio.Queue()
-        self.worker_pool = WorkerPool(self.task_queue, session)
+
+        #: The IDs of changes whose history files may have been written.
+        self.change_ids: set[str] = set()
+
+        self.worker_pool = WorkerPool(self.task_queue, session, worker_count)
 
         self.update_db = OTUDataBulkUpdater(
             mongo,
@@ -417,12 +532,14 @@ class BulkOTUUpdater:
             progress_tracker,
             self.task_queue,
             self._insert_history,
+            batch_size,
         )
         self.prepare_otu_update_buffer = OTUUpdateBuffer.prepare_update_buffer(
             self.task_queue,
             self.update_db,
             mongo,
             ref_id,
+            batch_size,
         )
 
         self.prepare_insert_history_buffer = (
@@ -432,6 +549,8 @@ class BulkOTUUpdater:
                 mongo,
                 user_id,
                 data_path,
+                self.change_ids,
+                batch_size,
             )
         )
 
@@ -443,13 +562,23 @@ class BulkOTUUpdater:
             ref_id,
             user_id,
             created_at,
+            batch_size,
         )
 
     def bulk_upsert(self, otus: list[dict]):
         for otu in otus:
             self.prepare_upsert_buffer.add(OTUUpdateBufferData(otu))
 
-    def bulk_insert(self, otus: list[dict]):
+    def bulk_insert(
+        self,
+        otus: list[dict],
+        history_method: HistoryMethod = HistoryMethod.create,
+    ):
+        """Insert new OTUs and their sequences and record their creation in history.
+
+        :param otus: the joined OTUs to insert
+        :param history_method: the history method to record for each OTU
+        """
         for otu in otus:
             insert_otu = prepare_insert_otu(
                 otu,
@@ -457,6 +586,7 @@ class BulkOTUUpdater:
                 self.ref_id,
                 self.user_id,
             )
+            insert_otu.history_method = history_method
             self.update_db.insert(insert_otu)
 
     async def delete(self, otu_id: str):
@@ -464,13 +594,40 @@ class BulkOTUUpdater:
         if remove_otu:
             self.update_db.delete(remove_otu)
 
+    async def wait(self):
+        """Wait for all queued writes to complete.
+
+        Partially filled buffers are not written. Call this between batches when
+        inserting a stream of OTUs to stop the queue from growing with the input.
+        """
+        await self.worker_pool.join()
+
+    async def abort(self):
+        """Stop writing without flushing buffered or queued data.
+
+        Call this when the transaction the updater writes in is going to roll back.
+        Diff and snapshot files written for the discarded changes are removed.
+        """
+        await self.worker_pool.abort()
+        await remove_change_files(self.data_path, sorted(self.change_ids))
+
     async def finish(self):
-        await asyncio.gather(
-            self.prepare_upsert_buffer.finish(),
-            self.prepare_otu_update_buffer.finish(),
-            self.prepare_insert_history_buffer.finish(),
-            self.update_db.finish(),
-        )
+        """Write everything that is still buffered and wait for all writes to complete.
+
+        Buffers are finished in the order data flows through them, waiting for the
+        queue to drain between stages. This lets downstream buffers keep filling whole
+        batches until their upstream buffers have finished.
+        """
+        for buffers in (
+            [self.prepare_upsert_buffer],
+            [self.prepare_otu_update_buffer],
+            self.update_db.otu_buffers,
+            self.update_db.sequence_buffers,
+            [self.prepare_insert_history_buffer],
+            [self.update_db.update_history_buffer],
+        ):
+            await asyncio.gather(*[buffer.finish() for buffer in buffers])
+            await self.worker_pool.join()
 
         await self.worker_pool.close()
 
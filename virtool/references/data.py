@@ -39,12 +39,13 @@ from virtool.data.transforms import apply_transforms
 from virtool.errors import GitHubError
 from virtool.github import create_update_subdocument, format_release
 from virtool.groups.pg import SQLGroup
-from virtool.history.db import patch_to_version
+from virtool.history.db import get_patched_otu
+from virtool.history.utils import remove_otu_snapshot_files
 from virtool.mongo.core import Mongo
 from virtool.mongo.utils import get_mongo_from_app, get_new_id, get_one_field, id_exists
 from virtool.otus.oas import CreateOTURequest
 from virtool.pg.utils import get_row
-from virtool.references.bulk import BulkOTUUpdater
+from virtool.references.bulk import INSERT_BATCH_SIZE, BulkOTUUpdater
 from virtool.references.db import (
     compose_base_find_query,
     fetch_and_update_release,
@@ -74,7 +75,11 @@ from virtool.references.tasks import (
     UpdateRemoteReferenceTask,
 )
 from virtool.references.transforms import AttachImportedFromTransform
-from virtool.references.utils import RIGHTS, ReferenceSourceData
+from virtool.references.utils import (
+    RIGHTS,
+    ReferenceSourceData,
+    ReferenceSourceStream,
+)
 from virtool.tasks.progress import (
     AccumulatingProgressHandlerWrapper,
     TaskProgressHandler,
@@ -84,7 +89,7 @@ from virtool.types import Document
 from virtool.uploads.models import SQLUpload
 from virtool.users.mongo import extend_user
 from virtool.users.transforms import AttachUserTransform
-from virtool.utils import chunk_list, get_http_session_from_app, get_safely
+from virtool.utils import get_http_session_from_app, get_safely
 
 
 class ReferencesData(DataLayerDomain):
@@ -375,6 +380,11 @@ class ReferencesData(DataLayerDomain):
 
         await self._mongo.references.delete_one({"_id": ref_id})
 
+        await remove_otu_snapshot_files(
+            self._config.data_path,
+            await self._mongo.history.distinct("otu.id", {"reference.id": ref_id}),
+        )
+
         emit(reference, "references", "delete", Operation.DELETE)
 
     async def get_release(self, ref_id: str, app) -> ReferenceRelease:
@@ -855,7 +865,7 @@ class ReferencesData(DataLayerDomain):
 
         async with self._mongo.create_session() as session:
             for source_otu_id, version in manifest.items():
-                _, patched, _ = await patch_to_version(
+                patched = await get_patched_otu(
                     self._config.data_path,
                     self._mongo,
                     source_otu_id,
@@ -893,63 +903,29 @@ class ReferencesData(DataLayerDomain):
         self,
         ref_id: str,
         user_id: str,
-        data: ReferenceSourceData,
+        source: ReferenceSourceStream,
         progress_handler: TaskProgressHandler,
     ):
-        created_at = await get_one_field(self._mongo.references, "created_at", ref_id)
-
-        tracker = AccumulatingProgressHandlerWrapper(
-            progress_handler,
-            (len(data.otus) * 2),
-        )
+        """Populate a new reference with OTUs streamed from an imported reference file.
 
-        inserted_otu_ids = []
+        :param ref_id: the id of the reference to populate
+        :param user_id: the id of the user importing the reference
+        :param source: the stream of OTUs from the reference file
+        :param progress_handler: a handler for reporting progress
+        """
+        created_at = await get_one_field(self._mongo.references, "created_at", ref_id)
 
         async with self._mongo.create_session() as session:
-            await self._mongo.references.update_one(
-                {"_id": ref_id},
-                {
-                    "$set": {
-                        "data_type": data.data_type,
-                        "organism": data.organism,
-                        "targets": data.targets,
-                    },
-                },
+            await self._insert_source_otus(
+                ref_id,
+                user_id,
+                created_at,
+                source,
+                HistoryMethod.import_otu,
+                progress_handler,
+                session,
             )
 
-            for chunk in chunk_list(data.otus, 10):
-                chunk_otu_ids = await asyncio.gather(
-                    *[
-                        insert_joined_otu(
-                            self._mongo,
-                            otu,
-                            created_at,
-                            ref_id,
-                            user_id,
-                            session,
-                        )
-                        for otu in chunk
-                    ],
-                )
-                inserted_otu_ids.extend(chunk_otu_ids)
-                await tracker.add(len(chunk))
-
-            for chunk in chunk_list(inserted_otu_ids, 10):
-                await asyncio.gather(
-                    *[
-                        insert_change(
-                            self._config.data_path,
-                            self._mongo,
-                            otu_id,
-                            HistoryMethod.import_otu,
-                            user_id,
-                            session,
-                        )
-                        for otu_id in chunk
-                    ],
-                )
-                await tracker.add(len(chunk))
-
         emit(
             await self.get(ref_id),
             "references",
@@ -960,13 +936,19 @@ class ReferencesData(DataLayerDomain):
     async def populate_remote_reference(
         self,
         ref_id: str,
-        data: ReferenceSourceData,
+        source: ReferenceSourceStream,
         user_id: str,
         release: Document,
         progress_handler: TaskProgressHandler,
     ):
-        tracker = AccumulatingProgressHandlerWrapper(progress_handler, len(data.otus))
+        """Populate a new remote reference with OTUs streamed from a release file.
 
+        :param ref_id: the id of the reference to populate
+        :param source: the stream of OTUs from the release file
+        :param user_id: the id of the user installing the reference
+        :param release: the release being installed
+        :param progress_handler: a handler for reporting progress
+        """
         created_at: datetime = await get_one_field(
             self._mongo.references,
             "created_at",
@@ -974,39 +956,16 @@ class ReferencesData(DataLayerDomain):
         )
 
         async with self._mongo.create_session() as session:
-            await self._mongo.references.update_one(
-                {"_id": ref_id},
-                {
-                    "$set": {
-                        "data_type": data.data_type.value,
-                        "organism": data.organism,
-                        "targets": data.targets,
-                    },
-                },
-                session=session,
+            await self._insert_source_otus(
+                ref_id,
+                user_id,
+                created_at,
+                source,
+                HistoryMethod.remote,
+                progress_handler,
+                session,
             )
 
-            for otu in data.otus:
-                otu_id = await insert_joined_otu(
-                    self._mongo,
-                    otu,
-                    created_at,
-                    ref_id,
-                    user_id,
-                    session,
-                )
-
-                await insert_change(
-                    self._config.data_path,
-                    self._mongo,
-                    otu_id,
-                    HistoryMethod.remote,
-                    user_id,
-                    session,
-                )
-
-                await tracker.add(1)
-
             await self._mongo.references.update_one(
                 {"_id": ref_id, "updates.id": release["id"]},
                 {
@@ -1026,6 +985,76 @@ class ReferencesData(DataLayerDomain):
             Operation.UPDATE,
         )
 
+    async def _insert_source_otus(
+        self,
+        ref_id: str,
+        user_id: str,
+        created_at: datetime,
+        source: ReferenceSourceStream,
+        history_method: HistoryMethod,
+        progress_handler: TaskProgressHandler,
+        session,
+    ):
+        """Insert OTUs from ``source`` into a new reference as they are read and then
+        set the reference metadata from the file.
+
+        Progress is reported as the fraction of the compressed file that has been read.
+
+        The source is checked as it is read, so it can fail after some OTUs have been
+        inserted. Pending writes are then discarded and the error is re-raised, rolling
+        back the transaction ``session`` belongs to.
+        """
+        await source.open()
+
+        tracker = AccumulatingProgressHandlerWrapper(progress_handler, source.size)
+
+        bulk_updater = BulkOTUUpdater(
+            self._mongo,
+            ref_id,
+            user_id,
+            created_at,
+            self._config.data_path,
+            None,
+            session,
+            batch_size=INSERT_BATCH_SIZE,
+        )
+
+        position = 0
+
+        try:
+            async for otus in source:
+                bulk_updater.bulk_insert(otus, history_method)
+
+                # Let queued writes complete before taking more OTUs from the file so
+                # memory use doesn't grow with the size of the reference.
+                await bulk_updater.wait()
+
+                await tracker.add(source.position - position)
+                position = source.position
+
+            await bulk_updater.finish()
+        except Exception:
+            await bulk_updater.abort()
+            raise
+        finally:
+            await source.aclose()
+
+        await tracker.add(source.size - position)
+
+        data = source.data
+
+        await self._mongo.references.update_one(
+            {"_id": ref_id},
+            {
+                "$set": {
+                    "data_type": data.data_type.value,
+                    "organism": data.organism,
+                    "targets": data.targets,
+                },
+            },
+            session=session,
+        )
+
     async def update_remote_reference(
         self,
         ref_id: str,
@@ -1080,12 +1109,16 @@ class ReferencesData(DataLayerDomain):
                 session,
             )
 
-            bulk_updater.bulk_upsert(data.otus)
+            try:
+                bulk_updater.bulk_upsert(data.otus)
 
-            for otu_id in to_delete:
-                await bulk_updater.delete(otu_id)
+                for otu_id in to_delete:
+                    await bulk_updater.delete(otu_id)
 
-            await bulk_updater.finish()
+                await bulk_updater.finish()
+            except Exception:
+                await bulk_updater.abort()
+                raise
 
             await self._mongo.references.update_one(
                 {"_id": ref_id, "updates.id": release["id"]},
@@ -1,4 +1,3 @@
-import json
 from asyncio import to_thread
 from pathlib import Path
 from tempfile import TemporaryDirectory
@@ -6,12 +5,12 @@ from typing import TYPE_CHECKING, Dict, Optional
 
 from aiohttp import ClientConnectorError
 
-from virtool.api.custom_json import dump_string
 from virtool.data.http import download_file
 from virtool.errors import WebError
 from virtool.references.utils import (
+    ReferenceImportError,
     ReferenceSourceData,
-    check_import_data,
+    ReferenceSourceStream,
     load_reference_file,
 )
 from virtool.tasks.progress import AccumulatingProgressHandlerWrapper
@@ -54,36 +53,39 @@ class ImportReferenceTask(BaseTask):
 
         self.steps = [self.load_file, self.import_reference]
 
-        self.import_data: ReferenceSourceData | None = None
+        self.source: ReferenceSourceStream | None = None
 
     async def load_file(self):
-        path = Path(self.context["path"])
+        self.source = ReferenceSourceStream(
+            Path(self.context["path"]),
+            strict=False,
+            verify=True,
+        )
 
         try:
-            import_data = await to_thread(load_reference_file, path)
-        except json.decoder.JSONDecodeError as err:
-            return await self._set_error(str(err).split("JSONDecodeError: ")[1])
+            await self.source.open()
+        except ReferenceImportError as err:
+            return await self._set_error(str(err))
         except OSError as err:
-            if "Not a gzipped file" in str(err):
-                return await self._set_error("Not a gzipped file")
-
             return await self._set_error(str(err))
 
-        if errors := check_import_data(import_data, strict=False, verify=True):
-            return await self._set_error(errors)
-
-        self.import_data = ReferenceSourceData(**import_data)
-
     async def import_reference(self):
         ref_id = self.context["ref_id"]
         user_id = self.context["user_id"]
 
-        await self.data.references.populate_imported_reference(
-            ref_id,
-            user_id,
-            self.import_data,
-            self.create_progress_handler(),
-        )
+        try:
+            await self.data.references.populate_imported_reference(
+                ref_id,
+                user_id,
+                self.source,
+                self.create_progress_handler(),
+            )
+        except ReferenceImportError as err:
+            await self._set_error(str(err))
+
+    async def cleanup(self):
+        if self.source:
+            await self.source.aclose()
 
 
 class RemoteReferenceTask(BaseTask):
@@ -100,7 +102,7 @@ class RemoteReferenceTask(BaseTask):
 
         self.steps = [self.download, self.populate]
 
-        self.import_data: Optional[ReferenceSourceData] = None
+        self.source: Optional[ReferenceSourceStream] = None
 
     async def download(self):
         tracker = AccumulatingProgressHandlerWrapper(
@@ -117,23 +119,30 @@ class RemoteReferenceTask(BaseTask):
                 tracker.add,
             )
         except (ClientConnectorError, WebError):
-            await self._set_error("Could not download reference data")
-
-        import_data = await to_thread(load_reference_file, path)
+            return await self._set_error("Could not download reference data")
 
-        if error := check_import_data(import_data, strict=True, verify=True):
-            await self._set_error(dump_string(error))
+        self.source = ReferenceSourceStream(path, strict=True, verify=True)
 
-        self.import_data = ReferenceSourceData(**import_data)
+        try:
+            await self.source.open()
+        except ReferenceImportError as err:
+            await self._set_error(str(err))
 
     async def populate(self):
-        await self.data.references.populate_remote_reference(
-            self.context["ref_id"],
-            self.import_data,
-            self.context["user_id"],
-            self.context["release"],
-            self.create_progress_handler(),
-        )
+        try:
+            await self.data.references.populate_remote_reference(
+                self.context["ref_id"],
+                self.source,
+                self.context["user_id"],
+                self.context["release"],
+                self.create_progress_handler(),
+            )
+        except ReferenceImportError as err:
+            await self._set_error(str(err))
+
+    async def cleanup(self):
+        if self.source:
+            await self.source.aclose()
 
 
 class UpdateRemoteReferenceTask(BaseTask):
@@ -2,8 +2,8 @@ from typing import TYPE_CHECKING, Any
 
 from sqlalchemy.ext.asyncio import AsyncEngine
 
+from virtool.data.loaders import get_loaders
 from virtool.data.transforms import AbstractTransform, apply_transforms
-from virtool.pg.utils import get_row_by_id
 from virtool.types import Document
 from virtool.uploads.models import SQLUpload
 from virtool.users.transforms import AttachUserTransform
@@ -30,9 +30,8 @@ class AttachReferenceTransform(AbstractTransform):
 
         if reference_id:
             return base_processor(
-                await self._mongo.references.find_one(
-                    {"_id": reference_id},
-                    PROJECTION,
+                await get_loaders().mongo(self._mongo.references, PROJECTION).load(
+                    reference_id,
                 ),
             )
 
@@ -44,13 +43,12 @@ class AttachReferenceTransform(AbstractTransform):
     ) -> dict[str, Document | None]:
         reference_ids = {get_safely(d, "reference", "id") for d in documents}
 
-        reference_lookup = {
-            d["_id"]: d
-            async for d in self._mongo.references.find(
-                {"_id": {"$in": list(reference_ids)}},
-                PROJECTION,
-            )
-        }
+        references = await get_loaders().mongo(
+            self._mongo.references,
+            PROJECTION,
+        ).load_many(reference_ids)
+
+        reference_lookup = {d["_id"]: d for d in references if d}
 
         reference_lookup[None] = None
 
@@ -70,10 +68,31 @@ class AttachImportedFromTransform(AbstractTransform):
         except KeyError:
             return None
 
-        row = await get_row_by_id(self._pg, SQLUpload, upload_id)
+        row = await get_loaders().pg(self._pg, SQLUpload).load(upload_id)
 
         return await apply_transforms(row.to_dict(), [AttachUserTransform(self._mongo)])
 
+    async def prepare_many(
+        self,
+        documents: list[Document],
+    ) -> dict[str, Document | None]:
+        upload_ids = {get_safely(d, "imported_from", "id") for d in documents}
+        upload_ids.discard(None)
+
+        rows = await get_loaders().pg(self._pg, SQLUpload).load_many(upload_ids)
+
+        uploads = await apply_transforms(
+            [row.to_dict() for row in rows if row],
+            [AttachUserTransform(self._mongo)],
+        )
+
+        upload_lookup = {upload["id"]: upload for upload in uploads}
+
+        return {
+            d["id"]: upload_lookup.get(get_safely(d, "imported_from", "id"))
+            for d in documents
+        }
+
     async def attach_one(
         self,
         document: Document,
@@ -1,9 +1,21 @@
+import asyncio
 import gzip
 import json
+import re
+from asyncio import to_thread
 from datetime import datetime
+from itertools import islice
 from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+)
 
 from cerberus import Validator
 from pydantic import BaseModel
@@ -13,6 +25,34 @@ import virtool.otus.utils
 
 RIGHTS = ["build", "modify", "modify_otu", "remove"]
 
+REFERENCE_FILE_CHUNK_SIZE = 64 * 1024
+"""The number of decompressed characters read from a reference file at once."""
+
+REFERENCE_FILE_BATCH_SIZE = 100
+"""The number of OTUs read from a reference file before they are passed on."""
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+class ReferenceImportError(Exception):
+    """Raised when a reference file can't be read or contains invalid data.
+
+    ``errors`` is an error message or the list of errors produced by
+    :func:`check_import_data`. Lists of errors are serialized to JSON when the
+    exception is converted to a string.
+    """
+
+    def __init__(self, errors: str | list[dict]):
+        super().__init__(errors)
+        self.errors = errors
+
+    def __str__(self) -> str:
+        if isinstance(self.errors, str):
+            return self.errors
+
+        # Duplicate sequence ids are reported as a set.
+        return json.dumps(self.errors, default=list)
+
 
 class ReferenceSourceData(BaseModel):
     data_type: ReferenceDataType = ReferenceDataType.genome
@@ -21,29 +61,151 @@ class ReferenceSourceData(BaseModel):
     targets: Optional[List[Dict]] = None
 
 
-def check_import_data(
-    data: Dict,
-    strict: bool = True,
-    verify: bool = True,
-) -> List[dict]:
-    errors = detect_duplicates(data["otus"])
+class DuplicateDetector:
+    """Detect duplicate OTU abbreviations, names, and ids as OTUs are added.
 
-    v = Validator(get_import_schema(require_meta=strict), allow_unknown=True)
+    :param strict: also check for duplicate OTU, isolate, and sequence ids
+    """
 
-    v.validate(data)
+    def __init__(self, strict: bool = True):
+        self.strict = strict
+
+        self.duplicate_abbreviations = set()
+        self.duplicate_ids = set()
+        self.duplicate_isolate_ids = {}
+        self.duplicate_names = set()
+        self.duplicate_sequence_ids = set()
+
+        self.seen_abbreviations = set()
+        self.seen_ids = set()
+        self.seen_names = set()
+        self.seen_sequence_ids = set()
+
+    @property
+    def found(self) -> bool:
+        """Whether any duplicates have been found so far."""
+        return bool(
+            self.duplicate_abbreviations
+            or self.duplicate_ids
+            or self.duplicate_isolate_ids
+            or self.duplicate_names
+            or self.duplicate_sequence_ids,
+        )
 
-    if v.errors:
-        errors.append({"id": "file", "issues": v.errors})
+    @property
+    def errors(self) -> List[dict]:
+        errors = []
+
+        if self.duplicate_abbreviations:
+            errors.append(
+                {
+                    "id": "duplicate_abbreviations",
+                    "message": "Duplicate OTU abbreviations found",
+                    "duplicates": list(self.duplicate_abbreviations),
+                },
+            )
 
-    otus = {}
+        if self.duplicate_ids:
+            errors.append(
+                {
+                    "id": "duplicate_ids",
+                    "message": "Duplicate OTU ids found",
+                    "duplicates": list(self.duplicate_ids),
+                },
+            )
+
+        if self.duplicate_isolate_ids:
+            errors.append(
+                {
+                    "id": "duplicate_isolate_ids",
+                    "message": "Duplicate isolate ids found in some OTUs",
+                    "duplicates": self.duplicate_isolate_ids,
+                },
+            )
+
+        if self.duplicate_names:
+            errors.append(
+                {
+                    "id": "duplicate_names",
+                    "message": "Duplicate OTU names found",
+                    "duplicates": list(self.duplicate_names),
+                },
+            )
+
+        if self.duplicate_sequence_ids:
+            errors.append(
+                {
+                    "id": "duplicate_sequence_ids",
+                    "message": "Duplicate sequence ids found",
+                    "duplicates": self.duplicate_sequence_ids,
+                },
+            )
+
+        return errors
+
+    def add(self, joined: dict):
+        detect_duplicate_abbreviation(
+            joined,
+            self.duplicate_abbreviations,
+            self.seen_abbreviations,
+        )
+
+        detect_duplicate_name(joined, self.duplicate_names, self.seen_names)
+
+        if self.strict:
+            detect_duplicate_ids(joined, self.duplicate_ids, self.seen_ids)
+
+            detect_duplicate_isolate_ids(joined, self.duplicate_isolate_ids)
+
+            detect_duplicate_sequence_ids(
+                joined,
+                self.duplicate_sequence_ids,
+                self.seen_sequence_ids,
+            )
+
+
+class ImportDataChecker:
+    """Check reference import data one OTU at a time.
+
+    Add every OTU with :meth:`add` and then pass the top-level fields of the file to
+    :meth:`check_file`. The resulting :attr:`errors` are the same as those returned by
+    :func:`check_import_data` for the complete data.
+
+    :param strict: require the reference metadata fields to be present
+    :param verify: verify each OTU in addition to validating it
+    """
+
+    def __init__(self, strict: bool = True, verify: bool = True):
+        self.strict = strict
+        self.verify = verify
+
+        self.duplicates = DuplicateDetector()
+        self.file_issues: dict | None = None
+        self.otu_issues = {}
+
+    @property
+    def errors(self) -> List[dict]:
+        errors = self.duplicates.errors
+
+        if self.file_issues:
+            errors.append({"id": "file", "issues": self.file_issues})
+
+        return errors
+
+    @property
+    def failed(self) -> bool:
+        """Whether any errors have been found so far."""
+        return self.duplicates.found or bool(self.file_issues)
+
+    def add(self, otu: dict):
+        self.duplicates.add(otu)
 
-    for otu in data["otus"]:
         verification = None
 
-        if verify:
+        if self.verify:
             verification = virtool.otus.utils.verify(otu)
 
-        validation = validate_otu(otu, strict)
+        validation = validate_otu(otu, self.strict)
 
         issues = {}
 
@@ -54,9 +216,316 @@ def check_import_data(
             issues["validation"] = validation
 
         if issues:
-            otus[otu["_id"]] = issues
+            self.otu_issues[otu["_id"]] = issues
+
+    def check_file(self, data: dict):
+        """Validate the top-level fields of the reference file.
+
+        :param data: the reference data with or without its OTUs
+        """
+        v = Validator(get_import_schema(require_meta=self.strict), allow_unknown=True)
+
+        v.validate(data)
+
+        self.file_issues = v.errors
+
+
+class ReferenceFileReader:
+    """Incrementally parse a gzip-compressed reference JSON file.
+
+    Iterating yields the OTUs in the ``otus`` array one at a time, so only a single OTU
+    has to be held in memory. Other top-level fields are collected in :attr:`meta` as
+    they are parsed. Once all OTUs have been read, ``meta["otus"]`` is an empty list.
+
+    Parsing errors are raised as :class:`ReferenceImportError`.
+
+    :param path: the path to the reference file
+    """
+
+    def __init__(self, path: Path):
+        check_reference_file_path(path)
+
+        self.meta = {}
+
+        self._buffer = ""
+        self._decoder = json.JSONDecoder()
+        self._eof = False
+        self._handle = open(path, "rb")
+        self._index = 0
+        self._offset = 0
+        self._otus = self._parse()
+        self._text = gzip.open(self._handle, "rt")
+
+    def __iter__(self) -> Iterator[dict]:
+        return self._otus
+
+    @property
+    def position(self) -> int:
+        """The number of compressed bytes read from the file so far."""
+        return self._handle.tell()
+
+    def close(self):
+        self._text.close()
+        self._handle.close()
+
+    def _decode(self):
+        if self._peek() is None:
+            raise self._error("Unexpected end of file")
+
+        size = REFERENCE_FILE_CHUNK_SIZE
+
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._index)
+            except json.JSONDecodeError as err:
+                # The value may continue past the end of the buffer. Read more of the
+                # file, doubling the read size so large values aren't re-parsed many
+                # times.
+                if self._read(size):
+                    size *= 2
+                    continue
+
+                raise self._error(err.msg, err.pos)
+
+            # A number at the end of the buffer may have more digits in the next chunk.
+            if end == len(self._buffer) and self._read(size):
+                continue
+
+            self._index = end
+
+            return value
+
+    def _error(self, message: str, index: int | None = None) -> ReferenceImportError:
+        if index is None:
+            index = self._index
+
+        return ReferenceImportError(f"{message}: char {self._offset + index}")
+
+    def _expect(self, characters: str) -> str:
+        character = self._peek()
+
+        if character is None or character not in characters:
+            raise self._error(
+                "Expecting " + " or ".join(repr(c) for c in characters),
+            )
+
+        self._index += 1
+
+        return character
+
+    def _parse(self) -> Iterator[dict]:
+        self._expect("{")
+
+        if self._peek() == "}":
+            self._index += 1
+        else:
+            while True:
+                key = self._decode()
+
+                if not isinstance(key, str):
+                    raise self._error("Expecting property name")
+
+                self._expect(":")
+
+                if key == "otus" and self._peek() == "[":
+                    self._index += 1
+                    yield from self._parse_otus()
+                    self.meta["otus"] = []
+                else:
+                    self.meta[key] = self._decode()
+
+                if self._expect(",}") == "}":
+                    break
+
+        if self._peek() is not None:
+            raise self._error("Extra data")
 
-    return errors
+    def _parse_otus(self) -> Iterator[dict]:
+        if self._peek() == "]":
+            self._index += 1
+            return
+
+        while True:
+            yield self._decode()
+
+            if self._expect(",]") == "]":
+                return
+
+    def _peek(self) -> str | None:
+        """Skip whitespace and return the next character without consuming it.
+
+        Returns ``None`` at the end of the file.
+        """
+        while True:
+            self._index = WHITESPACE.match(self._buffer, self._index).end()
+
+            if self._index < len(self._buffer):
+                return self._buffer[self._index]
+
+            if not self._read(REFERENCE_FILE_CHUNK_SIZE):
+                return None
+
+    def _read(self, size: int) -> bool:
+        """Read more of the file into the buffer, discarding what has been parsed.
+
+        Returns ``False`` if the end of the file has been reached.
+        """
+        if self._eof:
+            return False
+
+        try:
+            chunk = self._text.read(size)
+        except gzip.BadGzipFile:
+            raise ReferenceImportError("Not a gzipped file")
+        except EOFError as err:
+            raise ReferenceImportError(str(err))
+
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._offset += self._index
+        self._buffer = self._buffer[self._index :] + chunk
+        self._index = 0
+
+        return True
+
+
+class ReferenceSourceStream:
+    """Read, check, and batch the OTUs in a reference file without loading the whole
+    file into memory.
+
+    Iterating yields lists of checked OTUs. The file is read in a thread and the next
+    batch is read while the current one is being consumed.
+
+    The whole file is always checked. If it can't be parsed or the checks fail,
+    :class:`ReferenceImportError` is raised at the end of iteration with every error
+    found in the file. No batch containing or following a failed OTU is yielded, but
+    earlier batches may have been.
+
+    :param path: the path to the reference file
+    :param strict: passed to :class:`ImportDataChecker`
+    :param verify: passed to :class:`ImportDataChecker`
+    :param batch_size: the number of OTUs in each batch
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        strict: bool = True,
+        verify: bool = True,
+        batch_size: int = REFERENCE_FILE_BATCH_SIZE,
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.checker = ImportDataChecker(strict, verify)
+
+        self.position = 0
+        """The number of compressed bytes read up to the end of the last batch."""
+
+        self.size = 0
+        """The size of the compressed reference file."""
+
+        self._batches: AsyncGenerator[list[dict], None] | None = None
+        self._first: tuple[list[dict], int] | None = None
+        self._reader: ReferenceFileReader | None = None
+
+    def __aiter__(self) -> AsyncIterator[list[dict]]:
+        if self._batches is None:
+            self._batches = self._iterate()
+
+        return self._batches
+
+    @property
+    def data(self) -> ReferenceSourceData:
+        """The reference metadata from the file.
+
+        Only available once all OTUs have been read. ``otus`` is always empty.
+        """
+        return ReferenceSourceData(**self._reader.meta)
+
+    async def open(self):
+        """Open the file and read the first batch of OTUs.
+
+        This surfaces errors like an invalid path or a file that isn't gzipped before
+        any OTUs are consumed.
+        """
+        if self._reader is None:
+            self._reader = await to_thread(ReferenceFileReader, self.path)
+            self.size = (await to_thread(self.path.stat)).st_size
+
+            try:
+                self._first = await to_thread(self._read_batch)
+            except BaseException:
+                self.close()
+                raise
+
+    async def aclose(self):
+        """Stop reading and close the file.
+
+        Call this when iteration may not have run to completion.
+        """
+        if self._batches:
+            await self._batches.aclose()
+
+        self.close()
+
+    def close(self):
+        if self._reader:
+            self._reader.close()
+
+    async def _iterate(self) -> AsyncGenerator[list[dict], None]:
+        try:
+            await self.open()
+
+            batch, position = self._first
+            self._first = None
+
+            while batch:
+                pending = asyncio.create_task(to_thread(self._read_batch))
+
+                try:
+                    if not self.checker.failed:
+                        self.position = position
+                        yield batch
+                except BaseException:
+                    # Don't close the file while it is being read in the thread.
+                    await asyncio.wait([pending])
+                    raise
+
+                batch, position = await pending
+
+            self.position = position
+
+            self.checker.check_file(self._reader.meta)
+
+            if self.checker.failed:
+                raise ReferenceImportError(self.checker.errors)
+        finally:
+            self.close()
+
+    def _read_batch(self) -> tuple[list[dict], int]:
+        batch = list(islice(self._reader, self.batch_size))
+
+        for otu in batch:
+            self.checker.add(otu)
+
+        return batch, self._reader.position
+
+
+def check_import_data(
+    data: Dict,
+    strict: bool = True,
+    verify: bool = True,
+) -> List[dict]:
+    checker = ImportDataChecker(strict, verify)
+
+    for otu in data["otus"]:
+        checker.add(otu)
+
+    checker.check_file(data)
+
+    return checker.errors
 
 
 def check_will_change(old: dict, imported: dict) -> bool:
@@ -171,89 +640,12 @@ def detect_duplicate_name(joined: dict, duplicates: Set[str], seen: Set[str]):
 
 
 def detect_duplicates(otus: List[dict], strict: bool = True) -> List[dict]:
-    duplicate_abbreviations = set()
-    duplicate_ids = set()
-    duplicate_isolate_ids = {}
-    duplicate_names = set()
-    duplicate_sequence_ids = set()
-
-    seen_abbreviations = set()
-    seen_ids = set()
-    seen_names = set()
-    seen_sequence_ids = set()
+    detector = DuplicateDetector(strict)
 
     for joined in otus:
-        detect_duplicate_abbreviation(
-            joined,
-            duplicate_abbreviations,
-            seen_abbreviations,
-        )
+        detector.add(joined)
 
-        detect_duplicate_name(joined, duplicate_names, seen_names)
-
-        if strict:
-            detect_duplicate_ids(
-                joined,
-                duplicate_ids,
-                seen_ids,
-            )
-
-            detect_duplicate_isolate_ids(joined, duplicate_isolate_ids)
-
-            detect_duplicate_sequence_ids(
-                joined,
-                duplicate_sequence_ids,
-                seen_sequence_ids,
-            )
-
-    errors = []
-
-    if duplicate_abbreviations:
-        errors.append(
-            {
-                "id": "duplicate_abbreviations",
-                "message": "Duplicate OTU abbreviations found",
-                "duplicates": list(duplicate_abbreviations),
-            },
-        )
-
-    if duplicate_ids:
-        errors.append(
-            {
-                "id": "duplicate_ids",
-                "message": "Duplicate OTU ids found",
-                "duplicates": list(duplicate_ids),
-            },
-        )
-
-    if duplicate_isolate_ids:
-        errors.append(
-            {
-                "id": "duplicate_isolate_ids",
-                "message": "Duplicate isolate ids found in some OTUs",
-                "duplicates": duplicate_isolate_ids,
-            },
-        )
-
-    if duplicate_names:
-        errors.append(
-            {
-                "id": "duplicate_names",
-                "message": "Duplicate OTU names found",
-                "duplicates": list(duplicate_names),
-            },
-        )
-
-    if duplicate_sequence_ids:
-        errors.append(
-            {
-                "id": "duplicate_sequence_ids",
-                "message": "Duplicate sequence ids found",
-                "duplicates": duplicate_sequence_ids,
-            },
-        )
-
-    return errors
+    return detector.errors
 
 
 def get_import_schema(require_meta: bool = True) -> dict:
@@ -303,6 +695,11 @@ def get_sequence_schema(require_id: bool) -> dict:
     }
 
 
+def check_reference_file_path(path: Path):
+    if not path.suffixes == [".json", ".gz"]:
+        raise ValueError("Reference file must be a gzip-compressed JSON file")
+
+
 def load_reference_file(path: Path) -> dict:
     """Load a list of merged otus documents from a file associated with a Virtool
     reference file.
@@ -310,8 +707,7 @@ def load_reference_file(path: Path) -> dict:
     :param path: the path to the otus.json.gz file
     :return: the otus data to import
     """
-    if not path.suffixes == [".json", ".gz"]:
-        raise ValueError("Reference file must be a gzip-compressed JSON file")
+    check_reference_file_path(path)
 
     with open(path, "rb") as handle, gzip.open(handle, "rt") as gzip_file:
         return json.load(gzip_file)
@@ -49,6 +49,9 @@ async def shutdown_redis(app: Application):
     except KeyError:
         ...
 
+    if app.get("event_stream"):
+        await app["event_stream"].close()
+
 
 async def shutdown_scheduler(app: Application):
     """Attempt to the close the app's `aiojobs` scheduler.
@@ -16,8 +16,9 @@ from virtool.authorization.client import (
 )
 from virtool.authorization.openfga import connect_openfga
 from virtool.config import get_config_from_app
-from virtool.data.events import EventPublisher
+from virtool.data.events import EventOverflowPolicy, EventPublisher, configure_events
 from virtool.data.layer import create_data_layer
+from virtool.data.streams import EventStream, create_consumer_name
 from virtool.data.utils import get_data_from_app
 from virtool.migration.pg import check_data_revision_version
 from virtool.mongo.connect import connect_mongo
@@ -110,6 +111,7 @@ async def startup_data(app: App):
         get_config_from_app(app),
         get_http_session_from_app(app),
         app["redis"],
+        app.get("run_in_process"),
     )
 
 
@@ -148,8 +150,33 @@ async def startup_databases(app: App):
 
 
 async def startup_events(app: App):
-    """Create and run the event publisher."""
-    app["events"] = EventPublisher(app["redis"])
+    """Configure the event queue and create and run the event publisher.
+
+    Events are added to a Redis stream instead of being published using pub/sub if
+    ``use_event_stream`` is set. Consumer groups abandoned by stopped processes are
+    pruned from the stream.
+    """
+    config = get_config_from_app(app)
+
+    stream = None
+
+    if config.use_event_stream:
+        stream = EventStream(
+            config.redis_connection_string,
+            config.event_stream_max_length,
+        )
+
+        await stream.prune_groups()
+
+    configure_events(
+        config.event_queue_size,
+        EventOverflowPolicy(config.event_overflow_policy.lower()),
+        config.event_block_timeout,
+        stream,
+    )
+
+    app["event_stream"] = stream
+    app["events"] = EventPublisher(app["redis"], stream=stream)
     await get_scheduler_from_app(app).spawn(app["events"].run())
 
 
@@ -238,15 +265,63 @@ async def startup_version(app: App):
     app["version"] = version
 
 
+async def startup_key_cache(app: App):
+    """Start invalidating the verified API key cache as key and user events are
+    received from other instances of the application.
+
+    :param app: the application object
+    """
+    consumer = create_consumer_name()
+
+    await get_scheduler_from_app(app).spawn(
+        get_data_from_app(app).account.key_cache.run(
+            app["redis"],
+            app.get("event_stream"),
+            f"keys:{consumer}",
+            consumer,
+        ),
+    )
+
+
+async def startup_user_client_cache(app: App):
+    """Start invalidating the authenticated user cache as user and group events are
+    received from other instances of the application.
+
+    :param app: the application object
+    """
+    consumer = create_consumer_name()
+
+    await get_scheduler_from_app(app).spawn(
+        get_data_from_app(app).users.client_cache.run(
+            app["redis"],
+            app.get("event_stream"),
+            f"users:{consumer}",
+            consumer,
+        ),
+    )
+
+
 async def startup_ws(app: App):
-    """Start the websocket server."""
+    """Start the websocket server.
+
+    When using an event stream, each server process reads events in its own consumer
+    group, so every process receives every event.
+    """
     logger.info("starting websocket server")
 
-    ws = WSServer(app["redis"])
+    consumer = create_consumer_name()
+
+    ws = WSServer(
+        app["redis"],
+        stream=app.get("event_stream"),
+        group=f"ws:{consumer}",
+        consumer=consumer,
+    )
 
     scheduler = get_scheduler_from_app(app)
 
     await scheduler.spawn(ws.run())
     await scheduler.spawn(ws.periodically_close_expired_websocket_connections())
+    await scheduler.spawn(ws.periodically_log_metrics())
 
     app["ws"] = ws
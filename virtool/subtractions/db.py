@@ -8,9 +8,9 @@ from motor.motor_asyncio import AsyncIOMotorClientSession
 from sqlalchemy.ext.asyncio import AsyncEngine
 
 from virtool.config.cls import Config
+from virtool.data.loaders import get_loaders
 from virtool.data.transforms import AbstractTransform
 from virtool.mongo.core import Mongo
-from virtool.mongo.utils import get_one_field
 from virtool.subtractions.utils import get_subtraction_files, join_subtraction_path
 from virtool.types import Document
 from virtool.utils import base_processor
@@ -38,27 +38,32 @@ class AttachSubtractionsTransform(AbstractTransform):
         return {**document, "subtractions": prepared}
 
     async def prepare_one(self, document: Document) -> Any:
+        subtractions = await get_loaders().mongo(
+            self._mongo.subtraction,
+            ["_id", "name"],
+        ).load_many(document["subtractions"])
+
         return [
             {
                 "id": subtraction_id,
-                "name": await get_one_field(
-                    self._mongo.subtraction,
-                    "name",
-                    subtraction_id,
-                ),
+                "name": subtraction["name"] if subtraction else None,
             }
-            for subtraction_id in document["subtractions"]
+            for subtraction_id, subtraction in zip(
+                document["subtractions"],
+                subtractions,
+            )
         ]
 
     async def prepare_many(self, documents: list[Document]) -> dict[str, list[dict]]:
-        subtraction_ids = {s for d in documents for s in d["subtractions"]}
+        subtraction_ids = list({s for d in documents for s in d["subtractions"]})
+
+        subtractions = await get_loaders().mongo(
+            self._mongo.subtraction,
+            ["_id", "name"],
+        ).load_many(subtraction_ids)
 
         subtraction_lookup = {
-            d["_id"]: {"id": d["_id"], "name": d["name"]}
-            async for d in self._mongo.subtraction.find(
-                {"_id": {"$in": list(subtraction_ids)}},
-                ["_id", "name"],
-            )
+            d["_id"]: {"id": d["_id"], "name": d["name"]} for d in subtractions if d
         }
 
         return {
@@ -7,8 +7,9 @@ from aiojobs.aiohttp import get_scheduler_from_app
 from virtool_core.redis import Redis
 
 from virtool.config import get_config_from_app
+from virtool.history.tasks import BuildHistorySnapshotsTask
 from virtool.hmm.tasks import HMMRefreshTask
-from virtool.jobs.tasks import TimeoutJobsTask
+from virtool.jobs.tasks import ReconcileJobCountsTask, TimeoutJobsTask
 from virtool.ml.tasks import SyncMLModelsTask
 from virtool.pg.utils import connect_pg
 from virtool.references.tasks import CleanReferencesTask, RefreshReferenceReleasesTask
@@ -51,8 +52,10 @@ async def startup_datalayer_for_spawner(app: Application):
 async def startup_task_spawner(app: Application):
     """Starts the task spawner."""
     tasks = [
+        (BuildHistorySnapshotsTask, 86400),
         (CleanReferencesTask, 3600),
         (HMMRefreshTask, 600),
+        (ReconcileJobCountsTask, 900),
         (RefreshReferenceReleasesTask, 600),
         (SyncMLModelsTask, 600),
         (TimeoutJobsTask, 3600),
@@ -29,6 +29,15 @@ Keys must be strings.
 """
 
 
+ProcessRunner: TypeAlias = Callable[..., Awaitable[Any]]
+"""
+An asynchronous function that calls a function with the passed arguments in a process
+pool and returns the result.
+
+The function, arguments, and result must be picklable. The application's process pool
+runner is available as ``app["run_in_process"]``.
+"""
+
 Projection: TypeAlias = dict[str, bool] | Sequence[str]
 """
 A data structure that can be used to specify a MongoDB projection and is compatible with
@@ -4,9 +4,9 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
 import virtool.utils
+from virtool.data.loaders import get_loaders
 from virtool.data.transforms import AbstractTransform
 from virtool.pg.base import Base
-from virtool.pg.utils import get_row_by_id
 from virtool.types import Document
 from virtool.uploads.models import SQLUpload
 
@@ -26,19 +26,18 @@ class AttachUploadTransform(AbstractTransform):
         except KeyError:
             return None
 
-        return await get_row_by_id(self._pg, SQLUpload, upload_id)
+        return await get_loaders().pg(self._pg, SQLUpload).load(upload_id)
 
     async def prepare_many(self, documents: List[Document]) -> Dict[int, Dict]:
-        async with AsyncSession(self._pg) as session:
-            result = await session.execute(
-                select(SQLUpload).where(
-                    SQLUpload.id.in_(
-                        list({document["upload"] for document in documents}),
-                    ),
-                ),
-            )
-
-            uploads = {upload.id: dict(upload) for upload in result.scalars()}
+        upload_ids = list({document["upload"] for document in documents})
+
+        loader = get_loaders().pg(self._pg, SQLUpload)
+
+        uploads = {
+            upload.id: dict(upload)
+            for upload in await loader.load_many(upload_ids)
+            if upload
+        }
 
         return {
             document["_id"]: uploads.get(document["upload"]) for document in documents
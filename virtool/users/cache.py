@@ -0,0 +1,171 @@
+"""A cache of the user state needed to authenticate requests.
+
+Resolving a user takes a Mongo query, an OpenFGA read and several Postgres queries.
+Session-authenticated requests only need a few fields from the result, so they are
+cached in-process for a short time and invalidated by user and group events.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from virtool_core.models.roles import AdministratorRole
+from virtool_core.redis import Redis
+
+from virtool.data.events import Event, listen_for_events
+
+if TYPE_CHECKING:
+    from virtool.data.streams import EventStream
+    from virtool.users.data import UsersData
+
+USER_CLIENT_CACHE_SIZE = 5000
+"""The maximum number of users whose client state is cached."""
+
+USER_CLIENT_CACHE_TTL = 30
+"""The number of seconds a user's client state is cached for."""
+
+
+@dataclass(frozen=True)
+class UserClientState:
+    """The user state needed to create a :class:`~virtool.api.client.UserClient`."""
+
+    active: bool
+    administrator_role: AdministratorRole | None
+    force_reset: bool
+    groups: list[int | str]
+    permissions: dict[str, bool]
+
+
+class UserClientCache:
+    """A size-bounded cache of :class:`UserClientState` keyed by user ID.
+
+    Entries expire after ``ttl`` seconds. The least recently used entry is evicted when
+    the cache is full. The data layer invalidates entries when it changes a user or
+    group. Changes made by other instances of the application are seen once their
+    events are received in :meth:`run`.
+    """
+
+    def __init__(
+        self,
+        users: "UsersData",
+        ttl: float = USER_CLIENT_CACHE_TTL,
+        max_size: int = USER_CLIENT_CACHE_SIZE,
+    ):
+        self._users = users
+        self._ttl = ttl
+        self._max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, UserClientState]] = OrderedDict()
+
+        #: Lookups in progress, keyed by user ID, so concurrent misses share one.
+        self._loading: dict[str, asyncio.Task] = {}
+
+        #: Incremented on every invalidation so lookups that started before one are
+        #: not cached.
+        self._generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, user_id: str) -> UserClientState:
+        """Get the client state for a user.
+
+        :param user_id: the ID of the user
+        :return: the client state
+        :raises ResourceNotFoundError: if the user does not exist
+        """
+        entry = self._entries.get(user_id)
+
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+
+        task = self._loading.get(user_id)
+
+        if task is None:
+            task = asyncio.create_task(self._load(user_id))
+            self._loading[user_id] = task
+            task.add_done_callback(lambda _: self._loading.pop(user_id, None))
+
+        return await asyncio.shield(task)
+
+    def invalidate(self, user_id: str):
+        """Remove a user from the cache.
+
+        :param user_id: the ID of the user
+        """
+        self._generation += 1
+        self._entries.pop(user_id, None)
+
+    def invalidate_group(self, group_id: int | str):
+        """Remove all members of a group from the cache.
+
+        :param group_id: the ID of the group
+        """
+        self._generation += 1
+
+        for user_id in [
+            user_id
+            for user_id, (_, state) in self._entries.items()
+            if group_id in state.groups
+        ]:
+            del self._entries[user_id]
+
+    def handle_event(self, event: Event):
+        """Invalidate cached users affected by an event.
+
+        :param event: the event
+        """
+        if event.domain == "users":
+            self.invalidate(event.data.id)
+        elif event.domain == "groups":
+            self.invalidate_group(event.data.id)
+
+            for user in getattr(event.data, "users", []):
+                self.invalidate(user.id)
+
+    async def run(
+        self,
+        redis: Redis,
+        stream: "EventStream | None" = None,
+        group: str | None = None,
+        consumer: str | None = None,
+    ):
+        """Invalidate cached users as events are received.
+
+        :param redis: the Redis client
+        :param stream: the event stream to read from
+        :param group: the consumer group to read as
+        :param consumer: the name of the consumer in the group
+        """
+        try:
+            async for event in listen_for_events(redis, stream, group, consumer):
+                self.handle_event(event)
+        except asyncio.CancelledError:
+            pass
+
+    async def _load(self, user_id: str) -> UserClientState:
+        generation = self._generation
+
+        user = await self._users.get(user_id)
+
+        state = UserClientState(
+            active=user.active,
+            administrator_role=user.administrator_role,
+            force_reset=user.force_reset,
+            groups=[group.id for group in user.groups],
+            permissions=user.permissions.dict(),
+        )
+
+        if generation == self._generation:
+            self._entries[user_id] = (time.monotonic() + self._ttl, state)
+            self._entries.move_to_end(user_id)
+
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+        return state
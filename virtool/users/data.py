@@ -26,6 +26,7 @@ from virtool.data.transforms import apply_transforms
 from virtool.groups.transforms import AttachGroupsTransform, AttachPrimaryGroupTransform
 from virtool.mongo.core import Mongo
 from virtool.mongo.utils import get_one_field, id_exists
+from virtool.users.cache import UserClientCache, UserClientState
 from virtool.users.db import (
     B2CUserAttributes,
     compose_groups_update,
@@ -72,6 +73,9 @@ class UsersData(DataLayerDomain):
         self._mongo = mongo
         self._pg = pg
 
+        #: A cache of the user state used to authenticate requests.
+        self.client_cache = UserClientCache(self)
+
     async def find(
         self,
         page: int,
@@ -214,6 +218,16 @@ class UsersData(DataLayerDomain):
             administrator_role=role,
         )
 
+    async def get_client_state(self, user_id: str) -> UserClientState:
+        """Get the state needed to authenticate a request as a user.
+
+        The state is cached for a short time.
+
+        :param user_id: the user's ID
+        :return: the user's client state
+        """
+        return await self.client_cache.get(user_id)
+
     async def get_by_handle(self, handle: str) -> User:
         """Get a user by their ``handle``.
 
@@ -359,6 +373,7 @@ class UsersData(DataLayerDomain):
 
         return user
 
+    @emits(Operation.UPDATE)
     async def set_administrator_role(
         self,
         user_id: str,
@@ -392,6 +407,8 @@ class UsersData(DataLayerDomain):
                 AdministratorRoleAssignment(user_id, AdministratorRole(role)),
             )
 
+        self.client_cache.invalidate(user_id)
+
         return await self.get(user_id)
 
     @emits(Operation.UPDATE)
@@ -533,6 +550,8 @@ class UsersData(DataLayerDomain):
                     user_id=user_id,
                 )
 
+        self.client_cache.invalidate(user_id)
+
         return await self.get(user_id)
 
     async def check_users_exist(self) -> bool:
@@ -8,6 +8,7 @@ from typing import TYPE_CHECKING, Any
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
 
+from virtool.data.loaders import get_loaders
 from virtool.data.topg import compose_legacy_id_expression
 from virtool.data.transforms import AbstractTransform
 from virtool.groups.pg import SQLGroup, merge_group_permissions
@@ -134,9 +135,12 @@ class AttachUserTransform(AbstractTransform):
 
         user_id = get_safely(document, "user", "id")
 
-        if user_data := base_processor(
-            await self._mongo.users.find_one(user_id, ATTACH_PROJECTION),
-        ):
+        if user_id is None:
+            return None
+
+        loader = get_loaders().mongo(self._mongo.users, ATTACH_PROJECTION)
+
+        if user_data := base_processor(await loader.load(user_id)):
             return user_data
 
         raise KeyError(f"Document contains non-existent user: {user_id}.")
@@ -145,13 +149,12 @@ class AttachUserTransform(AbstractTransform):
         user_ids = {get_safely(d, "user", "id") for d in documents}
         user_ids.discard(None)
 
-        user_map = {
-            document["_id"]: base_processor(document)
-            async for document in self._mongo.users.find(
-                {"_id": {"$in": list(user_ids)}},
-                ATTACH_PROJECTION,
-            )
-        }
+        users = await get_loaders().mongo(
+            self._mongo.users,
+            ATTACH_PROJECTION,
+        ).load_many(user_ids)
+
+        user_map = {user["_id"]: base_processor(user) for user in users if user}
 
         if len(user_map) != len(user_ids):
             non_existent_user_ids = user_ids - set(user_map.keys())
@@ -1,6 +1,5 @@
 import asyncio
 import datetime
-import gzip
 import hashlib
 import os
 import secrets
@@ -67,16 +66,6 @@ def coerce_list(obj: Any) -> list:
     return [obj] if not isinstance(obj, list) else obj
 
 
-def compress_json_with_gzip(json_bytes: bytes, target: Path):
-    """Compress the JSON string to a gzipped file at `target`."""
-    # gzip will fail to open the file if it's parent directory doesn't exist.
-    target = Path(target)
-    target.parent.mkdir(exist_ok=True, parents=True)
-
-    with gzip.open(target, "wb") as f:
-        f.write(json_bytes)
-
-
 def ensure_data_dir(data_path: Path):
     """Ensure the application data structure is correct. Fix it if it is broken.
 
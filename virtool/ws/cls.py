@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from virtool.types import Document
 
@@ -13,6 +13,10 @@ class WSMessage:
     operation: str
     interface: str
 
+    #: The event stream ID of the event the message describes. Clients can pass the
+    #: last ID they received when reconnecting to catch up on missed events.
+    event_id: str | None = field(default=None, kw_only=True)
+
 
 @dataclass
 class WSInsertMessage(WSMessage):
@@ -1,21 +1,189 @@
+import asyncio
+from collections import OrderedDict
+from enum import Enum
+from itertools import count
+from typing import Hashable
+
 from aiohttp.web_ws import WebSocketResponse
+from structlog import get_logger
 
 from virtool.api.custom_json import dump_string
 from virtool.ws.cls import WSMessage
 
+logger = get_logger("ws")
+
+WS_SEND_QUEUE_SIZE = 500
+"""The default maximum number of messages waiting to be sent to a connection."""
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What to do with a new message when a connection's send queue is full.
+
+    ``DROP`` drops the new message.
+
+    ``COALESCE`` replaces a waiting message about the same resource with the new
+    message, and drops the new message if there isn't one.
+
+    ``DISCONNECT`` closes the connection.
+    """
+
+    DROP = "drop"
+    COALESCE = "coalesce"
+    DISCONNECT = "disconnect"
+
 
 class WSConnection:
     """
     Wraps a :class:``WebSocketResponse``.
+
+    Messages are put in a bounded send queue with :meth:`enqueue` and sent by a writer
+    task started with :meth:`start`, so a slow client does not hold up messages to other
+    clients.
     """
 
-    def __init__(self, ws: WebSocketResponse, session):
+    def __init__(
+        self,
+        ws: WebSocketResponse,
+        session,
+        max_queue_size: int = WS_SEND_QUEUE_SIZE,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE,
+    ):
         self._ws = ws
         self.ping = self._ws.ping
         self.user_id = session.user_id
         self.groups = session.groups
         self.permissions = session.permissions
         self.session_id = session.session_id
+        self.administrator_role = getattr(session, "administrator_role", None)
+
+        #: The resource IDs the connection is subscribed to, keyed by domain. A
+        #: value of ``None`` means all resources in the domain. Connections that have
+        #: never subscribed receive events from all domains.
+        self.subscriptions: dict[str, set[int | str] | None] | None = None
+
+        #: The number of messages that have been dropped because the queue was full.
+        self.dropped = 0
+
+        self._keys = count()
+        self._max_queue_size = max_queue_size
+        self._policy = policy
+        self._queue: OrderedDict[Hashable, str] = OrderedDict()
+        self._ready = asyncio.Event()
+        self._closing: asyncio.Task | None = None
+        self._writer: asyncio.Task | None = None
+
+    @property
+    def queue_depth(self) -> int:
+        """The number of messages waiting to be sent."""
+        return len(self._queue)
+
+    @property
+    def has_subscribed(self) -> bool:
+        """Whether the client has used the subscription protocol."""
+        return self.subscriptions is not None
+
+    def is_subscribed(self, domain: str, resource_id: int | str) -> bool:
+        """
+        Check if the connection should receive events about a resource.
+
+        :param domain: the domain of the resource
+        :param resource_id: the ID of the resource
+        :return: whether the connection is subscribed to the resource
+        """
+        if self.subscriptions is None:
+            return True
+
+        if domain not in self.subscriptions:
+            return False
+
+        ids = self.subscriptions[domain]
+
+        return ids is None or resource_id in ids
+
+    def subscribe(self, domain: str, ids: list[int | str] | None = None):
+        """
+        Subscribe to events about resources in a domain.
+
+        :param domain: the domain to subscribe to
+        :param ids: the resource IDs to subscribe to or ``None`` for all resources
+        """
+        if self.subscriptions is None:
+            self.subscriptions = {}
+
+        if ids is None:
+            self.subscriptions[domain] = None
+        elif domain not in self.subscriptions:
+            self.subscriptions[domain] = set(ids)
+        elif self.subscriptions[domain] is not None:
+            self.subscriptions[domain].update(ids)
+
+    def unsubscribe(self, domain: str, ids: list[int | str] | None = None):
+        """
+        Unsubscribe from events about resources in a domain.
+
+        :param domain: the domain to unsubscribe from
+        :param ids: the resource IDs to unsubscribe from or ``None`` for all resources
+        """
+        if self.subscriptions is None:
+            self.subscriptions = {}
+
+        if ids is None:
+            self.subscriptions.pop(domain, None)
+            return
+
+        subscribed_ids = self.subscriptions.get(domain)
+
+        if subscribed_ids:
+            subscribed_ids.difference_update(ids)
+
+            if not subscribed_ids:
+                del self.subscriptions[domain]
+
+    def start(self):
+        """Start the task that sends queued messages to the client."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write())
+
+    def stop(self):
+        """Stop sending queued messages to the client."""
+        if self._writer:
+            self._writer.cancel()
+            self._writer = None
+
+    def enqueue(self, data: str, key: Hashable | None = None):
+        """
+        Queue a serialized message to be sent to the client.
+
+        :param data: the serialized message
+        :param key: identifies the resource the message is about for coalescing
+        """
+        if self._closing:
+            return
+
+        if key is None or self._policy != SlowConsumerPolicy.COALESCE:
+            key = ("_unique", next(self._keys))
+
+        if len(self._queue) >= self._max_queue_size:
+            if self._policy == SlowConsumerPolicy.DISCONNECT:
+                logger.warning(
+                    "closing slow websocket connection",
+                    user_id=self.user_id,
+                )
+
+                self.dropped += 1
+                self._disconnect(1008)
+
+                return
+
+            if self._policy == SlowConsumerPolicy.DROP or key not in self._queue:
+                self.dropped += 1
+                return
+
+        # A coalesced message takes the place of the one it replaces at the end of the
+        # queue, so it is never sent ahead of messages that were queued before it.
+        self._queue.pop(key, None)
+        self._queue[key] = data
+        self._ready.set()
 
     async def send(self, message: WSMessage):
         """
@@ -23,8 +191,16 @@ class WSConnection:
 
         :param message: the message to send
         """
+        await self.send_str(dump_string(message))
+
+    async def send_str(self, data: str):
+        """
+        Sends an already serialized message to the connected client.
+
+        :param data: the serialized message
+        """
         try:
-            await self._ws.send_json(message, dumps=dump_string)
+            await self._ws.send_str(data)
         except ConnectionResetError as err:
             if "Cannot write to closing transport" not in str(err):
                 raise
@@ -37,3 +213,36 @@ class WSConnection:
         :param code: closure code to send to the client
         """
         await self._ws.close(code=code)
+
+    def _disconnect(self, code: int):
+        """Stop sending queued messages and close the connection in the background.
+
+        The connection is removed from the websocket server once it has closed.
+
+        :param code: closure code to send to the client
+        """
+        self.stop()
+        self._queue.clear()
+
+        self._closing = asyncio.create_task(self.close(code))
+
+    async def _write(self):
+        while True:
+            await self._ready.wait()
+
+            while self._queue:
+                _, data = self._queue.popitem(last=False)
+
+                try:
+                    await self.send_str(data)
+                except Exception:
+                    logger.exception(
+                        "could not send websocket message. closing connection.",
+                        user_id=self.user_id,
+                    )
+
+                    self._disconnect(1011)
+
+                    return
+
+            self._ready.clear()
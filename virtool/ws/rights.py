@@ -0,0 +1,96 @@
+"""Checks that decide whether a websocket connection may receive an event about a
+resource.
+
+Domains without a check are delivered to every subscribed connection.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable
+
+from virtool_core.models.roles import AdministratorRole
+
+if TYPE_CHECKING:
+    from virtool.ws.connection import WSConnection
+
+
+def check_sample_read(connection: "WSConnection", data: Any) -> bool:
+    """Check if a connection can read a sample.
+
+    This follows the same rules as the sample API: the sample owner, users in the owner
+    group if ``group_read`` is set, and all users if ``all_read`` is set can read the
+    sample.
+
+    :param connection: the connection
+    :param data: the sample data
+    :return: whether the connection can read the sample
+    """
+    if getattr(data, "all_read", False):
+        return True
+
+    if getattr(getattr(data, "user", None), "id", None) == connection.user_id:
+        return True
+
+    group = getattr(data, "group", None)
+
+    if group is None or not getattr(data, "group_read", False):
+        return False
+
+    group_ids = {getattr(group, "id", group), getattr(group, "legacy_id", None)}
+    group_ids.discard(None)
+
+    return bool(group_ids & set(connection.groups))
+
+
+def check_key_read(connection: "WSConnection", data: Any) -> bool:
+    """Check if a connection can receive a change to API keys.
+
+    Users can only receive changes to their own keys.
+
+    :param connection: the connection
+    :param data: the key change data
+    :return: whether the connection can receive the change
+    """
+    return getattr(data, "user_id", None) == connection.user_id
+
+
+def check_user_read(connection: "WSConnection", data: Any) -> bool:
+    """Check if a connection can read a user.
+
+    Users can only receive updates about themselves unless they are an administrator
+    that manages users.
+
+    :param connection: the connection
+    :param data: the user data
+    :return: whether the connection can read the user
+    """
+    if connection.administrator_role in (
+        AdministratorRole.FULL,
+        AdministratorRole.USERS,
+    ):
+        return True
+
+    return getattr(data, "id", None) == connection.user_id
+
+
+RIGHTS_CHECKS: dict[str, Callable[["WSConnection", Any], bool]] = {
+    "keys": check_key_read,
+    "samples": check_sample_read,
+    "users": check_user_read,
+}
+"""Rights checks for domains that not every user can read, keyed by domain."""
+
+
+def check_can_receive(connection: "WSConnection", domain: str, data: Any) -> bool:
+    """Check if a connection is allowed to receive an event.
+
+    :param connection: the connection
+    :param domain: the domain of the event
+    :param data: the event data
+    :return: whether the event can be sent to the connection
+    """
+    if connection.administrator_role == AdministratorRole.FULL:
+        return True
+
+    check = RIGHTS_CHECKS.get(domain)
+
+    return check is None or check(connection, data)
+
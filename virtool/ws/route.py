@@ -2,37 +2,60 @@
 Provides handlers for managing Websocket related requests.
 """
 
+import re
+
+from aiohttp import WSMsgType
 from aiohttp.web import Request, WebSocketResponse
 
 from virtool.api.policy import policy, WebSocketRoutePolicy
 from virtool.ws.connection import WSConnection
 
+STREAM_ID_RE = re.compile(r"^\d+-\d+$")
+"""Matches valid event stream IDs."""
+
 
 @policy(WebSocketRoutePolicy)
 async def root(req: Request) -> WebSocketResponse:
     """
     Handles requests for WebSocket connections.
 
+    Clients that are reconnecting can pass the ``event_id`` of the last message they
+    received as the ``last_event_id`` query parameter to receive the events they
+    missed.
+
     """
     ws = WebSocketResponse(autoping=True, heartbeat=5)
 
     await ws.prepare(req)
 
-    connection = WSConnection(ws, req["client"])
+    ws_server = req.app["ws"]
+
+    connection = WSConnection(
+        ws,
+        req["client"],
+        max_queue_size=ws_server.max_queue_size,
+        policy=ws_server.policy,
+    )
 
     if not req["client"].authenticated:
         await connection.close(4000)
         return ws
 
-    req.app["ws"].add_connection(connection)
+    last_event_id = req.query.get("last_event_id")
+
+    if last_event_id and STREAM_ID_RE.match(last_event_id):
+        await ws_server.replay(connection, last_event_id)
+
+    ws_server.add_connection(connection)
 
     try:
-        async for _ in ws:
-            pass
+        async for message in ws:
+            if message.type == WSMsgType.TEXT:
+                ws_server.handle_message(connection, message.data)
     except RuntimeError as err:
         if "TCPTransport" not in str(err):
             raise
 
-    req.app["ws"].remove_connection(connection)
+    ws_server.remove_connection(connection)
 
     return ws
@@ -1,48 +1,70 @@
 import asyncio
 from asyncio import CancelledError
+from collections import defaultdict
+from itertools import chain
 
+import orjson
 from structlog import get_logger
 from virtool_core.redis import Redis
 
-from virtool.data.events import Operation, listen_for_events
+from virtool.api.custom_json import dump_string
+from virtool.data.events import Event, Operation, listen_for_events, replay_events
+from virtool.data.streams import EventStream, compare_stream_ids
 from virtool.users.sessions import SessionData
-from virtool.ws.cls import WSDeleteMessage, WSInsertMessage
-from virtool.ws.connection import WSConnection
+from virtool.ws.cls import WSDeleteMessage, WSInsertMessage, WSMessage, WSUpdateMessage
+from virtool.ws.connection import WS_SEND_QUEUE_SIZE, SlowConsumerPolicy, WSConnection
+from virtool.ws.rights import check_can_receive
 
 logger = get_logger("ws")
 
 
 class WSServer:
-    def __init__(self, redis: Redis):
+    def __init__(
+        self,
+        redis: Redis,
+        max_queue_size: int = WS_SEND_QUEUE_SIZE,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE,
+        stream: EventStream | None = None,
+        group: str | None = None,
+        consumer: str | None = None,
+    ):
         #: All active client connections.
         self._connections = []
         self._redis = redis
 
-    async def run(self):
-        """Start the Websocket server."""
-        try:
-            async for event in listen_for_events(self._redis):
-                if event.operation == Operation.CREATE:
-                    message = WSInsertMessage(
-                        interface=event.domain,
-                        operation="insert",
-                        data=event.data,
-                    )
+        #: The event stream to read events from instead of pub/sub and the consumer
+        #: group and name to read them as.
+        self._stream = stream
+        self._group = group
+        self._consumer = consumer
 
-                elif event.operation == Operation.UPDATE:
-                    message = WSDeleteMessage(
-                        interface=event.domain,
-                        operation="update",
-                        data=event.data,
-                    )
+        #: The stream ID of the last event that was broadcast.
+        self._last_id: str | None = None
 
-                else:
-                    message = WSDeleteMessage(
-                        interface=event.domain,
-                        operation="delete",
-                        data=[event.data.id],
-                    )
+        #: Connections subscribed to each domain.
+        self._subscribers: defaultdict[str, set[WSConnection]] = defaultdict(set)
+
+        #: Authenticated connections that have never subscribed and receive all events.
+        self._unfiltered: set[WSConnection] = set()
+
+        #: The number of messages dropped by connections that have been removed.
+        self._dropped = 0
+
+        #: The send queue size for new connections.
+        self.max_queue_size = max_queue_size
 
+        #: The slow consumer policy for new connections.
+        self.policy = policy
+
+    async def run(self):
+        """Start the Websocket server."""
+        try:
+            async for event in listen_for_events(
+                self._redis,
+                self._stream,
+                self._group,
+                self._consumer,
+            ):
                 logger.info(
                     "Sending WebSocket message",
                     domain=event.domain,
@@ -50,25 +72,164 @@ class WSServer:
                     id=event.data.id,
                 )
 
-                await asyncio.gather(
-                    *[
-                        connection.send(message)
-                        for connection in self.authenticated_connections
-                    ],
-                )
+                self.broadcast(event)
 
         except CancelledError:
             pass
 
         await self.close()
 
+    def broadcast(self, event: Event):
+        """Queue a message for an event to be sent to interested connections.
+
+        Only connections subscribed to the event domain, and connections that have
+        never subscribed, are considered. The message is sent to those subscribed to the
+        resource that are allowed to read it.
+
+        The message is serialized once and the same string is queued for every
+        connection.
+
+        :param event: the event to send
+        """
+        if event.stream_id:
+            self._last_id = event.stream_id
+
+        resource_id = event.data.id
+
+        recipients = [
+            connection
+            for connection in chain(
+                self._unfiltered,
+                self._subscribers.get(event.domain, ()),
+            )
+            if connection.is_subscribed(event.domain, resource_id)
+            and check_can_receive(connection, event.domain, event.data)
+        ]
+
+        if not recipients:
+            return
+
+        data = dump_string(compose_message(event))
+        key = (event.domain, event.operation, resource_id)
+
+        for connection in recipients:
+            connection.enqueue(data, key)
+
+    async def replay(self, connection: WSConnection, last_event_id: str):
+        """Queue messages for the events a reconnecting client missed.
+
+        Events in the event stream after ``last_event_id`` that have already been
+        broadcast are queued for the connection. Later events will reach the connection
+        through :meth:`broadcast` once it is added, so the connection must be added
+        without awaiting anything after this method returns.
+
+        If the missed events are no longer in the stream or there are more than fit in
+        the connection's send queue, a ``reset`` message is queued instead. The client
+        should then refetch the resources it is displaying.
+
+        Nothing is done if the server is not using an event stream.
+
+        :param connection: the connection to queue messages for
+        :param last_event_id: the stream ID of the last event the client received
+        """
+        if self._stream is None:
+            return
+
+        after_id = last_event_id
+        remaining = self.max_queue_size
+
+        # Events can be broadcast while the stream is being read, so keep reading until
+        # the connection has caught up to the last broadcast event.
+        while self._last_id is None or compare_stream_ids(after_id, self._last_id) < 0:
+            events, complete = await replay_events(self._stream, after_id, remaining)
+
+            if not complete:
+                connection.enqueue(
+                    dump_string(WSMessage(operation="reset", interface="events")),
+                )
+                return
+
+            for event in events:
+                if (
+                    self._last_id is not None
+                    and compare_stream_ids(event.stream_id, self._last_id) > 0
+                ):
+                    return
+
+                if check_can_receive(connection, event.domain, event.data):
+                    connection.enqueue(
+                        dump_string(compose_message(event)),
+                        (event.domain, event.operation, event.data.id),
+                    )
+
+                after_id = event.stream_id
+
+            remaining -= len(events)
+
+            if not events or self._last_id is None:
+                return
+
+    def handle_message(self, connection: WSConnection, raw: str):
+        """Handle a message sent by a client.
+
+        Clients subscribe to events using messages like:
+
+        .. code-block:: json
+
+            {"type": "subscribe", "domain": "jobs", "ids": ["foo", "bar"]}
+
+        Omit ``ids`` to subscribe to all resources in the domain. Send a message with
+        the type ``unsubscribe`` to unsubscribe. Clients that never subscribe receive
+        events from all domains.
+
+        :param connection: the connection the message was received on
+        :param raw: the message text
+        """
+        try:
+            message = orjson.loads(raw)
+            message_type = message["type"]
+            domain = message["domain"]
+            ids = message.get("ids")
+
+            if (
+                message_type not in ("subscribe", "unsubscribe")
+                or not isinstance(domain, str)
+                or not (ids is None or isinstance(ids, list))
+            ):
+                raise ValueError
+        except (KeyError, TypeError, ValueError):
+            logger.warning(
+                "received invalid websocket message",
+                user_id=connection.user_id,
+            )
+            return
+
+        if message_type == "subscribe":
+            connection.subscribe(domain, ids)
+        else:
+            connection.unsubscribe(domain, ids)
+
+        self._unfiltered.discard(connection)
+
+        for subscribers in self._subscribers.values():
+            subscribers.discard(connection)
+
+        for subscribed_domain in connection.subscriptions:
+            self._subscribers[subscribed_domain].add(connection)
+
     def add_connection(self, connection: WSConnection):
         """Add a connection to the websocket server.
 
         :param connection: the connection to add
 
         """
+        connection.start()
+
         self._connections.append(connection)
+
+        if connection.user_id:
+            self._unfiltered.add(connection)
+
         logger.info("established websocket connection", user_id=connection.user_id)
 
     def remove_connection(self, connection: WSConnection):
@@ -79,6 +240,14 @@ class WSServer:
         """
         try:
             self._connections.remove(connection)
+            connection.stop()
+
+            self._unfiltered.discard(connection)
+
+            for subscribers in self._subscribers.values():
+                subscribers.discard(connection)
+
+            self._dropped += connection.dropped
             logger.info("closed websocket connection", user_id=connection.user_id)
         except ValueError:
             pass
@@ -98,16 +267,68 @@ class WSServer:
 
             await asyncio.sleep(300)
 
+    async def periodically_log_metrics(self):
+        """Periodically log the websocket send queue metrics."""
+        while True:
+            logger.info("websocket metrics", **self.metrics)
+            await asyncio.sleep(60)
+
     @property
     def authenticated_connections(self) -> list[WSConnection]:
         """A list of all authenticated connections."""
         return [conn for conn in self._connections if conn.user_id]
 
+    @property
+    def metrics(self) -> dict[str, int]:
+        """The number of connections, the depth of their send queues, and the number of
+        messages dropped because a connection was not keeping up.
+        """
+        depths = [connection.queue_depth for connection in self._connections]
+
+        return {
+            "connections": len(self._connections),
+            "dropped": self._dropped
+            + sum(connection.dropped for connection in self._connections),
+            "max_queue_depth": max(depths, default=0),
+            "queue_depth": sum(depths),
+        }
+
     async def close(self):
         """Close the server and all connections."""
         logger.info("closing websocket server")
 
         for connection in self._connections:
+            connection.stop()
             await connection.close(1001)
 
         logger.info("closed websocket server")
+
+
+def compose_message(event: Event) -> WSMessage:
+    """Compose the websocket message for an event.
+
+    :param event: the event
+    :return: the websocket message
+    """
+    if event.operation == Operation.CREATE:
+        return WSInsertMessage(
+            interface=event.domain,
+            operation="insert",
+            data=event.data,
+            event_id=event.stream_id,
+        )
+
+    if event.operation == Operation.UPDATE:
+        return WSUpdateMessage(
+            interface=event.domain,
+            operation="update",
+            data=event.data,
+            event_id=event.stream_id,
+        )
+
+    return WSDeleteMessage(
+        interface=event.domain,
+        operation="delete",
+        data=[event.data.id],
+        event_id=event.stream_id,
+    )